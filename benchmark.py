@@ -0,0 +1,541 @@
+"""検出・記録・集計のホットパスを計測するベンチマーク.
+
+gspread / pygetwindow はインメモリの代替に差し替えて実行するため、
+ネットワークや Windows 環境なしで実行できる。
+
+    python benchmark.py --output bench.json
+    python benchmark.py --profile full --output new.json --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import types
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+# 外部依存をインメモリの代替に差し替えてからアプリを読み込む
+sys.modules.setdefault('gspread', types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+))
+sys.modules.setdefault('pygetwindow', types.SimpleNamespace(getAllWindows=lambda: []))
+
+import main  # noqa: E402
+from config_loader import DEFAULT_BROWSERS  # noqa: E402
+from fake_sheets import FakeSheetsBackend  # noqa: E402
+from log_handler import LogHandler  # noqa: E402
+from log_codec import LOG_COLUMNS, datetime_to_seconds, decode_rows, seconds_to_serial  # noqa: E402
+from play_stats import (  # noqa: E402
+    sum_minutes_by_title_on,
+    sum_seconds_on,
+    sum_today_minutes_by_title,
+    sum_today_seconds,
+)
+from sheets_governor import GOVERNOR  # noqa: E402
+
+RESULT_FORMAT_VERSION = 1
+DEFAULT_REGRESSION_THRESHOLD = 1.25
+# Windows の一般的なデスクトップで動いているプロセス数
+PROCESS_COUNT = 300
+# 前方一致・正規表現の除外ルール（通知オーバーレイなど）
+SCAN_RULES = (
+    'prefix:Game Time Tracker',
+    'prefix:NVIDIA',
+    r'regex:通知 \(\d+\)',
+    r'regex:.* - Discord$',
+)
+# FakeSheetsBackend の1リクエストあたりのレイテンシ（秒）とページング時の行数
+SHEETS_LATENCY = 0.02
+SHEETS_CHUNK_ROWS = 1000
+
+PROFILES = {
+    'quick': {
+        'catalog_sizes': (10, 100, 1000),
+        'history_sizes': (1000, 10000),
+        'window_count': 40,
+        'repeat': 5,
+    },
+    'full': {
+        'catalog_sizes': (10, 100, 1000, 10000),
+        'history_sizes': (1000, 10000, 100000, 1000000),
+        'window_count': 40,
+        'repeat': 7,
+    },
+}
+
+
+# =============================================================================
+# 合成データ生成
+# =============================================================================
+JA_WORDS = (
+    'ドラゴン', 'クエスト', 'ファンタジー', '伝説', '物語', '戦記', '冒険', '星の',
+    '剣と魔法', 'アトリエ', '無双', '牧場', 'ソウル', '英雄', '迷宮', 'ＲＰＧ',
+)
+EN_WORDS = (
+    'Dragon', 'Quest', 'Legends', 'Saga', 'Chronicles', 'Tactics', 'Online',
+    'Heroes', 'Frontier', 'Souls', 'Valley', 'Odyssey', 'Arena', 'Rising',
+)
+BROWSER_SUFFIXES = (
+    ' - Google Chrome', ' - Microsoft Edge', ' — Mozilla Firefox', ' - Brave',
+)
+DESKTOP_TITLES = (
+    'Visual Studio Code', 'エクスプローラー', 'Discord', 'Slack | general',
+    'タスク マネージャー', 'Steam', 'Spotify Premium', 'OBS 30.0.2 - Profile: Untitled',
+    'Windows PowerShell', 'メモ帳',
+)
+WEB_PAGES = (
+    'YouTube', 'Gmail - 受信トレイ', 'Google スプレッドシート', 'GitHub',
+    'ニュース - Yahoo! JAPAN', 'Amazon.co.jp',
+)
+
+
+def make_game_title(rng: random.Random, serial: int) -> str:
+    """日本語/英語混在のゲームタイトルを生成."""
+    if rng.random() < 0.5:
+        words = rng.sample(JA_WORDS, 2)
+        return f'{words[0]}{words[1]}{serial}'
+    words = rng.sample(EN_WORDS, 2)
+    return f'{words[0]} {words[1]} {serial}'
+
+
+def generate_catalog(size: int, seed: int = 0) -> List[main.GameEntry]:
+    """指定件数のゲームカタログを生成（約2割はブラウザゲーム）."""
+    rng = random.Random(seed)
+    games = []
+    for i in range(size):
+        title = make_game_title(rng, i)
+        games.append(main.GameEntry(
+            game_title=title,
+            window_title=title,
+            play_with_friends=rng.random() < 0.3,
+            is_browser_game=rng.random() < 0.2,
+        ))
+    return games
+
+
+def generate_window_titles(
+    games: Sequence[main.GameEntry],
+    count: int,
+    *,
+    playing: int = 2,
+    seed: int = 0,
+) -> List[str]:
+    """デスクトップ・ブラウザ・ゲームのウィンドウタイトル集合を生成."""
+    rng = random.Random(seed)
+    titles = []
+    for game in rng.sample(list(games), min(playing, len(games))):
+        suffix = rng.choice(BROWSER_SUFFIXES) if game.is_browser_game else ''
+        titles.append(f'{game.window_title}{suffix}')
+    while len(titles) < count:
+        if rng.random() < 0.5:
+            titles.append(rng.choice(DESKTOP_TITLES))
+        else:
+            page = rng.choice(WEB_PAGES)
+            titles.append(f'{page} ({len(titles)}){rng.choice(BROWSER_SUFFIXES)}')
+    return titles
+
+
+def generate_history(
+    size: int,
+    titles: Sequence[str],
+    *,
+    end: Optional[datetime] = None,
+    seed: int = 0,
+) -> List[dict]:
+    """ログシートの get_all_records() 形式のセッション履歴を生成（古い順）."""
+    rng = random.Random(seed)
+    end = end or datetime.now()
+    # 1日あたり約4セッションとして期間を決める
+    current = end - timedelta(days=max(1, size // 4))
+    step = (end - current) / size
+    records = []
+    for i in range(size):
+        start = current + step * i
+        finish = start + timedelta(minutes=rng.randint(5, 180))
+        records.append({
+            'index': i + 1,
+            'start_time': start.strftime('%Y/%m/%d %H:%M:%S'),
+            'end_time': finish.strftime('%Y/%m/%d %H:%M:%S'),
+            'title': rng.choice(titles),
+            'play_with_friends': 'TRUE' if rng.random() < 0.3 else 'FALSE',
+        })
+    return records
+
+
+def to_values(records: Sequence[dict], *, unformatted: bool) -> List[list]:
+    """get_all_records 形式の履歴を get_all_values 形式（先頭行はヘッダー）に変換.
+
+    unformatted=True なら UNFORMATTED_VALUE / SERIAL_NUMBER で読み込んだ場合の値にする。
+    """
+    def cell(column: str, value: object) -> object:
+        if not unformatted:
+            return str(value)
+        if column in ('start_time', 'end_time'):
+            return seconds_to_serial(datetime_to_seconds(datetime.strptime(value, '%Y/%m/%d %H:%M:%S')))
+        if column == 'play_with_friends':
+            return value == 'TRUE'
+        return value
+
+    return [list(LOG_COLUMNS)] + [[cell(c, record[c]) for c in LOG_COLUMNS] for record in records]
+
+
+# =============================================================================
+# インメモリの代替
+# =============================================================================
+@dataclass
+class InMemoryWindow:
+    """pygetwindow のウィンドウ代替."""
+
+    title: str
+
+
+class InMemoryWindowSource:
+    """pygetwindow モジュールの代替（getAllWindows のみ）."""
+
+    def __init__(self, titles: Sequence[str]) -> None:
+        self.windows = [InMemoryWindow(title) for title in titles]
+
+    def getAllWindows(self) -> List[InMemoryWindow]:  # noqa: N802 - pygetwindow 互換
+        return self.windows
+
+
+class InMemoryWorksheet:
+    """gspread Worksheet の代替（読み込み系のみ、get_all_values は書式なしの値を返す）."""
+
+    def __init__(self, records: List[dict]) -> None:
+        self.records = records
+        self.values = to_values(records, unformatted=True)
+
+    def get_all_records(self) -> List[dict]:
+        return self.records
+
+    def get_all_values(self, **kwargs) -> List[list]:
+        return self.values
+
+
+class NullLogHandler:
+    """記録を破棄する LogHandler の代替."""
+
+    def __init__(self) -> None:
+        self.index = 0
+
+    def format_datetime_to_gss_style(self, dt: datetime) -> str:
+        return dt.strftime('%Y/%m/%d %H:%M:%S')
+
+    def get_and_increment_index(self) -> int:
+        self.index += 1
+        return self.index
+
+    def save_record(self, values) -> bool:
+        return True
+
+
+def make_log_handler(records: List[dict]) -> LogHandler:
+    """シート接続なしで LogHandler を構築."""
+    handler = LogHandler.__new__(LogHandler)
+    handler.sheet = InMemoryWorksheet(records)
+    handler.index = len(records)
+    return handler
+
+
+# =============================================================================
+# 計測
+# =============================================================================
+def measure(func: Callable[[], object], *, repeat: int, min_time: float = 0.05) -> Dict[str, float]:
+    """func を繰り返し実行し、1回あたりの秒数の統計を返す."""
+    # 1計測が min_time 以上になるようループ回数を決める
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'loops': number,
+        'repeat': repeat,
+    }
+
+
+def bench_update_game_states(catalog_size: int, window_count: int, repeat: int) -> Dict[str, float]:
+    """定常状態（ウィンドウ構成が変わらない）の1ティック分の状態更新."""
+    games = generate_catalog(catalog_size)
+    titles = generate_window_titles(games, window_count)
+    monitor = main.GameMonitor(
+        games=games,
+        scanner=main.WindowScanner(excluded_titles=[]),
+        recorder=main.SessionRecorder(log_handler=NullLogHandler()),
+        browsers=DEFAULT_BROWSERS,
+    )
+    monitor._update_game_states(titles)  # セッション開始を済ませておく
+    return measure(lambda: monitor._update_game_states(titles), repeat=repeat)
+
+
+def bench_update_game_states_churn(
+    catalog_size: int,
+    window_count: int,
+    repeat: int,
+    normalize: bool = False,
+) -> Dict[str, float]:
+    """毎ティック1つのタイトルが変化する場合（ブラウザのタブ切替など）の状態更新."""
+    games = generate_catalog(catalog_size)
+    titles = generate_window_titles(games, window_count)
+    monitor = main.GameMonitor(
+        games=games,
+        scanner=main.WindowScanner(excluded_titles=[]),
+        recorder=main.SessionRecorder(log_handler=NullLogHandler()),
+        browsers=DEFAULT_BROWSERS,
+        normalize=normalize,
+    )
+    monitor._update_game_states(titles)
+    counter = iter(range(1 << 62))
+
+    def tick() -> None:
+        titles[-1] = f'通知 ({next(counter)}) - Google Chrome'
+        monitor._update_game_states(titles)
+
+    return measure(tick, repeat=repeat)
+
+
+def bench_detect_processes(catalog_size: int, process_count: int, repeat: int) -> Dict[str, float]:
+    """実行ファイルの索引によるプロセス検出（全ゲームに実行ファイルを登録）."""
+    games = generate_catalog(catalog_size)
+    for i, game in enumerate(games):
+        game.executable = f'game{i:05}.exe'
+    catalog = main.GameCatalog(games, DEFAULT_BROWSERS, use_processes=True)
+    executables = [rf'C:\Windows\System32\svc{i:04}.exe' for i in range(process_count - 2)]
+    executables += [rf'D:\Games\{games[0].executable}', rf'D:\Games\{games[-1].executable}']
+    return measure(lambda: catalog.detect_processes(executables), repeat=repeat)
+
+
+def bench_scan(window_count: int, repeat: int, rules: Sequence[str] = ()) -> Dict[str, float]:
+    """WindowScanner.get_titles（除外フィルタと重複除去、rules は前方一致/正規表現の除外ルール）."""
+    games = generate_catalog(100)
+    source = InMemoryWindowSource(generate_window_titles(games, window_count) * 2)
+    scanner = main.WindowScanner(excluded_titles=list(DESKTOP_TITLES[:3]) + list(rules))
+    original, main.gw = main.gw, source
+    try:
+        return measure(scanner.get_titles, repeat=repeat)
+    finally:
+        main.gw = original
+
+
+def bench_matches_window(repeat: int, pairs: int = 10000) -> Dict[str, float]:
+    """GameEntry.matches_window の1呼び出しあたり（ヒット/ミス混在）."""
+    games = generate_catalog(200)
+    titles = generate_window_titles(games, 50, playing=10)
+    rng = random.Random(1)
+    sample = [(rng.choice(games), rng.choice(titles)) for _ in range(pairs)]
+    browsers = DEFAULT_BROWSERS
+
+    def run() -> None:
+        for game, title in sample:
+            game.matches_window(title, browsers)
+
+    result = measure(run, repeat=repeat)
+    return {key: value / pairs if key in ('min', 'median', 'mean') else value for key, value in result.items()}
+
+
+def bench_recent_titles(history_size: int, repeat: int) -> Dict[str, float]:
+    """LogHandler.get_n_titles_of_recently(10)."""
+    titles = [game.game_title for game in generate_catalog(200)]
+    handler = make_log_handler(generate_history(history_size, titles))
+    return measure(lambda: handler.get_n_titles_of_recently(10), repeat=repeat, min_time=0)
+
+
+def bench_today_aggregation(history_size: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """GUI の今日分集計（合計秒数・ゲーム別分数）.
+
+    *_typed は書式なしの値を LogRecord に変換するところから計測し、strptime で
+    文字列を解析する従来の経路と比較する。decode_text は書式付き文字列の変換のみ。
+    """
+    titles = [game.game_title for game in generate_catalog(200)]
+    records = generate_history(history_size, titles)
+    serial_values = to_values(records, unformatted=True)
+    text_values = to_values(records, unformatted=False)
+    today = date.today()
+    return {
+        'today_seconds': measure(lambda: sum_today_seconds(records, today), repeat=repeat, min_time=0),
+        'today_minutes_by_title': measure(
+            lambda: sum_today_minutes_by_title(records, today), repeat=repeat, min_time=0,
+        ),
+        'today_seconds_typed': measure(
+            lambda: sum_seconds_on(decode_rows(serial_values), today), repeat=repeat, min_time=0,
+        ),
+        'today_minutes_by_title_typed': measure(
+            lambda: sum_minutes_by_title_on(decode_rows(serial_values), today), repeat=repeat, min_time=0,
+        ),
+        'decode_text': measure(lambda: decode_rows(text_values), repeat=repeat, min_time=0),
+    }
+
+
+def bench_sheets_log(history_size: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """FakeSheetsBackend（レイテンシ付き）に対するログシートの読み込み.
+
+    startup は LogHandler の接続から型付きレコードの取得まで、iter_records は
+    ページ単位の読み込みで、先読みの有無を比較する。
+    """
+    titles = [game.game_title for game in generate_catalog(200)]
+    backend = FakeSheetsBackend(latency=SHEETS_LATENCY)
+    backend.create_spreadsheet('log').seed_worksheet(
+        'log', to_values(generate_history(history_size, titles), unformatted=True),
+    )
+    config = types.SimpleNamespace(log_handler={'cert_file_path': 'sa.json', 'sheet_key': 'log'})
+    with backend.installed():
+        handler = LogHandler(config)
+
+        def page_through(prefetch: bool) -> int:
+            return sum(1 for _ in handler.iter_records(SHEETS_CHUNK_ROWS, prefetch=prefetch))
+
+        return {
+            'sheets_startup': measure(lambda: LogHandler(config), repeat=repeat, min_time=0),
+            'sheets_iter_records': measure(lambda: page_through(False), repeat=repeat, min_time=0),
+            'sheets_iter_records_prefetch': measure(lambda: page_through(True), repeat=repeat, min_time=0),
+        }
+
+
+def run_benchmarks(profile: str, only: Optional[str] = None) -> List[dict]:
+    """プロファイルに従って全ベンチマークを実行."""
+    settings = PROFILES[profile]
+    # インメモリの代替に対してはレート制限をかけない
+    GOVERNOR.configure(requests_per_minute=0)
+    repeat = settings['repeat']
+    window_count = settings['window_count']
+    results: List[dict] = []
+
+    def add(name: str, params: dict, stats: Dict[str, float]) -> None:
+        key = name + ''.join(f'[{k}={v}]' for k, v in params.items())
+        if only and only not in key:
+            return
+        results.append({'name': name, 'params': params, 'key': key, **stats})
+        print(f"{key:<60} median {stats['median'] * 1e6:12.2f} us", file=sys.stderr)
+
+    def wanted(name: str) -> bool:
+        return not only or only in name or name in only
+
+    if wanted('scan'):
+        add('scan', {'windows': window_count * 2}, bench_scan(window_count, repeat))
+        add('scan_rules', {'windows': window_count * 2, 'rules': len(SCAN_RULES)},
+            bench_scan(window_count, repeat, SCAN_RULES))
+    if wanted('matches_window'):
+        add('matches_window', {}, bench_matches_window(repeat))
+    if wanted('update_game_states'):
+        for size in settings['catalog_sizes']:
+            add('update_game_states', {'catalog': size, 'windows': window_count},
+                bench_update_game_states(size, window_count, repeat))
+            add('update_game_states_churn', {'catalog': size, 'windows': window_count},
+                bench_update_game_states_churn(size, window_count, repeat))
+            add('update_game_states_churn_normalized', {'catalog': size, 'windows': window_count},
+                bench_update_game_states_churn(size, window_count, repeat, normalize=True))
+    if wanted('detect_processes'):
+        for size in settings['catalog_sizes']:
+            add('detect_processes', {'catalog': size, 'processes': PROCESS_COUNT},
+                bench_detect_processes(size, PROCESS_COUNT, repeat))
+    for size in settings['history_sizes']:
+        if wanted('recent_titles'):
+            add('recent_titles', {'history': size}, bench_recent_titles(size, repeat))
+        if wanted('today_'):
+            for name, stats in bench_today_aggregation(size, repeat).items():
+                add(name, {'history': size}, stats)
+        if wanted('sheets_'):
+            for name, stats in bench_sheets_log(size, repeat).items():
+                add(name, {'history': size, 'latency_ms': int(SHEETS_LATENCY * 1000)}, stats)
+    return results
+
+
+# =============================================================================
+# 結果の保存と比較
+# =============================================================================
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(profile: str, results: List[dict]) -> dict:
+    """機械可読な結果レポートを作成."""
+    return {
+        'format': RESULT_FORMAT_VERSION,
+        'revision': _git_revision(),
+        'profile': profile,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'results': results,
+    }
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float) -> List[dict]:
+    """同じキーの結果を比較し、median の比率を返す."""
+    base_by_key = {r['key']: r for r in baseline.get('results', [])}
+    rows = []
+    for result in current['results']:
+        base = base_by_key.get(result['key'])
+        if base is None or not base['median']:
+            continue
+        ratio = result['median'] / base['median']
+        rows.append({
+            'key': result['key'],
+            'baseline': base['median'],
+            'current': result['median'],
+            'ratio': ratio,
+            'regression': ratio > threshold,
+        })
+    return rows
+
+
+def main_cli(argv: Optional[Sequence[str]] = None) -> int:
+    """ベンチマークのエントリーポイント."""
+    parser = argparse.ArgumentParser(description='Game Time Tracker ベンチマーク')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--only', help='キーにこの文字列を含むベンチマークのみ実行')
+    parser.add_argument('--output', help='結果 JSON の出力先（省略時は標準出力）')
+    parser.add_argument('--compare', help='比較対象の結果 JSON')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='この比率を超えたら劣化とみなす（既定: 1.25）')
+    args = parser.parse_args(argv)
+
+    report = build_report(args.profile, run_benchmarks(args.profile, args.only))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows = compare_reports(baseline, report, args.threshold)
+    for row in rows:
+        mark = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['key']:<60} x{row['ratio']:.2f}{mark}", file=sys.stderr)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
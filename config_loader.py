@@ -1,5 +1,8 @@
 import configparser
-from typing import List
+import os
+import re
+import time
+from typing import Callable, FrozenSet, List, Optional, Pattern, Set, Tuple
 
 DEFAULT_BROWSERS = [
     'Google Chrome',
@@ -22,10 +25,29 @@ DEFAULT_EXCLUDED_TITLES = [
     'Nahimic',
 ]
 
+# exclude_titles の前方一致・正規表現（先頭から照合）ルールの接頭辞
+EXCLUDE_PREFIX = 'prefix:'
+EXCLUDE_REGEX = 'regex:'
+
+DEFAULT_METRICS_JSON_PATH = 'metrics.json'
+DEFAULT_METRICS_PROMETHEUS_PATH = 'metrics.prom'
+DEFAULT_METRICS_DUMP_INTERVAL = 60.0
+
+DEFAULT_SHEETS_REQUESTS_PER_MINUTE = 60
+DEFAULT_SHEETS_MAX_RETRIES = 5
+
+DEFAULT_ROLLUP_WORKSHEET = 'daily_rollup'
+
+DEFAULT_CONFIG_FILE_PATH = 'config.ini'
+CONFIG_POLL_INTERVAL_SECONDS = 2.0
+
+# ConfigLoader が公開する設定セクション（属性名）
+SECTIONS = ('log_handler', 'game_info', 'window_scan', 'metrics', 'sheets', 'rollup')
+
 # 設定ファイルの読み込み
 class ConfigLoader:
-    def __init__(self):
-        self.config_file_path = 'config.ini'
+    def __init__(self, config_file_path=DEFAULT_CONFIG_FILE_PATH):
+        self.config_file_path = str(config_file_path)
         self.config = configparser.ConfigParser()
         self.config.read(self.config_file_path, encoding='utf-8')
         self.load()
@@ -44,11 +66,146 @@ class ConfigLoader:
         self.window_scan = {
             'browsers': self._get_list('WINDOW_SCAN', 'browsers', DEFAULT_BROWSERS),
             'excluded_titles': self._get_list('WINDOW_SCAN', 'exclude_titles', DEFAULT_EXCLUDED_TITLES),
+            'normalize': self.config.getboolean('WINDOW_SCAN', 'normalize', fallback=False),
+            'process_detection': self.config.getboolean('WINDOW_SCAN', 'process_detection', fallback=False),
         }
 
+        self.metrics = {
+            'enabled': self.config.getboolean('METRICS', 'enabled', fallback=False),
+            'json_path': self.config.get('METRICS', 'json_path', fallback=DEFAULT_METRICS_JSON_PATH),
+            'prometheus_path': self.config.get('METRICS', 'prometheus_path', fallback=DEFAULT_METRICS_PROMETHEUS_PATH),
+            'dump_interval': self.config.getfloat('METRICS', 'dump_interval', fallback=DEFAULT_METRICS_DUMP_INTERVAL),
+        }
+
+        self.sheets = {
+            'requests_per_minute': self.config.getfloat('SHEETS', 'requests_per_minute', fallback=DEFAULT_SHEETS_REQUESTS_PER_MINUTE),
+            'max_retries': self.config.getint('SHEETS', 'max_retries', fallback=DEFAULT_SHEETS_MAX_RETRIES),
+        }
+
+        self.rollup = {
+            'enabled': self.config.getboolean('ROLLUP', 'enabled', fallback=False),
+            'worksheet': self.config.get('ROLLUP', 'worksheet', fallback=DEFAULT_ROLLUP_WORKSHEET),
+        }
+
+    # 実行中に反映できない値を検出する（問題があれば ValueError）
+    def validate(self):
+        errors = []
+        for name, value in (
+            ('LOGHANDLER.json_file_path', self.log_handler['cert_file_path']),
+            ('LOGHANDLER.sheet_key', self.log_handler['sheet_key']),
+            ('GAMEINFO.sheet_key', self.game_info['sheet_key']),
+            ('GAMEINFO.sheet_gid', self.game_info['sheet_gid']),
+        ):
+            if not value.strip():
+                errors.append(f'{name} が空です')
+        if self.metrics['dump_interval'] <= 0:
+            errors.append('METRICS.dump_interval は正の値にしてください')
+        if self.sheets['requests_per_minute'] < 0:
+            errors.append('SHEETS.requests_per_minute は 0 以上にしてください')
+        if self.sheets['max_retries'] < 0:
+            errors.append('SHEETS.max_retries は 0 以上にしてください')
+        if self.rollup['enabled'] and not self.rollup['worksheet'].strip():
+            errors.append('ROLLUP.worksheet が空です')
+        # WindowScanner と同じ変換を通し、起動時・再読み込み時に同じ基準で弾く
+        try:
+            compile_exclusions(self.window_scan['excluded_titles'])
+        except ValueError as e:
+            errors.append(f'WINDOW_SCAN.exclude_titles: {e}')
+        if errors:
+            raise ValueError(' / '.join(errors))
+
     def _get_list(self, section: str, key: str, default: List[str]) -> List[str]:
         if section not in self.config or key not in self.config[section]:
             return list(default)
         raw = self.config.get(section, key, fallback='')
         items = [item.strip() for item in raw.split(',') if item.strip()]
         return items if items else list(default)
+
+
+def compile_exclusions(rules: List[str]) -> Tuple[FrozenSet[str], Tuple[Pattern[str], ...]]:
+    """除外ルールを完全一致の集合と、前方一致・正規表現のパターン列に変換（不正なら ValueError）.
+
+    ルールの本体（接頭辞の後ろ、完全一致はルール全体）は前後の空白を取り除く。
+    グループもインラインフラグも持たないルールは1つの正規表現にまとめて照合回数を減らし、
+    それ以外（(?i) やグループ名・後方参照を含むもの）は結合すると意味が変わるため個別に残す。
+    """
+    exact = set()
+    joinable = []
+    separate = []
+    for rule in rules:
+        if rule.startswith(EXCLUDE_PREFIX):
+            joinable.append(re.escape(rule[len(EXCLUDE_PREFIX):].strip()))
+        elif rule.startswith(EXCLUDE_REGEX):
+            body = rule[len(EXCLUDE_REGEX):].strip()
+            try:
+                pattern = re.compile(body)
+            except re.error as e:
+                raise ValueError(f'正規表現が不正です: {rule}（{e}）') from e
+            if pattern.groups or pattern.flags != re.UNICODE:
+                separate.append(pattern)
+            else:
+                joinable.append(f'(?:{body})')
+        else:
+            exact.add(rule.strip())
+    patterns = [re.compile('|'.join(joinable))] if joinable else []
+    return frozenset(exact), tuple(patterns + separate)
+
+
+def changed_sections(old: ConfigLoader, new: ConfigLoader) -> Set[str]:
+    """2つの設定で値が異なるセクション（ConfigLoader の属性名）を返す."""
+    return {name for name in SECTIONS if getattr(old, name) != getattr(new, name)}
+
+
+class ConfigWatcher:
+    """設定ファイルの更新を mtime のポーリングで検出し、検証済みの新しい設定を返すクラス.
+
+    poll() は interval 秒に1回だけ stat を呼ぶため、監視ループから毎ティック呼んでよい。
+    読み込みや検証に失敗した場合は以前の設定を使い続け、次にファイルが更新されたら再試行する。
+    """
+
+    def __init__(
+        self,
+        config: ConfigLoader,
+        *,
+        interval: float = CONFIG_POLL_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        output: Callable[[str], None] = print,
+    ) -> None:
+        self.config = config
+        self.path = config.config_file_path
+        self.interval = interval
+        self.clock = clock
+        self.output = output
+        self._stamp = self._stat()
+        self._next_check = clock() + interval
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self) -> Optional[Tuple[ConfigLoader, Set[str]]]:
+        """ファイルが更新されていれば (新しい設定, 変更されたセクション) を返す."""
+        now = self.clock()
+        if now < self._next_check:
+            return None
+        self._next_check = now + self.interval
+
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        try:
+            config = ConfigLoader(self.path)
+            config.validate()
+        except (configparser.Error, KeyError, ValueError) as e:
+            self.output(f'{self.path} の再読み込みに失敗しました（以前の設定を使用します）: {e}')
+            return None
+
+        changed = changed_sections(self.config, config)
+        self.config = config
+        if not changed:
+            return None
+        return config, changed
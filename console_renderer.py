@@ -0,0 +1,106 @@
+"""ANSI エスケープでステータス領域をその場で書き換えるコンソール描画."""
+
+import ctypes
+import os
+import shutil
+import sys
+import unicodedata
+from typing import List, Optional, Sequence, TextIO
+
+CSI = '\x1b['
+ERASE_LINE = CSI + '2K'
+ERASE_BELOW = CSI + 'J'
+
+
+class ConsoleRenderer:
+    """ステータス行を前回との差分だけ書き換えて表示するクラス.
+
+    TTY ではカーソル移動で変化した行のみを書き換え、プロセス起動（cls/clear）を伴わない。
+    TTY でない場合（リダイレクト時など）は内容が変化したときだけ追記する。
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, *, ansi: Optional[bool] = None) -> None:
+        self.stream = stream or sys.stdout
+        self.ansi = _supports_ansi(self.stream) if ansi is None else ansi
+        self._lines: List[str] = []
+
+    def render(self, lines: Sequence[str]) -> None:
+        """ステータス領域を lines の内容に更新."""
+        if self.ansi:
+            lines = [_fit_width(line, self._width()) for line in lines]
+        else:
+            lines = list(lines)
+        if lines == self._lines:
+            return
+
+        if self.ansi:
+            self.stream.write(self._diff(lines))
+        else:
+            self.stream.write(''.join(line + '\n' for line in lines))
+        self.stream.flush()
+        self._lines = lines
+
+    def message(self, text: str) -> None:
+        """ステータス領域の上にメッセージを出力し、領域を描き直す."""
+        if not self.ansi:
+            self.stream.write(text + '\n')
+            self.stream.flush()
+            return
+        out = [self._move_to_top(), ERASE_BELOW, text, '\n']
+        out.extend(line + '\n' for line in self._lines)
+        self.stream.write(''.join(out))
+        self.stream.flush()
+
+    def _diff(self, lines: List[str]) -> str:
+        """前回の描画から lines へ更新するエスケープシーケンスを生成."""
+        out = [self._move_to_top()]
+        previous = self._lines
+        for i, line in enumerate(lines):
+            if i < len(previous) and previous[i] == line:
+                out.append(CSI + '1E')  # 次の行頭へ
+            else:
+                out.append('\r' + ERASE_LINE + line + '\n')
+        if len(lines) < len(previous):
+            out.append(ERASE_BELOW)
+        return ''.join(out)
+
+    def _move_to_top(self) -> str:
+        """カーソルを領域の先頭行へ移動するシーケンス."""
+        return f'{CSI}{len(self._lines)}F' if self._lines else '\r'
+
+    def _width(self) -> int:
+        # 折り返しで行数がずれないよう端末幅 - 1 に収める
+        return max(shutil.get_terminal_size().columns - 1, 1)
+
+
+def _fit_width(text: str, width: int) -> str:
+    """表示幅（全角は2）が width を超えないよう切り詰める."""
+    used = 0
+    for i, char in enumerate(text):
+        used += 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+        if used > width:
+            return text[:i]
+    return text
+
+
+def _supports_ansi(stream: TextIO) -> bool:
+    """stream が ANSI エスケープを解釈できる端末か判定."""
+    if not hasattr(stream, 'isatty') or not stream.isatty():
+        return False
+    if os.name != 'nt':
+        return True
+    return _enable_windows_vt_mode()
+
+
+def _enable_windows_vt_mode() -> bool:
+    """Windows コンソールの仮想端末シーケンス処理を有効化."""
+    try:
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        enable_vt = 0x0004  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | enable_vt))
+    except (AttributeError, OSError):
+        return False
@@ -0,0 +1,188 @@
+"""日別・ゲーム別のプレイ時間を集計したロールアップワークシートの管理.
+
+ロールアップは (date, title) ごとに1行で、合計秒数とセッション数を持つ。
+SessionRecorder が記録のたびに該当行だけを更新するため、集計を読みたい
+クライアントは全セッションではなく O(日数 × タイトル数) のセルを読めばよい。
+
+    python daily_rollup.py rebuild      # 生ログ（アーカイブ含む）から作り直す
+"""
+
+import argparse
+import sys
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import gspread
+
+from config_loader import ConfigLoader
+from log_archive import query_records
+from log_codec import LogRecord
+from log_handler import LogHandler
+from sheets_governor import GOVERNOR, WRITE, read_key
+
+DEFAULT_ROLLUP_TITLE = 'daily_rollup'
+ROLLUP_HEADER = ['date', 'title', 'total_seconds', 'sessions']
+
+RollupKey = Tuple[str, str]
+
+
+class DailyRollup:
+    """ロールアップワークシートの内容をメモリに保持し、差分だけを書き込むクラス."""
+
+    def __init__(
+        self,
+        spreadsheet,
+        title: str = DEFAULT_ROLLUP_TITLE,
+        output: Callable[[str], None] = print,
+    ) -> None:
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.output = output
+        self.worksheet = self._open_or_create()
+        # (日付, タイトル) → [行番号, 合計秒数, セッション数]
+        self.rows: Dict[RollupKey, List[int]] = {}
+        self._load()
+
+    def _open_or_create(self):
+        """ロールアップワークシートを取得（なければヘッダ付きで作成）."""
+        worksheets = GOVERNOR.call('worksheets', self.spreadsheet.worksheets)
+        for worksheet in worksheets:
+            if worksheet.title == self.title:
+                return worksheet
+        worksheet = GOVERNOR.call(
+            'add_worksheet',
+            lambda: self.spreadsheet.add_worksheet(self.title, rows=1, cols=len(ROLLUP_HEADER)),
+            lane=WRITE,
+        )
+        GOVERNOR.call('append_row', lambda: worksheet.append_row(ROLLUP_HEADER), lane=WRITE)
+        return worksheet
+
+    def _load(self) -> None:
+        """既存の行を読み込む."""
+        values = GOVERNOR.call(
+            'get_all_values', self.worksheet.get_all_values,
+            key=read_key(self.worksheet, 'get_all_values'),
+        )
+        self.rows = {}
+        for row_number, row in enumerate(values[1:], start=2):
+            parsed = _parse_row(row)
+            if parsed is not None:
+                key, total, sessions = parsed
+                self.rows[key] = [row_number, total, sessions]
+        self._next_row = len(values) + 1
+
+    def _current(self, key: RollupKey) -> Optional[List[int]]:
+        """key の行をシートの現在の内容で返す（行がなければ None）.
+
+        rebuild は行を並べ替え、GUI とコンソールを同時に動かせば別のプロセスも同じ行を
+        更新するため、保持している行番号と合計は書き込みの直前に読み直して確かめる。
+        行に別のキーが入っていればシート全体を読み直す。
+        """
+        cached = self.rows.get(key)
+        if cached is not None:
+            row_number = cached[0]
+            values = GOVERNOR.call('get', lambda: self.worksheet.get(f'A{row_number}:D{row_number}'))
+            parsed = _parse_row(values[0]) if values else None
+            if parsed is not None and parsed[0] == key:
+                self.rows[key] = [row_number, parsed[1], parsed[2]]
+                return self.rows[key]
+        self._load()
+        return self.rows.get(key)
+
+    def add(self, start: datetime, end: datetime, title: str) -> None:
+        """1セッション分を加算（開始日の行に計上）."""
+        key = (start.date().isoformat(), title)
+        seconds = int((end - start).total_seconds())
+        try:
+            current = self._current(key)
+            if current is not None:
+                row_number, total, sessions = current
+                values = [[total + seconds, sessions + 1]]
+                GOVERNOR.call(
+                    'update',
+                    lambda: self.worksheet.update(f'C{row_number}:D{row_number}', values),
+                    lane=WRITE,
+                )
+                self.rows[key] = [row_number, total + seconds, sessions + 1]
+            else:
+                GOVERNOR.call(
+                    'append_row',
+                    lambda: self.worksheet.append_row(
+                        [key[0], title, seconds, 1], value_input_option='RAW',
+                    ),
+                    lane=WRITE,
+                )
+                self.rows[key] = [self._next_row, seconds, 1]
+                self._next_row += 1
+        except gspread.exceptions.APIError as e:
+            self.output(f'ロールアップの更新に失敗しました（rebuild で再作成できます）: {e}')
+
+    def seconds_by_title(self, day: date) -> Dict[str, float]:
+        """指定日のゲームごとの合計秒数（メモリ上の値、通信なし）."""
+        day_text = day.isoformat()
+        return {
+            title: float(total)
+            for (row_date, title), (_, total, _) in self.rows.items()
+            if row_date == day_text
+        }
+
+    def rebuild(self, records: Iterable[LogRecord]) -> int:
+        """生ログのレコードからロールアップを作り直し、行数を返す."""
+        totals = aggregate(records)
+        values = [ROLLUP_HEADER] + [
+            [day, title, total, sessions]
+            for (day, title), (total, sessions) in sorted(totals.items())
+        ]
+        old_rows = self._next_row - 1
+        values += [[''] * len(ROLLUP_HEADER)] * max(0, old_rows - len(values))
+        if len(values) > self.worksheet.row_count:
+            # グリッドより大きい範囲への update は API がエラーにするため先に広げる
+            GOVERNOR.call('resize', lambda: self.worksheet.resize(rows=len(values)), lane=WRITE)
+        GOVERNOR.call(
+            'update',
+            lambda: self.worksheet.update('A1', values, value_input_option='RAW'),
+            lane=WRITE,
+        )
+        GOVERNOR.call('resize', lambda: self.worksheet.resize(rows=max(len(totals) + 1, 2)), lane=WRITE)
+        self._load()
+        return len(totals)
+
+
+def _parse_row(row: Sequence[str]) -> Optional[Tuple[RollupKey, int, int]]:
+    """ロールアップの1行を (キー, 合計秒数, セッション数) に変換（不正な行は None）."""
+    if len(row) < len(ROLLUP_HEADER) or not row[0]:
+        return None
+    try:
+        return (row[0], row[1]), int(float(row[2])), int(float(row[3]))
+    except ValueError:
+        return None
+
+
+def aggregate(records: Iterable[LogRecord]) -> Dict[RollupKey, Tuple[int, int]]:
+    """生ログのレコードを (日付, タイトル) ごとの (合計秒数, セッション数) に集計."""
+    totals: Dict[RollupKey, Tuple[int, int]] = {}
+    for record in records:
+        key = (record.start_datetime.date().isoformat(), record.title)
+        total, sessions = totals.get(key, (0, 0))
+        totals[key] = (total + record.duration, sessions + 1)
+    return totals
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """ロールアップ操作のエントリーポイント."""
+    parser = argparse.ArgumentParser(description='日別ロールアップの管理')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('rebuild', help='生ログ（アーカイブ含む）からロールアップを作り直す')
+    parser.parse_args(argv)
+
+    config = ConfigLoader()
+    log_handler = LogHandler()
+    rollup = DailyRollup(log_handler.spreadsheet, config.rollup['worksheet'])
+    records = query_records(log_handler, date.min, date.max)
+    rows = rollup.rebuild(records)
+    print(f'{len(records)}件のセッションから {rows}行のロールアップを作成しました')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
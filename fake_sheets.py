@@ -0,0 +1,534 @@
+"""Google Sheets API のインプロセス代替（オフラインでの結合テスト・レイテンシ計測用）.
+
+アプリが使う gspread の呼び出し（open_by_key / sheet1 / get_worksheet_by_id /
+worksheets / add_worksheet / get_all_records / get_all_values / get / col_values /
+append_row / append_rows / update / delete_rows / resize）を、メモリ上のスプレッドシートに対して
+実装する。各呼び出しを1リクエストとして数え、以下を再現できる。
+
+- リクエストごとのレイテンシ（latency 秒 + 0〜jitter 秒）
+- 毎分のクォータ超過（429 と Retry-After）
+- 任意のリクエストの失敗（fail_next）と確率的な 5xx（failure_rate）
+- USER_ENTERED の解釈（日時はシリアル値として保持）と FORMATTED_VALUE /
+  UNFORMATTED_VALUE / SERIAL_NUMBER の読み込み
+- グリッドの範囲外を読み書きした場合の 400
+
+    backend = FakeSheetsBackend(latency=0.05)
+    spreadsheet = backend.create_spreadsheet('log-key')
+    spreadsheet.seed_worksheet('log', [['index', 'start_time', ...], ...])
+    with backend.installed():          # gspread.service_account を差し替える
+        handler = LogHandler(config)
+    print(backend.requests)
+"""
+
+import copy
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import gspread
+
+from log_codec import (
+    SERIAL_NUMBER,
+    UNFORMATTED_VALUE,
+    format_datetime,
+    parse_datetime_text,
+    seconds_to_datetime,
+    seconds_to_serial,
+    serial_to_seconds,
+)
+
+DEFAULT_ROWS = 1000
+DEFAULT_COLS = 26
+QUOTA_WINDOW_SECONDS = 60.0
+RAW = 'RAW'
+USER_ENTERED = 'USER_ENTERED'
+FORMATTED_STRING = 'FORMATTED_STRING'
+
+_A1_PART = re.compile(r'^([A-Za-z]*)(\d*)$')
+_NUMBER = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')
+
+
+class _FakeResponse:
+    """gspread.exceptions.APIError に渡す requests.Response の代替."""
+
+    def __init__(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = message
+        self._error = {'code': status_code, 'message': message, 'status': 'FAKE'}
+
+    def json(self) -> dict:
+        return {'error': self._error}
+
+
+def _api_error(status: int, message: str, headers: Optional[Dict[str, str]] = None) -> Exception:
+    response = _FakeResponse(status, message, headers)
+    error = gspread.exceptions.APIError(response)
+    error.response = response
+    return error
+
+
+class _DateValue:
+    """日時として入力されたセル（シリアル値で保持し、表示時は日時文字列にする）."""
+
+    __slots__ = ('serial',)
+
+    def __init__(self, serial: float) -> None:
+        self.serial = serial
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _DateValue) and other.serial == self.serial
+
+
+# =============================================================================
+# バックエンド
+# =============================================================================
+class FakeSheetsBackend:
+    """メモリ上のスプレッドシート群と、リクエストの計数・遅延・エラー注入を管理するクラス."""
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        quota_per_minute: Optional[int] = None,
+        quota_window: float = QUOTA_WINDOW_SECONDS,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.quota_per_minute = quota_per_minute
+        self.quota_window = quota_window
+        self.failure_rate = failure_rate
+        self.clock = clock
+        self.sleep = sleep
+        self.spreadsheets: Dict[str, 'FakeSpreadsheet'] = {}
+        self.requests: Counter = Counter()
+        self.lock = threading.RLock()
+        self._rng = random.Random(seed)
+        self._failures: List[Tuple[Optional[str], int]] = []
+        self._window_start = clock()
+        self._window_count = 0
+
+    def create_spreadsheet(self, key: str) -> 'FakeSpreadsheet':
+        """スプレッドシートを作成（リクエストとしては数えない）."""
+        with self.lock:
+            spreadsheet = self.spreadsheets[key] = FakeSpreadsheet(self, key)
+            return spreadsheet
+
+    def client(self) -> 'FakeClient':
+        """gspread.Client の代替を返す."""
+        return FakeClient(self)
+
+    @contextmanager
+    def installed(self) -> Iterator['FakeSheetsBackend']:
+        """with の間、gspread.service_account がこのバックエンドのクライアントを返すようにする."""
+        original = getattr(gspread, 'service_account', None)
+        gspread.service_account = lambda filename=None, **kwargs: self.client()
+        try:
+            yield self
+        finally:
+            gspread.service_account = original
+
+    def fail_next(self, status: int = 503, *, count: int = 1, method: Optional[str] = None) -> None:
+        """次の count 回のリクエスト（method 指定時はそのメソッドのみ）を status で失敗させる."""
+        with self.lock:
+            self._failures.extend([(method, status)] * count)
+
+    @property
+    def total_requests(self) -> int:
+        """これまでのリクエスト総数."""
+        return sum(self.requests.values())
+
+    def reset_stats(self) -> None:
+        """リクエスト数の集計を消去."""
+        with self.lock:
+            self.requests.clear()
+
+    def request(self, method: str) -> None:
+        """1リクエスト分の計数・遅延・エラー注入を行う（各 API 呼び出しの先頭で呼ぶ）."""
+        with self.lock:
+            self.requests[method] += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            self.sleep(delay)
+
+        with self.lock:
+            self._check_quota()
+            for i, (only, status) in enumerate(self._failures):
+                if only is None or only == method:
+                    del self._failures[i]
+                    raise _api_error(status, f'injected failure for {method}')
+            if self.failure_rate and self._rng.random() < self.failure_rate:
+                raise _api_error(503, f'random failure for {method}')
+
+    def _check_quota(self) -> None:
+        if self.quota_per_minute is None:
+            return
+        now = self.clock()
+        if now - self._window_start >= self.quota_window:
+            self._window_start = now
+            self._window_count = 0
+        if self._window_count >= self.quota_per_minute:
+            # 切り捨てると窓が終わる直前に再試行して再び 429 になるため切り上げる
+            retry_after = math.ceil((self._window_start + self.quota_window - now) * 1000) / 1000
+            raise _api_error(
+                429,
+                'Quota exceeded for quota metric \'Read requests\'',
+                {'Retry-After': f'{retry_after:g}'},
+            )
+        self._window_count += 1
+
+
+class FakeClient:
+    """gspread.Client の代替."""
+
+    def __init__(self, backend: FakeSheetsBackend) -> None:
+        self.backend = backend
+
+    def open_by_key(self, key: str) -> 'FakeSpreadsheet':
+        self.backend.request('open_by_key')
+        spreadsheet = self.backend.spreadsheets.get(key)
+        if spreadsheet is None:
+            raise _api_error(404, f'Requested entity was not found: {key}')
+        return spreadsheet
+
+
+# =============================================================================
+# スプレッドシート / ワークシート
+# =============================================================================
+class FakeSpreadsheet:
+    """gspread.Spreadsheet の代替."""
+
+    def __init__(self, backend: FakeSheetsBackend, key: str) -> None:
+        self.backend = backend
+        self.id = key
+        self._worksheets: List['FakeWorksheet'] = []
+        self._next_id = 0
+
+    def seed_worksheet(
+        self,
+        title: str,
+        values: Sequence[Sequence[object]] = (),
+        *,
+        sheet_id: Optional[int] = None,
+        value_input_option: str = USER_ENTERED,
+        rows: Optional[int] = None,
+        cols: Optional[int] = None,
+    ) -> 'FakeWorksheet':
+        """初期データ付きのワークシートを作成（リクエストとしては数えない）."""
+        with self.backend.lock:
+            width = max((len(row) for row in values), default=0)
+            worksheet = self._create(
+                title,
+                rows if rows is not None else max(len(values), DEFAULT_ROWS),
+                cols if cols is not None else max(width, DEFAULT_COLS),
+                sheet_id,
+            )
+            for r, row in enumerate(values):
+                worksheet.cells[r][:len(row)] = [_parse_input(v, value_input_option) for v in row]
+            return worksheet.reopen()
+
+    def _create(self, title: str, rows: int, cols: int, sheet_id: Optional[int]) -> 'FakeWorksheet':
+        if any(ws.title == title for ws in self._worksheets):
+            raise _api_error(400, f'A sheet with the name "{title}" already exists.')
+        if sheet_id is None:
+            sheet_id = self._next_id
+        self._next_id = max(self._next_id, sheet_id) + 1
+        worksheet = FakeWorksheet(self, sheet_id, title, rows, cols)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    @property
+    def sheet1(self) -> 'FakeWorksheet':
+        self.backend.request('sheet1')
+        if not self._worksheets:
+            raise _api_error(404, 'No worksheets')
+        return self._worksheets[0].reopen()
+
+    def worksheets(self) -> List['FakeWorksheet']:
+        self.backend.request('worksheets')
+        return [worksheet.reopen() for worksheet in self._worksheets]
+
+    def get_worksheet_by_id(self, sheet_id) -> 'FakeWorksheet':
+        self.backend.request('get_worksheet_by_id')
+        for worksheet in self._worksheets:
+            if worksheet.id == int(sheet_id):
+                return worksheet.reopen()
+        not_found = getattr(gspread.exceptions, 'WorksheetNotFound', LookupError)
+        raise not_found(f'worksheet id {sheet_id} not found')
+
+    def add_worksheet(self, title: str, rows: int, cols: int, index: Optional[int] = None) -> 'FakeWorksheet':
+        self.backend.request('add_worksheet')
+        with self.backend.lock:
+            return self._create(title, int(rows), int(cols), None).reopen()
+
+
+class FakeWorksheet:
+    """gspread.Worksheet の代替（セルは入力を解釈した値で保持）.
+
+    gspread と同様に row_count / col_count は取得した時点の値で、append_row などで
+    グリッドが広がっても更新されない（resize した場合のみ更新される）。取得し直すと
+    最新の値になる。
+    """
+
+    def __init__(self, spreadsheet: FakeSpreadsheet, sheet_id: int, title: str, rows: int, cols: int) -> None:
+        self.spreadsheet = spreadsheet
+        self.spreadsheet_id = spreadsheet.id
+        self.id = sheet_id
+        self.title = title
+        self.cells: List[List[object]] = [[''] * cols for _ in range(rows)]
+        self.row_count = rows
+        self.col_count = cols
+
+    def reopen(self) -> 'FakeWorksheet':
+        """同じセルを共有し、現在の行数・列数を持つ新しいハンドルを返す（ワークシートの取得に相当）."""
+        handle = copy.copy(self)
+        handle.row_count = self._grid_rows
+        handle.col_count = self._grid_cols
+        return handle
+
+    @property
+    def _backend(self) -> FakeSheetsBackend:
+        return self.spreadsheet.backend
+
+    @property
+    def _grid_rows(self) -> int:
+        return len(self.cells)
+
+    @property
+    def _grid_cols(self) -> int:
+        return len(self.cells[0]) if self.cells else 0
+
+    # --- 読み込み -----------------------------------------------------------
+    def get(
+        self,
+        range_name: Optional[str] = None,
+        *,
+        value_render_option: Optional[str] = None,
+        date_time_render_option: Optional[str] = None,
+        **kwargs,
+    ) -> List[list]:
+        self._backend.request('get')
+        with self._backend.lock:
+            return self._read(range_name, value_render_option, date_time_render_option)
+
+    def get_all_values(
+        self,
+        *,
+        value_render_option: Optional[str] = None,
+        date_time_render_option: Optional[str] = None,
+        **kwargs,
+    ) -> List[list]:
+        self._backend.request('get_all_values')
+        with self._backend.lock:
+            values = self._read(None, value_render_option, date_time_render_option)
+        # gspread は矩形になるよう空文字で埋める
+        width = max((len(row) for row in values), default=0)
+        return [row + [''] * (width - len(row)) for row in values]
+
+    def get_all_records(self, head: int = 1, **kwargs) -> List[dict]:
+        self._backend.request('get_all_records')
+        with self._backend.lock:
+            values = self._read(None, None, None)
+        if len(values) < head:
+            return []
+        header = values[head - 1]
+        records = []
+        for row in values[head:]:
+            row = row + [''] * (len(header) - len(row))
+            records.append({key: _numericise(value) for key, value in zip(header, row)})
+        return records
+
+    def col_values(self, col: int, **kwargs) -> List[object]:
+        self._backend.request('col_values')
+        with self._backend.lock:
+            values = [_render(row[col - 1], None, None) if col <= len(row) else '' for row in self.cells]
+        return _trim(values)
+
+    # --- 書き込み -----------------------------------------------------------
+    def append_row(self, values: Sequence[object], value_input_option: str = RAW, **kwargs) -> dict:
+        return self._append('append_row', [values], value_input_option)
+
+    def append_rows(self, values: Sequence[Sequence[object]], value_input_option: str = RAW, **kwargs) -> dict:
+        return self._append('append_rows', values, value_input_option)
+
+    def update(self, range_name: str, values: Sequence[Sequence[object]] = None, **kwargs) -> dict:
+        self._backend.request('update')
+        value_input_option = kwargs.get('value_input_option') or RAW
+        with self._backend.lock:
+            r1, c1, _, _ = self._parse_range(range_name, check=False)
+            height = len(values)
+            width = max((len(row) for row in values), default=0)
+            if r1 + height - 1 > self._grid_rows or c1 + width - 1 > self._grid_cols:
+                raise _api_error(
+                    400,
+                    f'Range ({self.title}!{range_name}) exceeds grid limits. '
+                    f'Max rows: {self._grid_rows}, max columns: {self._grid_cols}',
+                )
+            for r, row in enumerate(values):
+                target = self.cells[r1 - 1 + r]
+                for c, value in enumerate(row):
+                    target[c1 - 1 + c] = _parse_input(value, value_input_option)
+        return {'updatedRows': height}
+
+    def delete_rows(self, start_index: int, end_index: Optional[int] = None) -> None:
+        self._backend.request('delete_rows')
+        end_index = end_index or start_index
+        with self._backend.lock:
+            if not 1 <= start_index <= end_index <= self._grid_rows:
+                raise _api_error(400, f'Invalid rows {start_index}:{end_index} (max rows: {self._grid_rows})')
+            del self.cells[start_index - 1:end_index]
+
+    def resize(self, rows: Optional[int] = None, cols: Optional[int] = None) -> None:
+        self._backend.request('resize')
+        with self._backend.lock:
+            if rows is not None:
+                rows = int(rows)
+                del self.cells[rows:]
+                self.cells.extend([''] * self._grid_cols for _ in range(rows - len(self.cells)))
+            if cols is not None:
+                cols = int(cols)
+                for row in self.cells:
+                    del row[cols:]
+                    row.extend([''] * (cols - len(row)))
+            # gspread も resize したハンドルのプロパティだけは更新する
+            self.row_count = self._grid_rows
+            self.col_count = self._grid_cols
+
+    # --- 内部処理 -----------------------------------------------------------
+    def _append(self, method: str, rows: Sequence[Sequence[object]], value_input_option: str) -> dict:
+        self._backend.request(method)
+        with self._backend.lock:
+            # 値のある最後の行の次から書き込み、足りなければグリッドを広げる（API の OVERWRITE と同じ）
+            start = self._last_used_row()
+            width = max([self._grid_cols] + [len(row) for row in rows])
+            for row in self.cells:
+                row.extend([''] * (width - len(row)))
+            needed = start + len(rows) - self._grid_rows
+            self.cells.extend([''] * width for _ in range(max(0, needed)))
+            for r, row in enumerate(rows):
+                self.cells[start + r][:len(row)] = [_parse_input(v, value_input_option) for v in row]
+        return {'updates': {'updatedRows': len(rows)}}
+
+    def _last_used_row(self) -> int:
+        for r in range(len(self.cells) - 1, -1, -1):
+            if any(value != '' for value in self.cells[r]):
+                return r + 1
+        return 0
+
+    def _read(
+        self,
+        range_name: Optional[str],
+        value_render_option: Optional[str],
+        date_time_render_option: Optional[str],
+    ) -> List[list]:
+        r1, c1, r2, c2 = self._parse_range(range_name)
+        rows = [
+            _trim([_render(v, value_render_option, date_time_render_option) for v in row[c1 - 1:c2]])
+            for row in self.cells[r1 - 1:r2]
+        ]
+        # API は末尾の空行を返さない
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def _parse_range(self, range_name: Optional[str], check: bool = True) -> Tuple[int, int, int, int]:
+        """A1 表記の範囲を (開始行, 開始列, 終了行, 終了列)（1 始まり・両端含む）に変換."""
+        if not range_name:
+            return 1, 1, self._grid_rows, self._grid_cols
+        range_name = range_name.split('!')[-1]
+        parts = range_name.split(':')
+        start = _parse_a1(parts[0])
+        end = _parse_a1(parts[-1])
+        r1, c1 = start[0] or 1, start[1] or 1
+        r2 = end[0] or self._grid_rows
+        c2 = end[1] or self._grid_cols
+        if check and (r2 > self._grid_rows or c2 > self._grid_cols):
+            raise _api_error(
+                400,
+                f'Range ({self.title}!{range_name}) exceeds grid limits. '
+                f'Max rows: {self._grid_rows}, max columns: {self._grid_cols}',
+            )
+        return r1, c1, r2, c2
+
+
+# =============================================================================
+# 値の変換
+# =============================================================================
+def _parse_a1(part: str) -> Tuple[Optional[int], Optional[int]]:
+    match = _A1_PART.match(part.strip())
+    if match is None:
+        raise _api_error(400, f'Unable to parse range: {part}')
+    letters, digits = match.groups()
+    col = 0
+    for letter in letters.upper():
+        col = col * 26 + ord(letter) - ord('A') + 1
+    return (int(digits) if digits else None), (col or None)
+
+
+def _parse_input(value: object, value_input_option: str) -> object:
+    """書き込まれた値をセルの値に変換（USER_ENTERED なら数値・真偽値・日時を解釈）."""
+    if value is None:
+        return ''
+    if value_input_option != USER_ENTERED or not isinstance(value, str):
+        return value
+    if value.startswith("'"):
+        return value[1:]
+    if value.upper() in ('TRUE', 'FALSE'):
+        return value.upper() == 'TRUE'
+    seconds = parse_datetime_text(value)
+    if seconds is not None:
+        return _DateValue(seconds_to_serial(seconds))
+    if _NUMBER.match(value):
+        number = float(value)
+        return int(number) if number.is_integer() and '.' not in value and 'e' not in value.lower() else number
+    return value
+
+
+def _render(value: object, value_render_option: Optional[str], date_time_render_option: Optional[str]) -> object:
+    """セルの値を読み込みオプションに従って返す（既定は FORMATTED_VALUE）."""
+    if value_render_option == UNFORMATTED_VALUE:
+        if isinstance(value, _DateValue):
+            if date_time_render_option == FORMATTED_STRING:
+                return _format_date(value)
+            return value.serial
+        return value
+    if isinstance(value, _DateValue):
+        return _format_date(value)
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _format_date(value: _DateValue) -> str:
+    return format_datetime(seconds_to_datetime(serial_to_seconds(value.serial)))
+
+
+def _numericise(value: object) -> object:
+    """gspread の get_all_records と同様に数値らしい文字列を数値に変換."""
+    if isinstance(value, str) and _NUMBER.match(value):
+        number = float(value)
+        return int(number) if number.is_integer() and '.' not in value else number
+    return value
+
+
+def _trim(values: List[object]) -> List[object]:
+    """末尾の空セルを除く（API の応答と同じ形にする）."""
+    end = len(values)
+    while end and values[end - 1] == '':
+        end -= 1
+    return values[:end]
+
+
+__all__ = ['FakeSheetsBackend', 'FakeClient', 'FakeSpreadsheet', 'FakeWorksheet', 'SERIAL_NUMBER']
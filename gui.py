@@ -1,24 +1,44 @@
 """PySide6 GUI for Game Time Tracker."""
 
 import json
+import os
 import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Sequence, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from PySide6.QtCore import QTimer, Qt
 from PySide6.QtGui import QCloseEvent, QMouseEvent, QResizeEvent
 from PySide6.QtWidgets import QApplication, QWidget
 
-from config_loader import DEFAULT_BROWSERS, DEFAULT_EXCLUDED_TITLES, ConfigLoader
+from config_loader import (
+    CONFIG_POLL_INTERVAL_SECONDS,
+    DEFAULT_BROWSERS,
+    DEFAULT_EXCLUDED_TITLES,
+    ConfigLoader,
+    ConfigWatcher,
+)
 from gui_layout import LayoutWidgets, build_main_layout
+from log_codec import LogRecord
 from log_handler import LogHandler
+from metrics import METRICS, configure_from
+from sheets_governor import configure_from as configure_governor_from
+from process_source import ProcessSource
+from task_graph import TaskGraph
+from play_stats import sum_minutes_by_title_on, sum_seconds_on
 from main import (
+    GameCatalog,
     GameEntry,
     GameInfoLoader,
     SessionRecorder,
     WindowScanner,
     _format_elapsed,
+    _open_rollup,
+    apply_config_change,
+    open_process_source,
+    remap_active,
     MIN_PLAY_MINUTES,
     POLL_INTERVAL_SECONDS,
     Messages,
@@ -27,6 +47,7 @@ from main import (
 STATE_FILE = Path("window_state.txt")
 BASE_TITLE = "Game Time Tracker"
 UI_REFRESH_INTERVAL_SECONDS = 0.1
+METRICS_CHECK_INTERVAL_SECONDS = 5
 DISPLAY_MODES = ("max", "mid", "min")
 MODE_DEFAULT_SIZES = {
     "max": (480, 400),
@@ -35,6 +56,7 @@ MODE_DEFAULT_SIZES = {
 }
 MAX_WIDGET_HEIGHT = 16777215  # Qt default max height
 TIME_FRACTION_PRECISION = 10  # 0.1秒単位での時間表示精度
+STATUS_NOTICE_SECONDS = 5  # 設定の再読み込みなどのお知らせをタイトルバーに残す秒数
 
 
 class WindowState:
@@ -109,6 +131,10 @@ class MainWindow(QWidget):
 
         self.games: List[GameEntry] = []
         self.browsers: Sequence[str] = DEFAULT_BROWSERS
+        self.normalize: bool = False
+        self.process_source: Optional[ProcessSource] = None
+        self.catalog: GameCatalog
+        self.active_games: Dict[int, GameEntry] = {}
         self.scanner: WindowScanner
         self.recorder: SessionRecorder
         self.today_completed_seconds: float = 0.0
@@ -116,10 +142,17 @@ class MainWindow(QWidget):
         self.latest_window_titles: List[str] = []
         self.last_today_games_content: str = ""
         self.today_game_minutes_cache: Dict[str, float] = {}
+        self.config_watcher: Optional[ConfigWatcher] = None
+        self.status_notice_until: float = 0.0
+        # ゲーム情報の再読み込みは通信を伴うため UI スレッドの外で行う
+        self.game_info_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='game-info')
+        self.game_info_future: Optional[Future] = None
         self._init_components()
 
         self._start_timer(POLL_INTERVAL_SECONDS, self._scan_tick)
         self._start_timer(UI_REFRESH_INTERVAL_SECONDS, self._ui_tick)
+        self._start_timer(METRICS_CHECK_INTERVAL_SECONDS, METRICS.maybe_dump)
+        self._start_timer(CONFIG_POLL_INTERVAL_SECONDS, self._check_config)
 
         # 初回更新
         self._scan_tick()
@@ -128,6 +161,8 @@ class MainWindow(QWidget):
     def closeEvent(self, event: QCloseEvent) -> None:
         """ウィンドウ状態を保存."""
         self._save_window_state()
+        METRICS.dump()
+        self.game_info_executor.shutdown(wait=False, cancel_futures=True)
         super().closeEvent(event)
 
     def _start_timer(self, interval_seconds: float, callback) -> QTimer:
@@ -139,9 +174,23 @@ class MainWindow(QWidget):
         return timer
 
     def _init_components(self) -> None:
-        """設定を読み込みコンポーネントを初期化."""
+        """設定を読み込みコンポーネントを初期化.
+
+        ゲーム情報とログシートの読み込みは互いに依存しないため並列に行う。
+        ログは LogHandler の接続時に1回だけ取得し、index の採番と今日の集計で共有する。
+        """
         config = ConfigLoader()
-        games = GameInfoLoader(config).load()
+        configure_from(config.metrics)
+        configure_governor_from(config.sheets)
+
+        graph = TaskGraph()
+        graph.add('games', GameInfoLoader(config).load)
+        graph.add('log_handler', lambda: LogHandler(config))
+        graph.add('rollup', lambda log_handler: _open_rollup(config, log_handler), 'log_handler')
+        graph.add('process_source', lambda: open_process_source(config))
+        loaded = graph.run()
+
+        games = loaded['games']
         if not games:
             self._set_status('ゲーム情報が取得できませんでした（config.ini を確認）')
             self.setDisabled(True)
@@ -149,18 +198,27 @@ class MainWindow(QWidget):
 
         self.games = games
         self.browsers = config.window_scan.get('browsers', DEFAULT_BROWSERS)
+        self.normalize = config.window_scan.get('normalize', False)
+        self.process_source = loaded['process_source']
+        self.catalog = GameCatalog(
+            games, self.browsers, self.normalize, use_processes=self.process_source is not None,
+        )
+        # 自身のウィンドウはタイトルが変わっても PID とハンドルで除外する
         self.scanner = WindowScanner(
-            excluded_titles=(
-                list(config.window_scan.get('excluded_titles', DEFAULT_EXCLUDED_TITLES))
-                + [BASE_TITLE, self.windowTitle()]
-            )
+            excluded_titles=config.window_scan.get('excluded_titles', DEFAULT_EXCLUDED_TITLES),
+            excluded_pids=[os.getpid()],
+            excluded_handles=[int(self.winId())],
         )
+        log_handler = loaded['log_handler']
         self.recorder = SessionRecorder(
-            log_handler=LogHandler(),
+            log_handler=log_handler,
             min_play_minutes=MIN_PLAY_MINUTES,
+            rollup=loaded['rollup'],
         )
-        self.today_completed_seconds = self._load_today_completed_seconds()
-        self.today_game_minutes_cache = self._load_today_game_minutes()
+        self.today_completed_seconds = self._load_today_completed_seconds(log_handler.typed_records)
+        self.today_game_minutes_cache = self._load_today_game_minutes(log_handler.typed_records)
+        # 間隔はタイマーで制御するため、watcher 側では毎回 stat する
+        self.config_watcher = ConfigWatcher(config, interval=0)
         self._apply_display_mode()
         self._apply_mode_geometry()
         self._set_status(Messages.NO_GAME_PLAYING)
@@ -170,39 +228,106 @@ class MainWindow(QWidget):
         if not self.games:
             return
 
-        window_titles = self.scanner.get_titles()
-        active_games = self._update_game_states(window_titles)
+        with METRICS.timer('gui_tick_seconds', phase='scan'):
+            window_titles = self.scanner.get_titles()
+            executables = self.process_source.get_executables() if self.process_source else None
+        with METRICS.timer('gui_tick_seconds', phase='match'):
+            active_games = self._update_game_states(window_titles, executables)
 
         self.latest_window_titles = window_titles
         self.active_games_cache = active_games
-        self._update_active_list(active_games)
-        self._update_window_list(window_titles)
+        with METRICS.timer('gui_tick_seconds', phase='widgets'):
+            self._update_active_list(active_games)
+            self._update_window_list(window_titles)
 
         if active_games:
             self._set_status('プレイ時間計測中')
         else:
             self._set_status(Messages.NO_GAME_PLAYING)
 
-    def _update_game_states(self, window_titles: List[str]) -> List[GameEntry]:
+    def _update_game_states(
+        self,
+        window_titles: List[str],
+        executables: Optional[Sequence[str]] = None,
+    ) -> List[GameEntry]:
         """ゲーム状態を更新し、アクティブなゲームを返す."""
-        active_games: List[GameEntry] = []
-        for game in self.games:
-            detected = any(
-                game.matches_window(title, self.browsers)
-                for title in window_titles
-            )
-            if detected and not game.is_playing:
-                game.start_session()
-            elif not detected and game.is_playing:
-                recorded_seconds = self.recorder.record(game)
-                if recorded_seconds:
-                    self.today_completed_seconds += recorded_seconds
-                    # 記録後にキャッシュを更新
-                    self.today_game_minutes_cache = self._load_today_game_minutes()
-
-            if game.is_playing:
-                active_games.append(game)
-        return active_games
+        detected = self.catalog.detect(window_titles)
+        if executables is not None:
+            detected |= self.catalog.detect_processes(executables)
+
+        for game_id in detected.difference(self.active_games):
+            game = self.catalog.games[game_id]
+            game.start_session()
+            self.active_games[game_id] = game
+
+        for game_id in [game_id for game_id in self.active_games if game_id not in detected]:
+            self._record_session(self.active_games.pop(game_id))
+
+        return [self.active_games[game_id] for game_id in sorted(self.active_games)]
+
+    def _record_session(self, game: GameEntry) -> None:
+        """セッションを記録し、今日の集計に反映."""
+        recorded_seconds = self.recorder.record(game)
+        if recorded_seconds:
+            self.today_completed_seconds += recorded_seconds
+            # 記録後にキャッシュを更新（ロールアップ有効時は通信なし）
+            self.today_game_minutes_cache = self._load_today_game_minutes()
+
+    def _check_config(self) -> None:
+        """config.ini の更新を検出したら反映（プレイ中のセッションは維持）."""
+        if self.config_watcher is None:
+            return
+        self._apply_loaded_game_info()
+        change = self.config_watcher.poll()
+        if change is None:
+            return
+        config, changed = change
+
+        reconnected = apply_config_change(config, changed, self.recorder)
+        if reconnected or 'rollup' in changed:
+            # 再接続した場合は接続時に読み込んだログを使う
+            records = self.recorder.log_handler.typed_records if reconnected else None
+            self.today_completed_seconds = self._load_today_completed_seconds(records)
+            self.today_game_minutes_cache = self._load_today_game_minutes(records)
+
+        if 'game_info' in changed:
+            # 読み込み結果は次回以降の _check_config で反映する（新しい要求があれば古い結果は捨てる）
+            self.game_info_future = self.game_info_executor.submit(GameInfoLoader(config).load)
+        if 'window_scan' in changed:
+            self.browsers = config.window_scan['browsers']
+            self.normalize = config.window_scan['normalize']
+            if config.window_scan['process_detection'] != (self.process_source is not None):
+                self.process_source = open_process_source(config)
+            self.scanner.set_excluded_titles(config.window_scan['excluded_titles'])
+            self._replace_catalog(self.catalog.games)
+        self._set_status(f'設定を再読み込みしました（{", ".join(sorted(changed))}）', notice=True)
+
+    def _apply_loaded_game_info(self) -> None:
+        """バックグラウンドで読み込んだゲーム情報が揃っていればカタログに反映."""
+        future = self.game_info_future
+        if future is None or not future.done():
+            return
+        self.game_info_future = None
+        try:
+            games = future.result()
+        except Exception as e:
+            self._set_status(f'ゲーム情報の再読み込みに失敗しました: {e}', notice=True)
+            return
+        if not games:
+            self._set_status('ゲーム情報が取得できなかったため、以前の情報を使います', notice=True)
+            return
+        self._replace_catalog(games)
+        self._set_status(f'ゲーム情報を再読み込みしました（{len(games)}件）', notice=True)
+
+    def _replace_catalog(self, games: Sequence[GameEntry]) -> None:
+        """カタログを作り直し、プレイ中のセッションを新しいカタログに引き継ぐ."""
+        self.catalog = GameCatalog(
+            games, self.browsers, self.normalize, use_processes=self.process_source is not None,
+        )
+        self.games = list(self.catalog.games)
+        self.active_games, removed = remap_active(self.active_games, self.catalog)
+        for game in removed:
+            self._record_session(game)
 
     def _update_active_list(self, active_games: List[GameEntry]) -> None:
         """プレイ中ゲームリストを更新."""
@@ -240,26 +365,17 @@ class MainWindow(QWidget):
         for title in window_titles:
             self.w.window_list.addItem(title)
 
-    def _load_today_game_minutes(self) -> Dict[str, float]:
-        """Googleスプレッドシートから今日プレイしたゲームごとの分数を集計."""
-        game_minutes: Dict[str, float] = {}
-        today = datetime.now().date()
+    def _load_today_game_minutes(self, records: Optional[List[LogRecord]] = None) -> Dict[str, float]:
+        """Googleスプレッドシートから今日プレイしたゲームごとの分数を集計（records があれば再取得しない）."""
+        if self.recorder.rollup is not None:
+            seconds = self.recorder.rollup.seconds_by_title(datetime.now().date())
+            return {title: total / 60 for title, total in seconds.items()}
         try:
-            records = self.recorder.log_handler.get_all_records()
-            for record in records:
-                try:
-                    start = datetime.strptime(str(record['start_time']), "%Y/%m/%d %H:%M:%S")
-                    end = datetime.strptime(str(record['end_time']), "%Y/%m/%d %H:%M:%S")
-                    game_title = str(record.get('title', '不明'))
-                except (ValueError, KeyError):
-                    continue
-                if start.date() != today:
-                    continue
-                minutes = (end - start).total_seconds() / 60
-                game_minutes[game_title] = game_minutes.get(game_title, 0) + minutes
+            if records is None:
+                records = self.recorder.log_handler.get_typed_records()
+            return sum_minutes_by_title_on(records, datetime.now().date())
         except Exception:
-            pass
-        return game_minutes
+            return {}
 
     def _update_today_games_list(self) -> None:
         """今日プレイしたゲームの一覧と時間を更新."""
@@ -286,25 +402,17 @@ class MainWindow(QWidget):
             for game_title, minutes in sorted_games:
                 self.w.today_games_list.addItem(f'{game_title}: {int(minutes)}分')
 
-    def _load_today_completed_seconds(self) -> float:
-        """起動時に今日分の完了プレイ時間をロード."""
-        total = 0.0
-        today = datetime.now().date()
+    def _load_today_completed_seconds(self, records: Optional[List[LogRecord]] = None) -> float:
+        """起動時に今日分の完了プレイ時間をロード（records があれば再取得しない）."""
+        if self.recorder.rollup is not None:
+            return sum(self.recorder.rollup.seconds_by_title(datetime.now().date()).values())
         try:
-            records = self.recorder.log_handler.get_all_records()
-            for record in records:
-                try:
-                    start = datetime.strptime(str(record['start_time']), "%Y/%m/%d %H:%M:%S")
-                    end = datetime.strptime(str(record['end_time']), "%Y/%m/%d %H:%M:%S")
-                except (ValueError, KeyError):
-                    continue
-                if start.date() != today:
-                    continue
-                total += (end - start).total_seconds()
+            if records is None:
+                records = self.recorder.log_handler.get_typed_records()
+            return sum_seconds_on(records, datetime.now().date())
         except Exception:
             # ログハンドラのエラーは無視（初回起動時など）
-            pass
-        return total
+            return 0.0
 
     def _save_window_state(self) -> None:
         """ウィンドウ位置・サイズ・表示モードを保存."""
@@ -314,12 +422,18 @@ class MainWindow(QWidget):
         # 保存
         WindowState.save(STATE_FILE, geom.x(), geom.y(), self.display_mode, self.mode_sizes)
 
-    def _set_status(self, message: str) -> None:
-        """ステータスメッセージをタイトルバーに反映。"""
+    def _set_status(self, message: str, *, notice: bool = False) -> None:
+        """ステータスメッセージをタイトルバーに反映。
+
+        notice=True のお知らせは STATUS_NOTICE_SECONDS の間、通常のステータスで上書きしない。
+        """
+        now = time.monotonic()
+        if notice:
+            self.status_notice_until = now + STATUS_NOTICE_SECONDS
+        elif now < self.status_notice_until:
+            return
         title = f"{BASE_TITLE} - {message}" if message else BASE_TITLE
         self.setWindowTitle(title)
-        if hasattr(self, "scanner"):
-            self.scanner.excluded_titles.add(title)
 
     def _apply_mode_geometry(self) -> None:
         """表示モードに応じたサイズを適用."""
@@ -408,9 +522,10 @@ class MainWindow(QWidget):
     def _ui_tick(self) -> None:
         """UIだけを高速更新（0.1秒間隔）."""
         # セッション時間と今日の合計時間のみ更新（リストはスキャン時に更新）
-        self._update_session_times(self.active_games_cache)
-        self._update_today_totals(self.active_games_cache)
-        self._update_today_games_list()
+        with METRICS.timer('gui_tick_seconds', phase='ui'):
+            self._update_session_times(self.active_games_cache)
+            self._update_today_totals(self.active_games_cache)
+            self._update_today_games_list()
 
 
 def main() -> None:
@@ -0,0 +1,278 @@
+"""過去のプレイ履歴（CSV エクスポートなど）をログシートへ一括取り込みするコマンド.
+
+    python history_import.py export.csv other_tracker.tsv --state import_state.json
+
+入力はストリームで読み込み、ログシートの列構成
+``index, start_time, end_time, title, play_with_friends`` に正規化する。
+既存セッション（アーカイブ済みを含む）とは (start_time, title) で重複を除き、chunk_rows 行ずつ
+append_rows でまとめて書き込む。進捗は state ファイルに保存され、
+中断後に同じコマンドを再実行すると続きから再開する。
+"""
+
+import argparse
+import csv
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+import gspread
+
+from log_archive import open_archives, read_archive
+from log_codec import datetime_to_seconds
+from log_handler import LogHandler
+
+DEFAULT_CHUNK_ROWS = 1000
+GSS_DATETIME_FORMAT = '%Y/%m/%d %H:%M:%S'
+
+# 他ツールのエクスポートで使われる列名 → ログシートの列名
+COLUMN_ALIASES = {
+    'start_time': ('start_time', 'start', 'started_at', 'start_at', 'begin', '開始', '開始時刻'),
+    'end_time': ('end_time', 'end', 'ended_at', 'end_at', 'finish', '終了', '終了時刻'),
+    'title': ('title', 'game_title', 'game', 'name', 'ゲーム', 'タイトル'),
+    'play_with_friends': ('play_with_friends', 'with_friends', 'multiplayer', 'フレンド'),
+    'duration_minutes': ('duration_minutes', 'minutes', 'playtime_minutes', 'プレイ時間(分)'),
+    'duration_seconds': ('duration_seconds', 'seconds', 'playtime_seconds', 'duration'),
+}
+DATETIME_FORMATS = (
+    GSS_DATETIME_FORMAT,
+    '%Y/%m/%d %H:%M',
+    '%Y-%m-%d %H:%M',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+)
+TRUE_VALUES = {'true', '1', 'yes', 'y', 'はい', '○'}
+
+Session = Tuple[datetime, datetime, str, bool]
+
+
+@dataclass
+class ImportStats:
+    """取り込み結果の集計."""
+
+    read: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    skipped_resumed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+# =============================================================================
+# 正規化
+# =============================================================================
+def parse_datetime(value: str) -> Optional[datetime]:
+    """よく使われる日時表記をローカル時刻の naive datetime に変換."""
+    text = value.strip()
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = None
+        for fmt in DATETIME_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+    if parsed is None:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.replace(microsecond=0)
+
+
+def _resolve_columns(fieldnames: Sequence[str]) -> Dict[str, str]:
+    """入力ファイルの列名を正規化後の列名に対応付ける."""
+    lowered = {name.strip().lower(): name for name in fieldnames if name}
+    resolved = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias.lower() in lowered:
+                resolved[canonical] = lowered[alias.lower()]
+                break
+    return resolved
+
+
+def normalize_row(row: Mapping[str, str], columns: Mapping[str, str]) -> Optional[Session]:
+    """1行をセッション (start, end, title, play_with_friends) に変換（不正なら None）."""
+    def get(name: str) -> str:
+        column = columns.get(name)
+        return (row.get(column) or '').strip() if column else ''
+
+    start = parse_datetime(get('start_time'))
+    title = get('title')
+    if start is None or not title:
+        return None
+
+    end = parse_datetime(get('end_time'))
+    if end is None:
+        try:
+            if get('duration_seconds'):
+                end = start + timedelta(seconds=float(get('duration_seconds')))
+            elif get('duration_minutes'):
+                end = start + timedelta(minutes=float(get('duration_minutes')))
+        except ValueError:
+            return None
+    if end is None or end < start:
+        return None
+
+    play_with_friends = get('play_with_friends').lower() in TRUE_VALUES
+    return start, end.replace(microsecond=0), title, play_with_friends
+
+
+def read_sessions(path: Path) -> Iterator[Optional[Session]]:
+    """入力ファイルを1行ずつ正規化して返す（不正な行は None）."""
+    delimiter = '\t' if path.suffix.lower() in ('.tsv', '.tab') else ','
+    with path.open(encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        columns = _resolve_columns(reader.fieldnames or [])
+        if 'start_time' not in columns or 'title' not in columns:
+            raise ValueError(f'{path}: 開始時刻またはタイトルの列が見つかりません（列: {reader.fieldnames}）')
+        for row in reader:
+            yield normalize_row(row, columns)
+
+
+# =============================================================================
+# 取り込み
+# =============================================================================
+class ImportState:
+    """ファイルごとの処理済み行数を保存し、再実行時に再開するための状態."""
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+        self.offsets: Dict[str, int] = {}
+        if path and path.exists():
+            self.offsets = json.loads(path.read_text(encoding='utf-8')).get('offsets', {})
+
+    def offset(self, source: Path) -> int:
+        """処理済み行数を返す."""
+        return self.offsets.get(str(source.resolve()), 0)
+
+    def advance(self, source: Path, offset: int) -> None:
+        """処理済み行数を更新して保存."""
+        self.offsets[str(source.resolve())] = offset
+        if self.path:
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            tmp.write_text(json.dumps({'offsets': self.offsets}, ensure_ascii=False, indent=2), encoding='utf-8')
+            tmp.replace(self.path)
+
+
+class HistoryImporter:
+    """正規化したセッションを重複除去してログシートへ一括追記するクラス."""
+
+    def __init__(
+        self,
+        log_handler: LogHandler,
+        *,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        state: Optional[ImportState] = None,
+        dry_run: bool = False,
+    ) -> None:
+        self.log_handler = log_handler
+        self.chunk_rows = chunk_rows
+        self.state = state or ImportState(None)
+        self.dry_run = dry_run
+        # 重複判定のキーは (開始時刻のローカル epoch 秒, タイトル)。表示形式やロケールに依存しない
+        self.seen: Set[Tuple[int, str]] = {
+            (record.start, record.title) for record in log_handler.typed_records
+        }
+        # ローテーション済みのセッションも重複とみなす。アーカイブは取り込む日付にかかるものだけ、
+        # 最初に必要になった時点で読み込む
+        self._unread_archives = open_archives(log_handler.spreadsheet)
+
+    def import_file(self, path: Path, stats: ImportStats) -> None:
+        """1ファイルを取り込む（state の処理済み行以降から）."""
+        resume_at = self.state.offset(path)
+        pending: List[list] = []
+        consumed = 0
+        for consumed, session in enumerate(read_sessions(path), start=1):
+            if consumed <= resume_at:
+                stats.skipped_resumed += 1
+                continue
+            stats.read += 1
+            if session is None:
+                stats.invalid += 1
+            else:
+                self._add(session, pending, stats)
+            if len(pending) >= self.chunk_rows:
+                self._flush(pending, path, consumed, stats)
+                pending = []
+        self._flush(pending, path, max(consumed, resume_at), stats)
+
+    def _add(self, session: Session, pending: List[list], stats: ImportStats) -> None:
+        """重複でなければ書き込み待ちに追加."""
+        start, end, title, play_with_friends = session
+        self._read_archives_for(start.date())
+        key = (datetime_to_seconds(start), title)
+        if key in self.seen:
+            stats.duplicates += 1
+            return
+        self.seen.add(key)
+        pending.append([
+            None,  # index は書き込み直前に採番する
+            start.strftime(GSS_DATETIME_FORMAT),
+            end.strftime(GSS_DATETIME_FORMAT),
+            title,
+            play_with_friends,
+        ])
+
+    def _read_archives_for(self, day: date) -> None:
+        """day を含むアーカイブのうち未読のものを読み込み、重複判定に加える."""
+        unread = []
+        for entry, worksheet in self._unread_archives:
+            if entry.overlaps(day, day):
+                self.seen.update((record.start, record.title) for record in read_archive(worksheet))
+            else:
+                unread.append((entry, worksheet))
+        self._unread_archives = unread
+
+    def _flush(self, rows: List[list], path: Path, offset: int, stats: ImportStats) -> None:
+        """バッファを1回の append_rows で書き込み、進捗を保存."""
+        if rows and not self.dry_run:
+            first_index = self.log_handler.index + 1
+            for i, row in enumerate(rows):
+                row[0] = first_index + i
+            self.log_handler.save_records(rows)
+            self.log_handler.index += len(rows)
+        stats.imported += len(rows)
+        if not self.dry_run:
+            self.state.advance(path, offset)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """取り込みのエントリーポイント."""
+    parser = argparse.ArgumentParser(description='プレイ履歴の一括取り込み')
+    parser.add_argument('files', nargs='+', type=Path, help='CSV / TSV ファイル')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='1回の書き込み行数')
+    parser.add_argument('--state', type=Path, default=Path('import_state.json'), help='進捗ファイル')
+    parser.add_argument('--dry-run', action='store_true', help='書き込まずに件数のみ表示')
+    args = parser.parse_args(argv)
+
+    importer = HistoryImporter(
+        LogHandler(),
+        chunk_rows=args.chunk_rows,
+        state=ImportState(args.state),
+        dry_run=args.dry_run,
+    )
+    stats = ImportStats()
+    for path in args.files:
+        try:
+            importer.import_file(path, stats)
+        except (OSError, ValueError, gspread.exceptions.APIError) as e:
+            stats.errors.append(str(e))
+            print(f'取り込みに失敗しました: {e}', file=sys.stderr)
+
+    label = '取り込み予定' if args.dry_run else '取り込み'
+    print(
+        f'{label}: {stats.imported}件 / 重複: {stats.duplicates}件 / 不正: {stats.invalid}件'
+        f' / 再開によりスキップ: {stats.skipped_resumed}行'
+    )
+    return 1 if stats.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
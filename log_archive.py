@@ -0,0 +1,365 @@
+"""ログシートの古い期間をアーカイブ用ワークシートへ移し、ログシートを小さく保つ.
+
+    python log_archive.py rotate --period year           # 今年より前を年ごとに移動
+    python log_archive.py rotate --period month --dry-run
+    python log_archive.py query --from 2022-01-01 --to 2022-12-31
+
+アーカイブは同じスプレッドシートの ``log_2022`` / ``log_2023_04`` のような
+ワークシートに保存し、各アーカイブの期間と index 範囲を
+``log_archive_manifest`` ワークシートに記録する。期間指定の問い合わせは
+マニフェストから必要なアーカイブだけを読み込む。
+"""
+
+import argparse
+import csv
+import sys
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from log_codec import (
+    SERIAL_NUMBER,
+    UNFORMATTED_VALUE,
+    LogRecord,
+    day_bounds,
+    decode_datetime,
+    decode_rows,
+    format_datetime,
+    seconds_to_datetime,
+)
+from sheets_governor import GOVERNOR, WRITE, read_key
+
+MANIFEST_TITLE = 'log_archive_manifest'
+MANIFEST_HEADER = ['worksheet', 'period_start', 'period_end', 'rows', 'first_index', 'last_index']
+LOG_HEADER = ['index', 'start_time', 'end_time', 'title', 'play_with_friends']
+PERIODS = ('year', 'month')
+
+
+@dataclass
+class ArchiveEntry:
+    """マニフェストの1行."""
+
+    worksheet: str
+    period_start: date
+    period_end: date
+    rows: int
+    first_index: int
+    last_index: int
+
+    def to_row(self) -> list:
+        """マニフェストシートの行に変換."""
+        return [
+            self.worksheet,
+            self.period_start.isoformat(),
+            self.period_end.isoformat(),
+            self.rows,
+            self.first_index,
+            self.last_index,
+        ]
+
+    def overlaps(self, start: date, end: date) -> bool:
+        """期間 [start, end] と重なるか判定."""
+        return self.period_start <= end and start <= self.period_end
+
+
+# =============================================================================
+# 期間の計算
+# =============================================================================
+def period_of(day: date, period: str) -> Tuple[str, date, date]:
+    """日付が属する期間の (ワークシート名, 開始日, 終了日) を返す."""
+    if period == 'year':
+        return f'log_{day.year}', date(day.year, 1, 1), date(day.year, 12, 31)
+    first = date(day.year, day.month, 1)
+    next_month = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return f'log_{day.year}_{day.month:02}', first, date.fromordinal(next_month.toordinal() - 1)
+
+
+def closed_before(today: date, period: str) -> date:
+    """今日を含む期間の開始日（これより前の期間は締め済み）."""
+    return period_of(today, period)[1]
+
+
+def _parse_start(value: object) -> Optional[date]:
+    seconds = decode_datetime(value)
+    return seconds_to_datetime(seconds).date() if seconds is not None else None
+
+
+def _parse_int(value: object) -> Optional[int]:
+    try:
+        return int(str(value))
+    except ValueError:
+        return None
+
+
+# =============================================================================
+# マニフェスト
+# =============================================================================
+def _worksheets_by_title(spreadsheet) -> Dict[str, object]:
+    """スプレッドシート内のワークシートをタイトルで引ける dict にする（1リクエスト）."""
+    worksheets = GOVERNOR.call('worksheets', spreadsheet.worksheets)
+    return {worksheet.title: worksheet for worksheet in worksheets}
+
+
+def read_manifest(spreadsheet, worksheets: Optional[Dict[str, object]] = None) -> List[ArchiveEntry]:
+    """マニフェストを読み込む（未作成なら空）."""
+    worksheets = worksheets if worksheets is not None else _worksheets_by_title(spreadsheet)
+    manifest = worksheets.get(MANIFEST_TITLE)
+    if manifest is None:
+        return []
+    records = GOVERNOR.call(
+        'get_all_records', manifest.get_all_records,
+        key=read_key(manifest, 'get_all_records'),
+    )
+    return [
+        ArchiveEntry(
+            worksheet=str(record['worksheet']),
+            period_start=date.fromisoformat(str(record['period_start'])),
+            period_end=date.fromisoformat(str(record['period_end'])),
+            rows=int(record['rows']),
+            first_index=int(record['first_index']),
+            last_index=int(record['last_index']),
+        )
+        for record in records
+    ]
+
+
+def last_archived_index(spreadsheet) -> int:
+    """アーカイブ済みの最大 index（アーカイブがなければ 0）."""
+    return max((entry.last_index for entry in read_manifest(spreadsheet)), default=0)
+
+
+def _write_manifest(spreadsheet, worksheets: Dict[str, object], entries: List[ArchiveEntry]) -> None:
+    manifest = worksheets.get(MANIFEST_TITLE)
+    if manifest is None:
+        manifest = GOVERNOR.call(
+            'add_worksheet',
+            lambda: spreadsheet.add_worksheet(MANIFEST_TITLE, rows=len(entries) + 1, cols=len(MANIFEST_HEADER)),
+            lane=WRITE,
+        )
+    values = [MANIFEST_HEADER] + [entry.to_row() for entry in sorted(entries, key=lambda e: e.period_start)]
+    GOVERNOR.call('update', lambda: manifest.update('A1', values), lane=WRITE)
+
+
+# =============================================================================
+# ローテーション
+# =============================================================================
+@dataclass
+class RotationResult:
+    """ローテーション結果."""
+
+    archived: Dict[str, int]
+    kept: int
+
+
+def rotate(
+    log_handler,
+    *,
+    period: str = 'year',
+    before: Optional[date] = None,
+    dry_run: bool = False,
+) -> RotationResult:
+    """before（既定: 今日を含む期間の開始日）より前のセッションをアーカイブへ移動.
+
+    アーカイブへの追記 → マニフェスト更新 → ログシートからの削除の順に行う。
+    途中で失敗しても、再実行時にはアーカイブ済みの index を飛ばすため二重登録されない。
+    ログシートは読み込んだ時点の行番号でアーカイブした行だけを削除するため、
+    実行中のトラッカーがその間に追記した行は消えない。
+    行の振り分けは書式なしの値（日時はシリアル値）で行うため表示形式やロケールに依存せず、
+    アーカイブには書式付きの値をそのまま移す。
+    """
+    if period not in PERIODS:
+        raise ValueError(f'period は {PERIODS} のいずれかです: {period}')
+    cutoff = period_of(before, period)[1] if before else closed_before(date.today(), period)
+
+    sheet = log_handler.sheet
+    # 書式なしの値を先に読むため、書式付きの値には同じ行がすべて含まれる
+    # （間に追記された行は書式付きの側にだけあり、ログシートに残す）
+    typed_values = GOVERNOR.call(
+        'get_all_values',
+        lambda: sheet.get_all_values(
+            value_render_option=UNFORMATTED_VALUE,
+            date_time_render_option=SERIAL_NUMBER,
+        ),
+        key=read_key(sheet, 'get_all_values', UNFORMATTED_VALUE),
+    )
+    values = GOVERNOR.call('get_all_values', sheet.get_all_values, key=read_key(sheet, 'get_all_values'))
+    if not values:
+        return RotationResult(archived={}, kept=0)
+    header, rows = values[0], values[1:]
+    typed_rows = typed_values[1:]
+    start_col = header.index('start_time')
+    index_col = header.index('index')
+
+    groups: Dict[str, Tuple[date, date, List[list]]] = {}
+    kept: List[list] = []
+    archived_rows: List[int] = []
+    for row_number, row in enumerate(rows, start=2):
+        typed_row = typed_rows[row_number - 2] if row_number - 2 < len(typed_rows) else []
+        start = _parse_start(typed_row[start_col]) if len(typed_row) > start_col else None
+        if start is None or start >= cutoff:
+            kept.append(row)
+            continue
+        title, period_start, period_end = period_of(start, period)
+        groups.setdefault(title, (period_start, period_end, []))[2].append(row)
+        archived_rows.append(row_number)
+
+    archived = {title: len(group[2]) for title, group in groups.items()}
+    if dry_run or not groups:
+        return RotationResult(archived=archived, kept=len(kept))
+
+    spreadsheet = log_handler.spreadsheet
+    worksheets = _worksheets_by_title(spreadsheet)
+    entries = {entry.worksheet: entry for entry in read_manifest(spreadsheet, worksheets)}
+    for title, (period_start, period_end, group_rows) in sorted(groups.items()):
+        entries[title] = _append_archive(
+            spreadsheet, worksheets, entries.get(title), title, period_start, period_end,
+            header, group_rows, index_col,
+        )
+    _write_manifest(spreadsheet, worksheets, list(entries.values()))
+
+    # 下の範囲から削除すれば、上の範囲の行番号はずれない（追記は末尾に入るため影響しない）
+    for first, last in reversed(_row_ranges(archived_rows)):
+        GOVERNOR.call('delete_rows', lambda: sheet.delete_rows(first, last), lane=WRITE)
+    return RotationResult(archived=archived, kept=len(kept))
+
+
+def _row_ranges(row_numbers: List[int]) -> List[Tuple[int, int]]:
+    """昇順の行番号を連続した (開始行, 終了行) の範囲にまとめる."""
+    ranges: List[Tuple[int, int]] = []
+    for row_number in row_numbers:
+        if ranges and ranges[-1][1] == row_number - 1:
+            ranges[-1] = (ranges[-1][0], row_number)
+        else:
+            ranges.append((row_number, row_number))
+    return ranges
+
+
+def _append_archive(
+    spreadsheet,
+    worksheets: Dict[str, object],
+    entry: Optional[ArchiveEntry],
+    title: str,
+    period_start: date,
+    period_end: date,
+    header: List[str],
+    rows: List[list],
+    index_col: int,
+) -> ArchiveEntry:
+    """アーカイブ用ワークシートに未登録の行を追記し、マニフェスト行を返す."""
+    worksheet = worksheets.get(title)
+    if worksheet is None:
+        worksheet = GOVERNOR.call(
+            'add_worksheet',
+            lambda: spreadsheet.add_worksheet(title, rows=len(rows) + 1, cols=len(header)),
+            lane=WRITE,
+        )
+        worksheets[title] = worksheet
+        GOVERNOR.call('append_row', lambda: worksheet.append_row(header), lane=WRITE)
+        existing = set()
+    else:
+        existing = set(GOVERNOR.call('col_values', lambda: worksheet.col_values(index_col + 1))[1:])
+
+    new_rows = [row for row in rows if row[index_col] not in existing]
+    if new_rows:
+        GOVERNOR.call(
+            'append_rows',
+            lambda: worksheet.append_rows(new_rows, value_input_option='USER_ENTERED'),
+            lane=WRITE,
+        )
+
+    indices = [i for i in (_parse_int(row[index_col]) for row in rows) if i is not None]
+    if entry is not None:
+        indices += [entry.first_index, entry.last_index]
+    return ArchiveEntry(
+        worksheet=title,
+        period_start=period_start,
+        period_end=period_end,
+        rows=(entry.rows if entry else 0) + len(new_rows),
+        first_index=min(indices, default=0),
+        last_index=max(indices, default=0),
+    )
+
+
+# =============================================================================
+# 期間指定の問い合わせ
+# =============================================================================
+def open_archives(spreadsheet) -> List[Tuple[ArchiveEntry, object]]:
+    """マニフェストにあるアーカイブを (マニフェスト行, ワークシート) の組で期間順に返す."""
+    worksheets = _worksheets_by_title(spreadsheet)
+    return [
+        (entry, worksheets[entry.worksheet])
+        for entry in sorted(read_manifest(spreadsheet, worksheets), key=lambda e: e.period_start)
+        if entry.worksheet in worksheets
+    ]
+
+
+def read_archive(worksheet) -> List[LogRecord]:
+    """アーカイブを書式なしの値で読み込み、LogRecord のリストに変換（LogHandler.get_typed_records と同じ）."""
+    values = GOVERNOR.call(
+        'get_all_values',
+        lambda: worksheet.get_all_values(
+            value_render_option=UNFORMATTED_VALUE,
+            date_time_render_option=SERIAL_NUMBER,
+        ),
+        key=read_key(worksheet, 'get_all_values', UNFORMATTED_VALUE),
+    )
+    return decode_rows(values)
+
+
+def query_records(log_handler, start: date, end: date) -> List[LogRecord]:
+    """期間 [start, end] に開始したセッションを、必要なアーカイブとログシートから読み込む."""
+    records: List[LogRecord] = []
+    for entry, worksheet in open_archives(log_handler.spreadsheet):
+        if entry.overlaps(start, end):
+            records.extend(read_archive(worksheet))
+    records.extend(log_handler.get_typed_records())
+
+    first, _ = day_bounds(start)
+    _, last = day_bounds(end)
+    return [record for record in records if first <= record.start < last]
+
+
+def to_row(record: LogRecord) -> list:
+    """LogRecord を LOG_HEADER の順の書式付きの行に変換（CSV 出力用）."""
+    return [
+        record.index,
+        format_datetime(seconds_to_datetime(record.start)),
+        format_datetime(seconds_to_datetime(record.end)),
+        record.title,
+        'TRUE' if record.play_with_friends else 'FALSE',
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """アーカイブ操作のエントリーポイント."""
+    # log_handler は本モジュールを参照するため、循環 import を避けてここで読み込む
+    from log_handler import LogHandler
+
+    parser = argparse.ArgumentParser(description='ログシートのアーカイブ')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rotate_parser = sub.add_parser('rotate', help='締め済み期間をアーカイブへ移動')
+    rotate_parser.add_argument('--period', choices=PERIODS, default='year')
+    rotate_parser.add_argument('--before', type=date.fromisoformat, help='この日付を含む期間より前を移動')
+    rotate_parser.add_argument('--dry-run', action='store_true')
+    query_parser = sub.add_parser('query', help='期間内のセッションを CSV で出力')
+    query_parser.add_argument('--from', dest='start', type=date.fromisoformat, required=True)
+    query_parser.add_argument('--to', dest='end', type=date.fromisoformat, required=True)
+    args = parser.parse_args(argv)
+
+    log_handler = LogHandler()
+    if args.command == 'rotate':
+        result = rotate(log_handler, period=args.period, before=args.before, dry_run=args.dry_run)
+        for title, count in sorted(result.archived.items()):
+            print(f'{title}: {count}件')
+        label = '（dry-run）' if args.dry_run else ''
+        print(f'アーカイブ: {sum(result.archived.values())}件 / ログシートに残す: {result.kept}件{label}')
+        return 0
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(LOG_HEADER)
+    writer.writerows(to_row(record) for record in query_records(log_handler, args.start, args.end))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""ログシートの値と型付きレコードを相互変換するコーデック.
+
+ログシートは書式なしの値（UNFORMATTED_VALUE）で読み込み、日時はシリアル値
+（1899-12-30 からの日数）として受け取る。表示形式やロケールに依存せず、
+文字列を strptime で解析し直す必要もない。日時はタイムゾーンなしのローカル時刻を
+UTC とみなした epoch 秒（以下「ローカル epoch 秒」）で扱う。
+
+書式付きの文字列で保存された行（手入力や古い行）も読み込めるよう、文字列の日時は
+正規表現で解析する。書き込み時の日時文字列もこのモジュールで整形する。
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Worksheet.get_all_values などに渡す読み込みオプション
+UNFORMATTED_VALUE = 'UNFORMATTED_VALUE'
+SERIAL_NUMBER = 'SERIAL_NUMBER'
+
+SECONDS_PER_DAY = 86400
+# シリアル値 0 の日付と、1970-01-01 のシリアル値（25569）
+SERIAL_EPOCH = datetime(1899, 12, 30)
+UNIX_EPOCH = datetime(1970, 1, 1)
+UNIX_EPOCH_SERIAL = (UNIX_EPOCH - SERIAL_EPOCH).days
+UNIX_EPOCH_ORDINAL = UNIX_EPOCH.toordinal()
+
+LOG_COLUMNS = ('index', 'start_time', 'end_time', 'title', 'play_with_friends')
+
+# 2024/01/05 10:00:00 形式（区切りは / または -、秒は省略可、ゼロ埋めなしも許容）
+_DATETIME_TEXT = re.compile(
+    r'\s*(\d{4})[/-](\d{1,2})[/-](\d{1,2})[ T](\d{1,2}):(\d{1,2})(?::(\d{1,2}))?\s*$'
+)
+
+
+class LogRecord(NamedTuple):
+    """ログシートの1セッション（日時はローカル epoch 秒）."""
+
+    index: int
+    start: int
+    end: int
+    title: str
+    play_with_friends: bool
+
+    @property
+    def duration(self) -> int:
+        """プレイ時間（秒）."""
+        return self.end - self.start
+
+    @property
+    def start_datetime(self) -> datetime:
+        """開始時刻（naive なローカル時刻）."""
+        return seconds_to_datetime(self.start)
+
+
+# =============================================================================
+# 日時の変換
+# =============================================================================
+def serial_to_seconds(serial: float) -> int:
+    """シリアル値をローカル epoch 秒に変換（秒未満は丸める）."""
+    return round((serial - UNIX_EPOCH_SERIAL) * SECONDS_PER_DAY)
+
+
+def seconds_to_serial(seconds: float) -> float:
+    """ローカル epoch 秒をシリアル値に変換."""
+    return seconds / SECONDS_PER_DAY + UNIX_EPOCH_SERIAL
+
+
+def datetime_to_seconds(value: datetime) -> int:
+    """naive なローカル時刻をローカル epoch 秒に変換."""
+    return (value.toordinal() - UNIX_EPOCH_ORDINAL) * SECONDS_PER_DAY + (
+        value.hour * 3600 + value.minute * 60 + value.second
+    )
+
+
+def seconds_to_datetime(seconds: float) -> datetime:
+    """ローカル epoch 秒を naive なローカル時刻に変換."""
+    return UNIX_EPOCH + timedelta(seconds=seconds)
+
+
+def day_bounds(day: date) -> Tuple[int, int]:
+    """日付の [開始, 翌日開始) をローカル epoch 秒で返す."""
+    start = (day.toordinal() - UNIX_EPOCH_ORDINAL) * SECONDS_PER_DAY
+    return start, start + SECONDS_PER_DAY
+
+
+def parse_datetime_text(text: str) -> Optional[int]:
+    """書式付きの日時文字列をローカル epoch 秒に変換（解析できなければ None）."""
+    match = _DATETIME_TEXT.match(text)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second = match.groups()
+    try:
+        ordinal = date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        return None
+    return (ordinal - UNIX_EPOCH_ORDINAL) * SECONDS_PER_DAY + (
+        int(hour) * 3600 + int(minute) * 60 + int(second or 0)
+    )
+
+
+def decode_datetime(value: object) -> Optional[int]:
+    """セルの値（シリアル値または日時文字列）をローカル epoch 秒に変換."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return serial_to_seconds(value)
+    if isinstance(value, str) and value:
+        return parse_datetime_text(value)
+    return None
+
+
+def format_datetime(value: datetime) -> str:
+    """書き込み用の日時文字列（2024/01/05 10:00:00）に整形."""
+    return (
+        f'{value.year:04}/{value.month:02}/{value.day:02} '
+        f'{value.hour:02}:{value.minute:02}:{value.second:02}'
+    )
+
+
+# =============================================================================
+# 行の変換
+# =============================================================================
+def _column_positions(header: Sequence[object]) -> Dict[str, int]:
+    positions = {str(name).strip(): i for i, name in enumerate(header)}
+    missing = [name for name in ('start_time', 'end_time', 'title') if name not in positions]
+    if missing:
+        raise ValueError(f'ログシートに列がありません: {missing}')
+    return positions
+
+
+def _decode_bool(value: object) -> bool:
+    return value is True or str(value).upper() == 'TRUE'
+
+
+def _decode_int(value: object) -> int:
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(str(value))
+    except ValueError:
+        return 0
+
+
+def decode_rows(
+    values: Sequence[Sequence[object]],
+    header: Optional[Sequence[object]] = None,
+) -> List[LogRecord]:
+    """get_all_values の結果（先頭行はヘッダー）を LogRecord のリストに変換.
+
+    列は名前で対応付けるため、列の並びが変わっても読み込める。日時を解釈できない行は除く。
+    header を指定した場合、values は全てデータ行として扱う（範囲を分けて読み込む場合）。
+    """
+    if header is None:
+        if not values:
+            return []
+        header, values = values[0], values[1:]
+    positions = _column_positions(header)
+    index_col = positions.get('index')
+    start_col = positions['start_time']
+    end_col = positions['end_time']
+    title_col = positions['title']
+    friends_col = positions.get('play_with_friends')
+    width = max(positions.values()) + 1
+
+    records = []
+    for row in values:
+        if len(row) < width:
+            row = list(row) + [''] * (width - len(row))
+        start = decode_datetime(row[start_col])
+        end = decode_datetime(row[end_col])
+        if start is None or end is None:
+            continue
+        records.append(LogRecord(
+            index=_decode_int(row[index_col]) if index_col is not None else 0,
+            start=start,
+            end=end,
+            title=str(row[title_col]),
+            play_with_friends=_decode_bool(row[friends_col]) if friends_col is not None else False,
+        ))
+    return records
+
+
+def encode_row(
+    index: int,
+    start: datetime,
+    end: datetime,
+    title: str,
+    play_with_friends: bool,
+) -> list:
+    """セッションを書き込み用の行（LOG_COLUMNS の順）に変換."""
+    return [index, format_datetime(start), format_datetime(end), title, play_with_friends]
@@ -1,25 +1,129 @@
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # https://docs.gspread.org/en/v5.12.1/
 import gspread
 
 from config_loader import ConfigLoader
+from log_archive import last_archived_index, to_row
+from log_codec import LOG_COLUMNS, SERIAL_NUMBER, UNFORMATTED_VALUE, decode_rows, format_datetime
+from sheets_governor import GOVERNOR, WRITE, read_key
+
+# iter_records で1回に読み込む行数
+DEFAULT_CHUNK_ROWS = 1000
 
 class LogHandler():
 
-    def __init__(self):
-        config = ConfigLoader()
+    # config を渡すとその設定で接続する（設定の再読み込みでシートキーが変わった場合など）
+    # output はエラーメッセージの出力先（コンソールでは ConsoleRenderer.message を渡す）
+    def __init__(self, config=None, output=print):
+        config = config or ConfigLoader()
+        self.output = output
         gc = gspread.service_account(filename=Path(config.log_handler['cert_file_path']))
-        self.sheet = gc.open_by_key(config.log_handler['sheet_key']).sheet1
-        self.records = self.get_all_records()
-        self.index = len(self.records)
+        self.spreadsheet = GOVERNOR.call('open_by_key', lambda: gc.open_by_key(config.log_handler['sheet_key']))
+        self.sheet = GOVERNOR.call('sheet1', lambda: self.spreadsheet.sheet1)
+        # ログは起動時に一度だけ読み込み、index の採番と今日の集計などで共有する
+        self.typed_records = self.get_typed_records()
+        self.index = self._initial_index(self.typed_records)
+
+    # アーカイブ後はログシートの行数と index が一致しないため、最大の index から続ける
+    def _initial_index(self, records):
+        indices = [record.index for record in records if record.index > 0]
+        if indices:
+            return max(max(indices), len(records))
+        if records:
+            return len(records)
+        # ログシートが空ならアーカイブ済みの index から続ける
+        return last_archived_index(self.spreadsheet)
 
+    # 読み込みは同時に発生した同一リクエストを1回にまとめる（戻り値は共有されるため変更しないこと）
     def get_all_records(self):
-        return self.sheet.get_all_records()
+        return GOVERNOR.call(
+            'get_all_records', self.sheet.get_all_records,
+            key=read_key(self.sheet, 'get_all_records'),
+        )
 
     def get_all_values(self):
-        return self.sheet.get_all_values()
+        return GOVERNOR.call(
+            'get_all_values', self.sheet.get_all_values,
+            key=read_key(self.sheet, 'get_all_values'),
+        )
+
+    # 書式なしの値（日時はシリアル値）で読み込み、LogRecord のリストに変換する
+    # 表示形式やロケールの設定に影響されず、日時の文字列解析も不要
+    def get_typed_records(self):
+        values = GOVERNOR.call(
+            'get_all_values',
+            lambda: self.sheet.get_all_values(
+                value_render_option=UNFORMATTED_VALUE,
+                date_time_render_option=SERIAL_NUMBER,
+            ),
+            key=read_key(self.sheet, 'get_all_values', UNFORMATTED_VALUE),
+        )
+        return decode_rows(values)
+
+    # ログを chunk_rows 行ずつの A1 範囲で読み込み、LogRecord を順に返す
+    # 全件を一度に持たないため、件数が増えてもメモリ使用量は最大2ページ分で済み、
+    # 最初のページを読み込んだ時点から処理を始められる。
+    # prefetch=True なら現在のページを処理している間に次のページを別スレッドで読み込む
+    def iter_records(self, chunk_rows=DEFAULT_CHUNK_ROWS, prefetch=True):
+        if chunk_rows < 1:
+            raise ValueError('chunk_rows は 1 以上にしてください')
+        header_rows = self._get_range('1:1')
+        if not header_rows or not header_rows[0]:
+            return
+        header = header_rows[0]
+        last_col = _column_letter(len(header))
+        # シートの行数を超える範囲は要求しない
+        row_count = self._current_row_count()
+
+        def fetch(first):
+            last = min(first + chunk_rows - 1, row_count)
+            return self._get_range(f'A{first}:{last_col}{last}')
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-prefetch') if prefetch else None
+        pending = None
+        try:
+            first = 2
+            page = fetch(first) if first <= row_count else []
+            while True:
+                next_first = first + chunk_rows
+                # API は要求した範囲ごとに末尾の空行を省くため、ページが埋まっていなくても
+                # 途中の空行かもしれない。終わりはシートの行数で判定する
+                has_next = next_first <= row_count
+                if has_next and executor is not None:
+                    pending = executor.submit(fetch, next_first)
+                yield from decode_rows(page, header=header)
+                if not has_next:
+                    return
+                page = pending.result() if pending is not None else fetch(next_first)
+                pending = None
+                first = next_first
+        finally:
+            if pending is not None:
+                pending.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    # gspread の row_count はワークシートを取得した時点の値で、append_row でグリッドが
+    # 広がっても更新されない。長時間動くハンドラーが古い行数で打ち切らないよう取得し直す
+    def _current_row_count(self):
+        sheet = GOVERNOR.call(
+            'get_worksheet_by_id',
+            lambda: self.spreadsheet.get_worksheet_by_id(self.sheet.id),
+        )
+        return sheet.row_count
+
+    def _get_range(self, range_name):
+        return GOVERNOR.call(
+            'get',
+            lambda: self.sheet.get(
+                range_name,
+                value_render_option=UNFORMATTED_VALUE,
+                date_time_render_option=SERIAL_NUMBER,
+            ),
+            key=read_key(self.sheet, 'get', range_name, UNFORMATTED_VALUE),
+        )
     
     def get_and_increment_index(self):
         self.index += 1
@@ -30,8 +134,7 @@ class LogHandler():
         return self.get_and_increment_index()
     
     def get_titles(self):
-        records = self.get_all_records()
-        return {record['title'] for record in records}
+        return {record.title for record in self.get_typed_records()}
     
     def get_5_titles_of_recently(self):
         return self.get_n_titles_of_recently(5)
@@ -39,37 +142,54 @@ class LogHandler():
     def get_10_titles_of_recently(self):
         return self.get_n_titles_of_recently(10)
 
+    # タイトルごとに最新のセッションを1件ずつ、新しい順に num 件返す
+    # 判定は型付きのレコードで行い、戻り値は従来どおり get_all_records と同じ形の dict にする
     def get_n_titles_of_recently(self, num):
-        records = self.get_all_records()
-        recent_of_titles = {}
-        for record in records:
-            title = record['title']
-            start_time = self._gss_timestr_to_datetime(record['start_time'])
-            if title not in recent_of_titles or recent_of_titles[title] < start_time:
-                recent_of_titles[title] = start_time
-        
-        # 最新のdatetimeを持つレコードだけを残す
-        most_recent_records = [record for record in records if self._gss_timestr_to_datetime(record['start_time']) == recent_of_titles[record['title']]]
-
-        # ソートする
-        most_recent_records.sort(key=lambda record: record['start_time'], reverse=True)
-        
-        return most_recent_records[:num]
-
-    def _gss_timestr_to_datetime(self, timestr):
-        return datetime.strptime(timestr, '%Y/%m/%d %H:%M:%S')
+        latest = {}
+        for record in self.get_typed_records():
+            current = latest.get(record.title)
+            if current is None or current.start < record.start:
+                latest[record.title] = record
+        recent = sorted(latest.values(), key=lambda record: record.start, reverse=True)[:num]
+        return [dict(zip(LOG_COLUMNS, to_row(record))) for record in recent]
 
     def format_datetime_to_gss_style(self, datetime):
-        return datetime.strftime("%Y/%m/%d %H:%M:%S")
+        return format_datetime(datetime)
 
+    # 1行を追記し、成功したかを返す（失敗時はメッセージを出力して False）
     def save_record(self, values):
         try:
-            self.sheet.append_row(values, value_input_option='USER_ENTERED')
+            GOVERNOR.call(
+                'append_row',
+                lambda: self.sheet.append_row(values, value_input_option='USER_ENTERED'),
+                lane=WRITE,
+            )
         except gspread.exceptions.APIError as e:
-            print(f'APIError occurred while appending row: {e}')
+            self.output(f'APIError occurred while appending row: {e}')
+            return False
         except Exception as e:
-            print(f'Exception occurred while appending row: {e}')
-            
+            self.output(f'Exception occurred while appending row: {e}')
+            return False
+        return True
+
+    # 複数行を1リクエストで追記する（一括取り込み用、失敗時は例外を送出）
+    def save_records(self, rows):
+        GOVERNOR.call(
+            'append_rows',
+            lambda: self.sheet.append_rows(rows, value_input_option='USER_ENTERED'),
+            lane=WRITE,
+        )
+
+
+# 1 始まりの列番号を A1 表記の列名（A, B, ..., Z, AA, ...）に変換
+def _column_letter(column):
+    letters = ''
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
 def main():
     pass
 
@@ -1,11 +1,16 @@
 """Game Time Tracker - ウィンドウタイトルからゲームプレイを自動検出し記録するツール."""
 
+import argparse
+import functools
 import os
+import sys
 import time
+import unicodedata
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Sequence
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 import gspread
 import pygetwindow as gw
@@ -14,8 +19,25 @@ from config_loader import (
     DEFAULT_BROWSERS,
     DEFAULT_EXCLUDED_TITLES,
     ConfigLoader,
+    ConfigWatcher,
+    compile_exclusions,
 )
+from console_renderer import ConsoleRenderer
+from daily_rollup import DailyRollup
+from log_codec import encode_row
 from log_handler import LogHandler
+from metrics import METRICS, configure_from
+from process_source import (
+    ProcessSource,
+    console_window_handle,
+    default_process_source,
+    executable_key,
+    window_process_id,
+)
+from sheets_governor import GOVERNOR, read_key
+from sheets_governor import configure_from as configure_governor_from
+from task_graph import TaskGraph
+from window_trace import TraceRecordingScanner
 
 
 # =============================================================================
@@ -23,6 +45,20 @@ from log_handler import LogHandler
 # =============================================================================
 POLL_INTERVAL_SECONDS = 1
 MIN_PLAY_MINUTES = 5
+# 正規化済みタイトルを保持する件数（ウィンドウタイトルの種類より十分大きくする）
+TITLE_NORMALIZE_CACHE_SIZE = 4096
+# GameCatalog がタイトルごとの照合結果を保持する件数（古いものから捨てる）
+MATCH_CACHE_SIZE = 1024
+
+# NFKC では統一されないダッシュ・波ダッシュの異体字
+_TITLE_VARIANTS = str.maketrans({
+    '\u2010': '-', '\u2011': '-', '\u2012': '-', '\u2013': '-',
+    '\u2014': '-', '\u2015': '-', '\u2212': '-',
+    '\u301c': '~', '\u223c': '~', '\u223e': '~',
+})
+
+# 現在時刻を返す関数（リプレイ時は仮想時計に差し替える）
+Clock = Callable[[], datetime]
 
 
 class Messages:
@@ -31,15 +67,20 @@ class Messages:
     GAME_PLAYING = '{game_title}をプレイ中'
     GAME_PLAYING_WITH_ELAPSED = '{game_title}をプレイ中（経過: {elapsed}）'
     GAME_RECORDED = '{game_title}のプレイ時間を記録しました'
+    GAME_SAVE_FAILED = '{game_title}のプレイ時間をスプレッドシートに記録できませんでした'
     GAME_TOO_SHORT = '{game_title}のプレイ時間が{min_minutes}分未満のため、記録されませんでした'
     NO_GAME_PLAYING = 'ゲームをプレイしていません'
     CURRENT_WINDOWS = '現在のウィンドウタイトルは以下です。'
 
 
+# Python 3.10 以降では __slots__ 付きデータクラスにしてインスタンスの __dict__ を省く
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
 # =============================================================================
 # データクラス
 # =============================================================================
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class GameEntry:
     """ゲーム情報を保持するデータクラス."""
 
@@ -47,12 +88,25 @@ class GameEntry:
     window_title: str
     play_with_friends: bool = False
     is_browser_game: bool = False
+    # 実行ファイル名（例: Terraria.exe）またはフルパス。空ならウィンドウタイトルで判定
+    executable: str = ''
     is_playing: bool = field(default=False, compare=False)
     start_time: Optional[datetime] = field(default=None, compare=False)
 
-    def matches_window(self, window_title: str, browsers: Sequence[str]) -> bool:
-        """ウィンドウタイトルがこのゲームに該当するか判定."""
-        if self.window_title not in window_title:
+    def matches_window(
+        self,
+        window_title: str,
+        browsers: Sequence[str],
+        normalize: bool = False,
+    ) -> bool:
+        """ウィンドウタイトルがこのゲームに該当するか判定（normalize で表記ゆれを無視）."""
+        pattern = self.window_title
+        if normalize:
+            pattern = normalize_title(pattern)
+            window_title = normalize_title(window_title)
+            browsers = [normalize_title(browser) for browser in browsers]
+
+        if pattern not in window_title:
             return False
 
         is_browser = any(browser in window_title for browser in browsers)
@@ -64,28 +118,167 @@ class GameEntry:
         # 通常ゲームの場合はブラウザ以外でマッチ
         return not is_browser
 
-    def start_session(self) -> None:
+    def start_session(self, now: Optional[datetime] = None) -> None:
         """ゲームセッションを開始."""
         self.is_playing = True
-        self.start_time = datetime.now()
+        self.start_time = now or datetime.now()
 
-    def end_session(self) -> tuple[Optional[datetime], Optional[datetime]]:
+    def end_session(self, now: Optional[datetime] = None) -> tuple[Optional[datetime], Optional[datetime]]:
         """ゲームセッションを終了し、開始・終了時刻を返す."""
         start_time = self.start_time
-        end_time = datetime.now() if start_time else None
+        end_time = (now or datetime.now()) if start_time else None
         self.is_playing = False
         self.start_time = None
         return start_time, end_time
 
 
+# =============================================================================
+# ゲームカタログ
+# =============================================================================
+class GameCatalog:
+    """ゲーム一覧の照合用インデックス.
+
+    照合に使う静的データ（window_title とブラウザゲーム可否）を並列のタプルで保持し、
+    ウィンドウタイトルごとの照合結果をキャッシュする。ゲーム ID はカタログ内の位置。
+    normalize=True の場合、パターンとブラウザ名は構築時に一度だけ正規化し、
+    ウィンドウタイトルは初めて現れたときだけ正規化する。
+
+    use_processes=True の場合、実行ファイルが登録されたゲームはプロセスのみで判定し
+    （実行ファイル名 → ゲーム ID の索引を引く）、それ以外のゲームをタイトルで判定する。
+    """
+
+    __slots__ = (
+        'games', 'browsers', 'normalize', 'use_processes',
+        '_title_ids', '_patterns', '_browser_patterns', '_allow_browser', '_cache',
+        '_by_executable_name', '_by_executable_path', '_process_cache',
+    )
+
+    def __init__(
+        self,
+        games: Sequence[GameEntry],
+        browsers: Sequence[str],
+        normalize: bool = False,
+        use_processes: bool = False,
+    ) -> None:
+        self.games: Tuple[GameEntry, ...] = tuple(games)
+        self.browsers: Tuple[str, ...] = tuple(browsers)
+        self.normalize = normalize
+        self.use_processes = use_processes
+        fold = normalize_title if normalize else sys.intern
+        self._title_ids = tuple(
+            game_id for game_id, game in enumerate(self.games)
+            if not (use_processes and game.executable)
+        )
+        self._patterns = tuple(sys.intern(fold(self.games[i].window_title)) for i in self._title_ids)
+        self._browser_patterns = tuple(fold(browser) for browser in self.browsers)
+        self._allow_browser = tuple(self.games[i].is_browser_game for i in self._title_ids)
+        self._cache: 'OrderedDict[str, Tuple[int, ...]]' = OrderedDict()
+
+        by_name: Dict[str, List[int]] = {}
+        by_path: Dict[str, List[int]] = {}
+        for game_id, game in enumerate(self.games):
+            if use_processes and game.executable:
+                key = executable_key(game.executable)
+                (by_path if '/' in key else by_name).setdefault(key, []).append(game_id)
+        self._by_executable_name = {key: tuple(ids) for key, ids in by_name.items()}
+        self._by_executable_path = {key: tuple(ids) for key, ids in by_path.items()}
+        self._process_cache: Dict[str, Tuple[int, ...]] = {}
+
+    def match(self, window_title: str) -> Tuple[int, ...]:
+        """ウィンドウタイトルに該当するゲーム ID を返す（GameEntry.matches_window と同じ判定）."""
+        if self.normalize:
+            window_title = normalize_title(window_title)
+        is_browser = any(browser in window_title for browser in self._browser_patterns)
+        return tuple(
+            game_id
+            for game_id, pattern, allow_browser in zip(self._title_ids, self._patterns, self._allow_browser)
+            if pattern in window_title and (allow_browser or not is_browser)
+        )
+
+    def detect_processes(self, executables: Sequence[str]) -> Set[int]:
+        """実行中プロセスの実行ファイルから検出されたゲーム ID の集合を返す.
+
+        登録された実行ファイルがパスならフルパスで、名前だけならファイル名で照合する
+        （大文字/小文字・区切り文字の違いは無視）。処理量はプロセス数に比例し、
+        detect と同様に前回と同じ実行ファイルは照合結果のキャッシュを使う。
+        """
+        detected: Set[int] = set()
+        if not (self._by_executable_name or self._by_executable_path):
+            return detected
+        previous = self._process_cache
+        cache: Dict[str, Tuple[int, ...]] = {}
+        for executable in executables:
+            game_ids = previous.get(executable)
+            if game_ids is None:
+                key = executable_key(executable)
+                game_ids = (
+                    self._by_executable_path.get(key, ())
+                    + self._by_executable_name.get(key.rpartition('/')[2], ())
+                )
+            cache[executable] = game_ids
+            detected.update(game_ids)
+        self._process_cache = cache
+        return detected
+
+    def detect(self, window_titles: Sequence[str]) -> Set[int]:
+        """現在のウィンドウタイトル群から検出されたゲーム ID の集合を返す.
+
+        一度照合したタイトルは結果をキャッシュするため、ウィンドウ構成が変わらない間は
+        カタログ件数によらず、タイトル数に比例する処理量で済む。キャッシュは最近使った
+        MATCH_CACHE_SIZE 件を残す LRU のため、カウンター付きの通知のようにティックごとに
+        変わるタイトルも、以前に現れた値であれば照合し直さない。
+        """
+        cache = self._cache
+        detected: Set[int] = set()
+        for title in window_titles:
+            game_ids = cache.get(title)
+            if game_ids is None:
+                game_ids = cache[title] = self.match(title)
+                if len(cache) > MATCH_CACHE_SIZE:
+                    cache.popitem(last=False)
+            else:
+                cache.move_to_end(title)
+            detected.update(game_ids)
+        return detected
+
+
+def remap_active(
+    active: Dict[int, GameEntry],
+    catalog: GameCatalog,
+) -> Tuple[Dict[int, GameEntry], List[GameEntry]]:
+    """プレイ中のゲームを新しいカタログのゲーム ID に付け替える.
+
+    同じ内容のエントリーには開始時刻を引き継ぎ、新しいカタログにないゲームは
+    2番目の戻り値で返す（呼び出し側でセッションを終了する）。
+    """
+    ids = {_entry_key(game): game_id for game_id, game in enumerate(catalog.games)}
+    remapped: Dict[int, GameEntry] = {}
+    removed: List[GameEntry] = []
+    for game in active.values():
+        game_id = ids.get(_entry_key(game))
+        if game_id is None:
+            removed.append(game)
+            continue
+        entry = catalog.games[game_id]
+        if entry is not game:
+            entry.start_session(game.start_time)
+        remapped[game_id] = entry
+    return remapped, removed
+
+
+def _entry_key(game: GameEntry) -> Tuple[str, str, bool, bool, str]:
+    return game.game_title, game.window_title, game.play_with_friends, game.is_browser_game, game.executable
+
+
 # =============================================================================
 # ゲーム情報ローダー
 # =============================================================================
 class GameInfoLoader:
     """スプレッドシートからゲーム情報を読み込むクラス."""
 
-    def __init__(self, config: ConfigLoader) -> None:
+    def __init__(self, config: ConfigLoader, output: Callable[[str], None] = print) -> None:
         self.config = config
+        self.output = output
 
     def load(self) -> List[GameEntry]:
         """ゲーム情報をスプレッドシートから読み込む."""
@@ -93,14 +286,20 @@ class GameInfoLoader:
             gc = gspread.service_account(
                 filename=Path(self.config.log_handler['cert_file_path'])
             )
-            sheet = gc.open_by_key(
-                self.config.game_info['sheet_key']
-            ).get_worksheet_by_id(
-                self.config.game_info['sheet_gid']
+            spreadsheet = GOVERNOR.call(
+                'open_by_key',
+                lambda: gc.open_by_key(self.config.game_info['sheet_key']),
+            )
+            sheet = GOVERNOR.call(
+                'get_worksheet_by_id',
+                lambda: spreadsheet.get_worksheet_by_id(self.config.game_info['sheet_gid']),
+            )
+            records = GOVERNOR.call(
+                'get_all_records', sheet.get_all_records,
+                key=read_key(sheet, 'get_all_records'),
             )
-            records = sheet.get_all_records()
         except gspread.exceptions.APIError as e:
-            print(f'スプレッドシートの読み込みに失敗しました: {e}')
+            self.output(f'スプレッドシートの読み込みに失敗しました: {e}')
             return []
 
         return [self._record_to_entry(record) for record in records]
@@ -109,10 +308,11 @@ class GameInfoLoader:
     def _record_to_entry(record: dict) -> GameEntry:
         """スプレッドシートのレコードを GameEntry に変換."""
         return GameEntry(
-            game_title=str(record['game_title']),
-            window_title=str(record['window_title']),
+            game_title=sys.intern(str(record['game_title'])),
+            window_title=sys.intern(str(record['window_title'])),
             play_with_friends=_parse_bool(record.get('play_with_friends', 'FALSE')),
             is_browser_game=_parse_bool(record.get('is_browser_game', 'FALSE')),
+            executable=str(record.get('executable', '')).strip(),
         )
 
 
@@ -120,18 +320,47 @@ class GameInfoLoader:
 # ウィンドウスキャナー
 # =============================================================================
 class WindowScanner:
-    """アクティブなウィンドウタイトルを取得するクラス."""
+    """アクティブなウィンドウタイトルを取得するクラス.
 
-    def __init__(self, excluded_titles: Sequence[str]) -> None:
-        self.excluded_titles = set(excluded_titles)
+    除外リストは完全一致のほか、prefix: で始まる前方一致と regex: で始まる正規表現
+    （先頭から照合）のルールを指定できる。前方一致と正規表現は1つの正規表現にまとめるため、
+    ルールの数によらずウィンドウごとの照合は1回で済む。excluded_pids / excluded_handles
+    に一致するウィンドウ（トラッカー自身など）はタイトルを見る前に除外する。
+    """
+
+    def __init__(
+        self,
+        excluded_titles: Sequence[str],
+        *,
+        excluded_pids: Sequence[int] = (),
+        excluded_handles: Sequence[int] = (),
+        window_pid: Callable[[int], Optional[int]] = window_process_id,
+    ) -> None:
+        self.excluded_pids = frozenset(excluded_pids)
+        self.excluded_handles = frozenset(excluded_handles)
+        self.window_pid = window_pid
+        self.set_excluded_titles(excluded_titles)
+
+    def set_excluded_titles(self, excluded_titles: Sequence[str]) -> None:
+        """除外リストを置き換える（設定の再読み込み時）."""
+        self.excluded_titles, self._excluded_patterns = compile_exclusions(excluded_titles)
+
+    def is_excluded(self, window) -> bool:
+        """ウィンドウが除外対象か（ハンドル・PID、完全一致、前方一致/正規表現の順に判定）."""
+        handle = getattr(window, '_hWnd', None)
+        if handle is not None:
+            if handle in self.excluded_handles:
+                return True
+            if self.excluded_pids and self.window_pid(handle) in self.excluded_pids:
+                return True
+        title = window.title
+        if not title or title in self.excluded_titles:
+            return True
+        return any(pattern.match(title) is not None for pattern in self._excluded_patterns)
 
     def get_titles(self) -> List[str]:
         """除外リストを考慮してウィンドウタイトルを取得."""
-        titles = {
-            window.title
-            for window in gw.getAllWindows()
-            if window.title and window.title not in self.excluded_titles
-        }
+        titles = {window.title for window in gw.getAllWindows() if not self.is_excluded(window)}
         return list(titles)
 
 
@@ -145,13 +374,24 @@ class SessionRecorder:
         self,
         log_handler: LogHandler,
         min_play_minutes: int = MIN_PLAY_MINUTES,
+        clock: Clock = datetime.now,
+        output: Callable[[str], None] = print,
+        rollup: Optional[DailyRollup] = None,
     ) -> None:
         self.log_handler = log_handler
         self.min_play_minutes = min_play_minutes
+        self.clock = clock
+        self.output = output
+        self.rollup = rollup
 
     def record(self, game: GameEntry) -> Optional[float]:
         """ゲームセッションを終了して記録し、保存した秒数を返す."""
-        start_time, end_time = game.end_session()
+        with METRICS.timer('record_seconds'):
+            return self._record(game)
+
+    def _record(self, game: GameEntry) -> Optional[float]:
+        """記録処理の本体."""
+        start_time, end_time = game.end_session(self.clock())
 
         if start_time is None or end_time is None:
             return None
@@ -159,15 +399,20 @@ class SessionRecorder:
         play_minutes = (end_time - start_time).total_seconds() / 60
 
         if play_minutes < self.min_play_minutes:
-            print(Messages.GAME_TOO_SHORT.format(
+            self.output(Messages.GAME_TOO_SHORT.format(
                 game_title=game.game_title,
                 min_minutes=self.min_play_minutes,
             ))
             return None
 
         duration_seconds = (end_time - start_time).total_seconds()
-        self._save_to_spreadsheet(game, start_time, end_time)
-        print(Messages.GAME_RECORDED.format(game_title=game.game_title))
+        if not self._save_to_spreadsheet(game, start_time, end_time):
+            # ログにないセッションをロールアップや今日の合計に数えない
+            self.output(Messages.GAME_SAVE_FAILED.format(game_title=game.game_title))
+            return None
+        if self.rollup is not None:
+            self.rollup.add(start_time, end_time, game.game_title)
+        self.output(Messages.GAME_RECORDED.format(game_title=game.game_title))
         return duration_seconds
 
     def _save_to_spreadsheet(
@@ -175,15 +420,15 @@ class SessionRecorder:
         game: GameEntry,
         start_time: datetime,
         end_time: datetime,
-    ) -> None:
-        """スプレッドシートに記録を保存."""
-        self.log_handler.save_record([
+    ) -> bool:
+        """スプレッドシートに記録を保存し、成功したかを返す."""
+        return self.log_handler.save_record(encode_row(
             self.log_handler.get_and_increment_index(),
-            self.log_handler.format_datetime_to_gss_style(start_time),
-            self.log_handler.format_datetime_to_gss_style(end_time),
+            start_time,
+            end_time,
             game.game_title,
             game.play_with_friends,
-        ])
+        ))
 
 
 # =============================================================================
@@ -200,90 +445,198 @@ class GameMonitor:
         recorder: SessionRecorder,
         browsers: Sequence[str] = DEFAULT_BROWSERS,
         poll_interval: int = POLL_INTERVAL_SECONDS,
+        clock: Clock = datetime.now,
+        renderer: Optional[ConsoleRenderer] = None,
+        config_watcher: Optional[ConfigWatcher] = None,
+        force_metrics: bool = False,
+        normalize: bool = False,
+        process_source: Optional[ProcessSource] = None,
     ) -> None:
         self.games = games
         self.scanner = scanner
         self.recorder = recorder
         self.browsers = browsers
+        self.normalize = normalize
+        self.process_source = process_source
         self.poll_interval = poll_interval
+        self.clock = clock
+        self.renderer = renderer or ConsoleRenderer()
+        self.config_watcher = config_watcher
+        self.force_metrics = force_metrics
+        self.catalog = GameCatalog(games, browsers, normalize, use_processes=process_source is not None)
+        # プレイ中のゲームのみをゲーム ID で保持（ティックごとの処理はこの件数に比例）
+        self.active: Dict[int, GameEntry] = {
+            game_id: game for game_id, game in enumerate(self.catalog.games) if game.is_playing
+        }
 
     def run(self) -> None:
         """監視ループを開始."""
-        print('Game Time Tracker を開始しました。Ctrl+C で終了します。')
+        self.renderer.message('Game Time Tracker を開始しました。Ctrl+C で終了します。')
         try:
             while True:
                 self._tick()
+                self._check_config()
+                METRICS.maybe_dump(self.renderer.message)
                 time.sleep(self.poll_interval)
         except KeyboardInterrupt:
-            print('\n終了します。')
+            self.renderer.message('終了します。')
             self._finalize_all_sessions()
+            METRICS.dump(self.renderer.message)
 
     def _tick(self) -> None:
         """1回の監視サイクルを実行."""
-        _clear_console()
-        window_titles = self.scanner.get_titles()
-        active_games = self._update_game_states(window_titles)
-        self._display_status(active_games, window_titles)
-
-    def _update_game_states(self, window_titles: List[str]) -> List[GameEntry]:
-        """全ゲームの状態を更新し、アクティブなゲームを返す."""
-        active_games: List[GameEntry] = []
-
-        for game in self.games:
-            detected = any(
-                game.matches_window(title, self.browsers)
-                for title in window_titles
-            )
+        with METRICS.timer('tick_seconds'):
+            with METRICS.timer('scan_seconds'):
+                window_titles = self.scanner.get_titles()
+                executables = self.process_source.get_executables() if self.process_source else None
+            with METRICS.timer('match_seconds'):
+                active_games = self._update_game_states(window_titles, executables)
+            with METRICS.timer('display_seconds'):
+                self._display_status(active_games, window_titles)
+
+    def _update_game_states(
+        self,
+        window_titles: List[str],
+        executables: Optional[Sequence[str]] = None,
+    ) -> List[GameEntry]:
+        """検出結果に応じてセッションを開始/終了し、アクティブなゲームを返す."""
+        detected = self.catalog.detect(window_titles)
+        if executables is not None:
+            detected |= self.catalog.detect_processes(executables)
 
-            if detected and not game.is_playing:
-                game.start_session()
-            elif not detected and game.is_playing:
-                self.recorder.record(game)
+        for game_id in detected.difference(self.active):
+            game = self.catalog.games[game_id]
+            game.start_session(self.clock())
+            self.active[game_id] = game
 
-            if game.is_playing:
-                active_games.append(game)
+        for game_id in [game_id for game_id in self.active if game_id not in detected]:
+            self.recorder.record(self.active.pop(game_id))
 
-        return active_games
+        return [self.active[game_id] for game_id in sorted(self.active)]
 
     def _display_status(
         self,
         active_games: List[GameEntry],
         window_titles: List[str],
     ) -> None:
-        """現在の状態を表示."""
+        """現在の状態を表示（変化した行のみ書き換え）."""
+        self.renderer.render(self._status_lines(active_games, window_titles))
+
+    def _status_lines(
+        self,
+        active_games: List[GameEntry],
+        window_titles: List[str],
+    ) -> List[str]:
+        """表示するステータス行を組み立てる."""
         if active_games:
-            for game in active_games:
-                elapsed = _format_elapsed(game.start_time)
-                print(Messages.GAME_PLAYING_WITH_ELAPSED.format(
+            now = self.clock()
+            return [
+                Messages.GAME_PLAYING_WITH_ELAPSED.format(
                     game_title=game.game_title,
-                    elapsed=elapsed,
-                ))
-        else:
-            print(Messages.NO_GAME_PLAYING)
-            print(Messages.CURRENT_WINDOWS)
-            for title in window_titles:
-                print(f'- {title}')
+                    elapsed=_format_elapsed(game.start_time, now),
+                )
+                for game in active_games
+            ]
+        lines = [Messages.NO_GAME_PLAYING, Messages.CURRENT_WINDOWS]
+        lines.extend(f'- {title}' for title in sorted(window_titles))
+        return lines
+
+    def _check_config(self) -> None:
+        """設定ファイルの更新を検出したら反映."""
+        if self.config_watcher is None:
+            return
+        change = self.config_watcher.poll()
+        if change is not None:
+            self.apply_config(*change)
+
+    def apply_config(self, config: ConfigLoader, changed: Set[str]) -> None:
+        """変更されたセクションを実行中のコンポーネントに反映（プレイ中のセッションは維持）."""
+        apply_config_change(config, changed, self.recorder, force_metrics=self.force_metrics)
+        games: Sequence[GameEntry] = self.catalog.games
+        if 'game_info' in changed:
+            games = GameInfoLoader(config, self.renderer.message).load() or games
+        if 'window_scan' in changed:
+            self.scanner.set_excluded_titles(config.window_scan['excluded_titles'])
+            self.browsers = config.window_scan['browsers']
+            self.normalize = config.window_scan['normalize']
+            if config.window_scan['process_detection'] != (self.process_source is not None):
+                self.process_source = open_process_source(config, self.renderer.message)
+        if changed & {'game_info', 'window_scan'}:
+            self._replace_catalog(games)
+        self.renderer.message(f'設定を再読み込みしました: {", ".join(sorted(changed))}')
+
+    def _replace_catalog(self, games: Sequence[GameEntry]) -> None:
+        """カタログを作り直し、プレイ中のゲームを引き継ぐ."""
+        catalog = GameCatalog(
+            games, self.browsers, self.normalize, use_processes=self.process_source is not None,
+        )
+        active, removed = remap_active(self.active, catalog)
+        self.catalog = catalog
+        self.games = list(catalog.games)
+        self.active = active
+        for game in removed:
+            self.recorder.record(game)
 
     def _finalize_all_sessions(self) -> None:
         """全てのアクティブセッションを終了."""
-        for game in self.games:
-            if game.is_playing:
-                self.recorder.record(game)
+        for game_id in sorted(self.active):
+            self.recorder.record(self.active.pop(game_id))
+
+
+# =============================================================================
+# 設定の再読み込み
+# =============================================================================
+def apply_config_change(
+    config: ConfigLoader,
+    changed: Set[str],
+    recorder: SessionRecorder,
+    *,
+    force_metrics: bool = False,
+) -> bool:
+    """計測・API 制限・ログシート接続の変更を反映し、ログシートに再接続したかを返す.
+
+    ログシートへの再接続（全件の再取得を伴う）はシートキーか認証情報が変わった場合のみ行う。
+    """
+    if 'metrics' in changed:
+        configure_from(config.metrics, force_enable=force_metrics)
+    if 'sheets' in changed:
+        configure_governor_from(config.sheets)
+
+    reconnected = False
+    if 'log_handler' in changed:
+        try:
+            recorder.log_handler = LogHandler(config, output=recorder.output)
+            reconnected = True
+        except (gspread.exceptions.APIError, OSError) as e:
+            recorder.output(f'ログシートに再接続できませんでした（以前の接続を使用します）: {e}')
+    if reconnected or 'rollup' in changed:
+        recorder.rollup = _open_rollup(config, recorder.log_handler, recorder.output)
+    return reconnected
 
 
 # =============================================================================
 # ユーティリティ関数
 # =============================================================================
+@functools.lru_cache(maxsize=TITLE_NORMALIZE_CACHE_SIZE)
+def normalize_title(title: str) -> str:
+    """照合用にタイトルを正規化（NFKC・casefold・ダッシュ/波ダッシュの統一）.
+
+    全角/半角や大文字/小文字の違うタイトルを同じ文字列にそろえる。結果はタイトルごとに
+    キャッシュするため、同じウィンドウタイトルが続くティックでは再計算しない。
+    """
+    return unicodedata.normalize('NFKC', title).translate(_TITLE_VARIANTS).casefold()
+
+
 def _parse_bool(value: object) -> bool:
     """文字列を bool に変換."""
     return str(value).upper() == 'TRUE'
 
 
-def _format_elapsed(start_time: Optional[datetime]) -> str:
+def _format_elapsed(start_time: Optional[datetime], now: Optional[datetime] = None) -> str:
     """開始時刻からの経過時間を整形."""
     if start_time is None:
         return '0秒'
-    delta_seconds = int((datetime.now() - start_time).total_seconds())
+    delta_seconds = int(((now or datetime.now()) - start_time).total_seconds())
     minutes, seconds = divmod(delta_seconds, 60)
     hours, minutes = divmod(minutes, 60)
     if hours:
@@ -293,30 +646,48 @@ def _format_elapsed(start_time: Optional[datetime]) -> str:
     return f'{seconds}秒'
 
 
-def _clear_console() -> None:
-    """コンソールをクリア."""
-    os.system('cls' if os.name == 'nt' else 'clear')
-
-
 # =============================================================================
 # エントリーポイント
 # =============================================================================
 def main() -> None:
     """アプリケーションのエントリーポイント."""
+    args = _parse_args()
     config = ConfigLoader()
-
-    # コンポーネントの初期化
-    games = GameInfoLoader(config).load()
+    configure_from(config.metrics, force_enable=args.metrics)
+    configure_governor_from(config.sheets)
+
+    # 以降のメッセージはすべてレンダラー経由で出力し、ステータス領域の描画とずらさない
+    renderer = ConsoleRenderer()
+    output = renderer.message
+
+    # コンポーネントの初期化（ゲーム情報とログシートは並列に読み込む）
+    graph = TaskGraph()
+    graph.add('games', GameInfoLoader(config, output).load)
+    graph.add('log_handler', lambda: LogHandler(config, output=output))
+    graph.add('rollup', lambda log_handler: _open_rollup(config, log_handler, output), 'log_handler')
+    graph.add('process_source', lambda: open_process_source(config, output))
+    loaded = graph.run()
+
+    games = loaded['games']
     if not games:
-        print('ゲーム情報が取得できませんでした。config.ini を確認してください。')
+        output('ゲーム情報が取得できませんでした。config.ini を確認してください。')
         return
 
+    console = console_window_handle()
     scanner = WindowScanner(
-        excluded_titles=config.window_scan.get('excluded_titles', DEFAULT_EXCLUDED_TITLES)
+        excluded_titles=config.window_scan.get('excluded_titles', DEFAULT_EXCLUDED_TITLES),
+        excluded_pids=[os.getpid()],
+        excluded_handles=[console] if console is not None else [],
     )
+    if args.record_trace:
+        scanner = TraceRecordingScanner(
+            scanner, args.record_trace, poll_interval=POLL_INTERVAL_SECONDS,
+        )
     recorder = SessionRecorder(
-        log_handler=LogHandler(),
+        log_handler=loaded['log_handler'],
         min_play_minutes=MIN_PLAY_MINUTES,
+        output=output,
+        rollup=loaded['rollup'],
     )
 
     # モニター開始
@@ -326,8 +697,61 @@ def main() -> None:
         recorder=recorder,
         browsers=config.window_scan.get('browsers', DEFAULT_BROWSERS),
         poll_interval=POLL_INTERVAL_SECONDS,
+        renderer=renderer,
+        config_watcher=ConfigWatcher(config, output=output),
+        force_metrics=args.metrics,
+        normalize=config.window_scan['normalize'],
+        process_source=loaded['process_source'],
+    )
+    try:
+        monitor.run()
+    finally:
+        if isinstance(scanner, TraceRecordingScanner):
+            scanner.close()
+
+
+def open_process_source(
+    config: ConfigLoader,
+    output: Callable[[str], None] = print,
+) -> Optional[ProcessSource]:
+    """設定で有効ならプロセスソースを作る（未対応の環境ではタイトル判定のみ）."""
+    if not config.window_scan['process_detection']:
+        return None
+    source = default_process_source()
+    if source is None:
+        output('この環境ではプロセスを列挙できないため、ウィンドウタイトルのみで判定します。')
+    return source
+
+
+def _open_rollup(
+    config: ConfigLoader,
+    log_handler: LogHandler,
+    output: Callable[[str], None] = print,
+) -> Optional[DailyRollup]:
+    """設定で有効ならロールアップワークシートを開く."""
+    if not config.rollup['enabled']:
+        return None
+    try:
+        return DailyRollup(log_handler.spreadsheet, config.rollup['worksheet'], output=output)
+    except gspread.exceptions.APIError as e:
+        output(f'ロールアップシートを開けませんでした: {e}')
+        return None
+
+
+def _parse_args() -> argparse.Namespace:
+    """コマンドライン引数を解析."""
+    parser = argparse.ArgumentParser(description='Game Time Tracker')
+    parser.add_argument(
+        '--metrics',
+        action='store_true',
+        help='処理時間・API 呼び出しの計測を有効化（config.ini の [METRICS] より優先）',
+    )
+    parser.add_argument(
+        '--record-trace',
+        metavar='PATH',
+        help='取得したウィンドウタイトルをトレースファイルに記録（.gz で圧縮、replay_trace.py で再生）',
     )
-    monitor.run()
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
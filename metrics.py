@@ -0,0 +1,222 @@
+"""処理時間・API 呼び出しの計測（ヒストグラム/カウンタ）と定期ダンプ."""
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+# 秒単位のヒストグラム境界（1ms 〜 30s）
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+METRIC_PREFIX = 'gtt_'
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """累積バケット方式のレイテンシヒストグラム."""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 末尾は +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """観測値を追加."""
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """(上限, 累積件数) のリストを返す."""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+class MetricsRegistry:
+    """ヒストグラムとカウンタを保持し、JSON / Prometheus テキストに出力するクラス.
+
+    無効時は計測を一切行わず、呼び出し側のオーバーヘッドを最小にする。
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.json_path: Optional[Path] = None
+        self.prometheus_path: Optional[Path] = None
+        self.dump_interval = 60.0
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._lock = threading.Lock()
+        self._last_dump = time.monotonic()
+
+    def configure(
+        self,
+        *,
+        enabled: bool,
+        json_path: Optional[str] = None,
+        prometheus_path: Optional[str] = None,
+        dump_interval: float = 60.0,
+    ) -> None:
+        """出力先と有効/無効を設定."""
+        self.enabled = enabled
+        self.json_path = Path(json_path) if json_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self.dump_interval = dump_interval
+        self._last_dump = time.monotonic()
+
+    def timer(self, name: str, **labels: str):
+        """with 文でブロックの処理時間を計測."""
+        if not self.enabled:
+            return nullcontext()
+        return self._timer(name, labels)
+
+    @contextmanager
+    def _timer(self, name: str, labels: Dict[str, str]) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """ヒストグラムに観測値を追加."""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """カウンタを加算."""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self) -> None:
+        """計測値を全て破棄."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """現在の計測値を JSON 化可能な dict で返す."""
+        with self._lock:
+            histograms = [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': h.count,
+                    'sum': h.total,
+                    'buckets': [
+                        ['+Inf' if bound == float('inf') else bound, count]
+                        for bound, count in h.cumulative()
+                    ],
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {
+            'timestamp': time.time(),
+            'histograms': histograms,
+            'counters': counters,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus テキスト形式に変換."""
+        lines = []
+        snapshot = self.snapshot()
+        declared = set()
+        for counter in snapshot['counters']:
+            name = METRIC_PREFIX + counter['name']
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} counter')
+            lines.append(f"{name}{_format_labels(counter['labels'])} {counter['value']}")
+        for histogram in snapshot['histograms']:
+            name = METRIC_PREFIX + histogram['name']
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} histogram')
+            labels = histogram['labels']
+            for bound, count in histogram['buckets']:
+                bucket_labels = dict(labels, le=str(bound))
+                lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {count}')
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, output: Callable[[str], None] = print) -> None:
+        """設定された出力先へ書き出す（失敗時のメッセージは output に出力）."""
+        if not self.enabled:
+            return
+        try:
+            if self.json_path:
+                _write_atomic(self.json_path, json.dumps(self.snapshot(), ensure_ascii=False, indent=2))
+            if self.prometheus_path:
+                _write_atomic(self.prometheus_path, self.to_prometheus())
+        except OSError as e:
+            output(f'メトリクスの書き出しに失敗しました: {e}')
+        self._last_dump = time.monotonic()
+
+    def maybe_dump(self, output: Callable[[str], None] = print) -> None:
+        """前回の出力から dump_interval 秒以上経過していれば書き出す."""
+        if self.enabled and time.monotonic() - self._last_dump >= self.dump_interval:
+            self.dump(output)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+        for k, v in labels.items()
+    )
+    return '{' + body + '}'
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(text, encoding='utf-8')
+    tmp.replace(path)
+
+
+# アプリ全体で共有するレジストリ
+METRICS = MetricsRegistry()
+
+
+def configure_from(metrics_config: dict, *, force_enable: bool = False) -> MetricsRegistry:
+    """ConfigLoader.metrics の内容で共有レジストリを設定."""
+    METRICS.configure(
+        enabled=force_enable or metrics_config.get('enabled', False),
+        json_path=metrics_config.get('json_path'),
+        prometheus_path=metrics_config.get('prometheus_path'),
+        dump_interval=metrics_config.get('dump_interval', 60.0),
+    )
+    return METRICS
@@ -0,0 +1,59 @@
+"""ログシートのレコードから今日のプレイ時間を集計する関数群（GUI から利用）."""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, Mapping
+
+from log_codec import LogRecord, day_bounds
+
+GSS_DATETIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+
+def sum_today_seconds(records: Iterable[Mapping], today: date) -> float:
+    """今日開始したセッションの合計秒数を返す."""
+    total = 0.0
+    for record in records:
+        try:
+            start = datetime.strptime(str(record['start_time']), GSS_DATETIME_FORMAT)
+            end = datetime.strptime(str(record['end_time']), GSS_DATETIME_FORMAT)
+        except (ValueError, KeyError):
+            continue
+        if start.date() != today:
+            continue
+        total += (end - start).total_seconds()
+    return total
+
+
+def sum_today_minutes_by_title(records: Iterable[Mapping], today: date) -> Dict[str, float]:
+    """今日開始したセッションのゲームごとの合計分数を返す."""
+    game_minutes: Dict[str, float] = {}
+    for record in records:
+        try:
+            start = datetime.strptime(str(record['start_time']), GSS_DATETIME_FORMAT)
+            end = datetime.strptime(str(record['end_time']), GSS_DATETIME_FORMAT)
+            game_title = str(record.get('title', '不明'))
+        except (ValueError, KeyError):
+            continue
+        if start.date() != today:
+            continue
+        minutes = (end - start).total_seconds() / 60
+        game_minutes[game_title] = game_minutes.get(game_title, 0) + minutes
+    return game_minutes
+
+
+# =============================================================================
+# 型付きレコード（LogHandler.get_typed_records）用
+# =============================================================================
+def sum_seconds_on(records: Iterable[LogRecord], day: date) -> float:
+    """指定日に開始したセッションの合計秒数を返す（日時は整数比較のみ）."""
+    start, end = day_bounds(day)
+    return float(sum(r.end - r.start for r in records if start <= r.start < end))
+
+
+def sum_minutes_by_title_on(records: Iterable[LogRecord], day: date) -> Dict[str, float]:
+    """指定日に開始したセッションのゲームごとの合計分数を返す."""
+    start, end = day_bounds(day)
+    game_minutes: Dict[str, float] = {}
+    for record in records:
+        if start <= record.start < end:
+            game_minutes[record.title] = game_minutes.get(record.title, 0) + (record.end - record.start) / 60
+    return game_minutes
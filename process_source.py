@@ -0,0 +1,165 @@
+"""実行中プロセスの実行ファイルを列挙するプロセスソース.
+
+GameCatalog は実行ファイル名のハッシュ索引でプロセスをゲームに対応付けるため、
+プロセスによる検出のコストはカタログ件数によらずプロセス数に比例する。
+"""
+
+import ctypes
+import functools
+from abc import ABC, abstractmethod
+import os
+import sys
+from typing import List, Optional
+
+PROC_ROOT = '/proc'
+# readlink した exe のパスに付く、実行ファイルが置き換えられた場合の接尾辞
+DELETED_SUFFIX = ' (deleted)'
+
+# Windows API
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+MAX_PROCESSES = 4096
+MAX_PATH_LENGTH = 32768
+
+
+class ProcessSource(ABC):
+    """実行中プロセスの実行ファイルパス（取得できなければプロセス名）を返すインターフェース."""
+
+    @abstractmethod
+    def get_executables(self) -> List[str]:
+        """実行中プロセスの実行ファイルを返す."""
+
+
+class ProcProcessSource(ProcessSource):
+    """Linux の /proc から列挙するプロセスソース（root を差し替えればテスト用ディレクトリも読める）."""
+
+    def __init__(self, root: str = PROC_ROOT) -> None:
+        self.root = root
+
+    def get_executables(self) -> List[str]:
+        """各プロセスの exe のリンク先（読めなければ argv[0] の実行ファイル名か comm）を返す."""
+        try:
+            entries = os.listdir(self.root)
+        except OSError:
+            return []
+
+        executables = []
+        for entry in entries:
+            if not entry.isdigit():
+                continue
+            path = os.path.join(self.root, entry)
+            try:
+                target = os.readlink(os.path.join(path, 'exe'))
+            except OSError:
+                # 他ユーザーのプロセスやカーネルスレッドは exe を読めないため、コマンドラインの
+                # argv[0] で代用する。comm はカーネルが 15 文字に切り詰めるため、argv[0] が
+                # 空のもの（カーネルスレッドなど）だけに使う
+                target = self._read_argv0(path) or self._read_comm(path)
+            if target:
+                executables.append(target.removesuffix(DELETED_SUFFIX))
+        return executables
+
+    @staticmethod
+    def _read_argv0(path: str) -> str:
+        """cmdline の先頭（argv[0]）のファイル名部分を返す（Wine などの \\ 区切りも扱う）."""
+        try:
+            with open(os.path.join(path, 'cmdline'), 'rb') as f:
+                argv0 = f.read().split(b'\0', 1)[0].decode('utf-8', errors='replace')
+        except OSError:
+            return ''
+        return argv0.replace('\\', '/').rpartition('/')[2]
+
+    @staticmethod
+    def _read_comm(path: str) -> str:
+        try:
+            with open(os.path.join(path, 'comm'), encoding='utf-8', errors='replace') as f:
+                return f.read().strip()
+        except OSError:
+            # 列挙中に終了したプロセス
+            return ''
+
+
+class WindowsProcessSource(ProcessSource):
+    """Windows のプロセス一覧から列挙するプロセスソース（psapi / kernel32 を ctypes で呼ぶ）."""
+
+    def __init__(self) -> None:
+        from ctypes import wintypes
+
+        self._psapi = ctypes.windll.psapi
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+        self._kernel32.OpenProcess.restype = wintypes.HANDLE
+        self._kernel32.QueryFullProcessImageNameW.argtypes = (
+            wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD),
+        )
+        self._kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+        self._pids = (wintypes.DWORD * MAX_PROCESSES)()
+        self._buffer = ctypes.create_unicode_buffer(MAX_PATH_LENGTH)
+
+    def get_executables(self) -> List[str]:
+        """各プロセスの実行ファイルのフルパスを返す（権限がなく開けないプロセスは除く）."""
+        from ctypes import wintypes
+
+        needed = wintypes.DWORD()
+        if not self._psapi.EnumProcesses(self._pids, ctypes.sizeof(self._pids), ctypes.byref(needed)):
+            return []
+        count = needed.value // ctypes.sizeof(wintypes.DWORD)
+
+        executables = []
+        for pid in self._pids[:count]:
+            handle = self._kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+            if not handle:
+                continue
+            try:
+                size = wintypes.DWORD(MAX_PATH_LENGTH)
+                if self._kernel32.QueryFullProcessImageNameW(handle, 0, self._buffer, ctypes.byref(size)):
+                    executables.append(self._buffer.value)
+            finally:
+                self._kernel32.CloseHandle(handle)
+        return executables
+
+
+def default_process_source() -> Optional[ProcessSource]:
+    """実行環境に合ったプロセスソースを返す（対応していなければ None）."""
+    if sys.platform == 'win32':
+        return WindowsProcessSource()
+    if os.path.isdir(PROC_ROOT):
+        return ProcProcessSource()
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _user32():
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    user32.GetWindowThreadProcessId.argtypes = (wintypes.HWND, ctypes.POINTER(wintypes.DWORD))
+    user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+    return user32
+
+
+def window_process_id(handle: int) -> Optional[int]:
+    """ウィンドウハンドルを所有するプロセスの PID（Windows 以外や取得できない場合は None）."""
+    if sys.platform != 'win32':
+        return None
+    from ctypes import wintypes
+
+    pid = wintypes.DWORD()
+    if not _user32().GetWindowThreadProcessId(handle, ctypes.byref(pid)):
+        return None
+    return pid.value
+
+
+def console_window_handle() -> Optional[int]:
+    """このプロセスが接続しているコンソールウィンドウのハンドル（なければ None）."""
+    if sys.platform != 'win32':
+        return None
+    from ctypes import wintypes
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetConsoleWindow.restype = wintypes.HWND
+    return kernel32.GetConsoleWindow() or None
+
+
+def executable_key(path: str) -> str:
+    """照合用に実行ファイルのパスを正規化（区切り文字を / にそろえて casefold）."""
+    return path.replace('\\', '/').casefold()
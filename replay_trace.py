@@ -0,0 +1,126 @@
+"""記録したウィンドウトレースを仮想時計で高速リプレイするコマンド.
+
+    python main.py --record-trace trace.jsonl.gz      # トレースを記録
+    python replay_trace.py trace.jsonl.gz --catalog games.csv --output sessions.csv
+
+スプレッドシートへは書き込まず、記録されるはずのセッションを表示/CSV 出力する。
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import sys
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from config_loader import DEFAULT_BROWSERS, ConfigLoader
+from main import (
+    MIN_PLAY_MINUTES,
+    GameEntry,
+    GameInfoLoader,
+    GameMonitor,
+    SessionRecorder,
+    _parse_bool,
+)
+from window_trace import ReplayScanner, VirtualClock, read_trace, replay
+
+LOG_HEADER = ['index', 'start_time', 'end_time', 'title', 'play_with_friends']
+
+
+class MemoryLogHandler:
+    """記録行をメモリに保持する LogHandler の代替."""
+
+    def __init__(self) -> None:
+        self.rows: List[list] = []
+        self.index = 0
+
+    def format_datetime_to_gss_style(self, dt: datetime) -> str:
+        return dt.strftime('%Y/%m/%d %H:%M:%S')
+
+    def get_and_increment_index(self) -> int:
+        self.index += 1
+        return self.index
+
+    def save_record(self, values: list) -> bool:
+        self.rows.append(values)
+        return True
+
+
+def load_catalog_csv(path: str) -> List[GameEntry]:
+    """ゲーム情報シートと同じ列構成の CSV からカタログを読み込む."""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return [
+            GameEntry(
+                game_title=row['game_title'],
+                window_title=row['window_title'],
+                play_with_friends=_parse_bool(row.get('play_with_friends', 'FALSE')),
+                is_browser_game=_parse_bool(row.get('is_browser_game', 'FALSE')),
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """リプレイのエントリーポイント."""
+    parser = argparse.ArgumentParser(description='ウィンドウトレースのリプレイ')
+    parser.add_argument('trace', help='main.py --record-trace で記録したファイル')
+    parser.add_argument('--catalog', help='ゲーム情報 CSV（省略時は config.ini のシートから読み込む）')
+    parser.add_argument('--min-play-minutes', type=int, default=MIN_PLAY_MINUTES)
+    parser.add_argument('--step', type=float, help='ティック間隔（秒、既定はトレースのポーリング間隔）')
+    parser.add_argument('--every-tick', action='store_true', help='変化のないティックも全て実行する')
+    parser.add_argument('--output', help='記録されるセッションの CSV 出力先')
+    parser.add_argument('--verbose', action='store_true', help='記録時のメッセージを表示する')
+    args = parser.parse_args(argv)
+
+    if args.catalog:
+        games = load_catalog_csv(args.catalog)
+        browsers = DEFAULT_BROWSERS
+    else:
+        config = ConfigLoader()
+        games = GameInfoLoader(config).load()
+        browsers = config.window_scan.get('browsers', DEFAULT_BROWSERS)
+    if not games:
+        print('ゲーム情報が取得できませんでした。')
+        return 1
+
+    trace = read_trace(args.trace)
+    clock = VirtualClock(trace.start)
+    scanner = ReplayScanner()
+    log_handler = MemoryLogHandler()
+    monitor = GameMonitor(
+        games=games,
+        scanner=scanner,
+        recorder=SessionRecorder(
+            log_handler=log_handler,
+            min_play_minutes=args.min_play_minutes,
+            clock=clock,
+        ),
+        browsers=browsers,
+        clock=clock,
+    )
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        stats = replay(trace, monitor, clock, scanner, step=args.step, every_tick=args.every_tick)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(LOG_HEADER)
+            writer.writerows(log_handler.rows)
+    else:
+        for row in log_handler.rows:
+            print(', '.join(str(value) for value in row))
+
+    print(
+        f'{len(log_handler.rows)}件のセッション / {stats.ticks}ティック / '
+        f'仮想 {stats.virtual_seconds:.0f}秒を {stats.wall_seconds:.3f}秒で再生'
+        f'（{stats.speedup:,.0f}倍速）',
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""Google Sheets API 呼び出しを一元管理するリクエストガバナー.
+
+全ての Sheets 呼び出しはここを経由し、以下を行う。
+
+- トークンバケットによる毎分のリクエスト数制限（API クォータに合わせる）
+- 429 応答時の Retry-After（なければ指数バックオフ）に従った待機と再試行
+- 書き込みを優先するレーン制御（書き込み待ちがある間は読み込みを待たせる）
+- 同一キーの読み込みが同時に発生した場合の1リクエストへの集約
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+import gspread
+
+from metrics import METRICS
+
+T = TypeVar('T')
+
+READ = 'read'
+WRITE = 'write'
+
+# Sheets API の既定クォータ（ユーザーごと・毎分）
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_MAX_RETRIES = 5
+MAX_BACKOFF_SECONDS = 64.0
+RETRYABLE_READ_STATUSES = (429, 500, 502, 503, 504)
+# 書き込みは処理済みの可能性がある 5xx では再試行しない（二重追記を防ぐ）
+RETRYABLE_WRITE_STATUSES = (429,)
+
+
+class _Flight:
+    """集約中の読み込みリクエスト."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SheetsGovernor:
+    """Sheets API 呼び出しのレート制限・再試行・集約を行うクラス."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        *,
+        burst: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._waiting_writes = 0
+        self._paused_until = 0.0
+        self.configure(requests_per_minute=requests_per_minute, burst=burst, max_retries=max_retries)
+
+    def configure(
+        self,
+        *,
+        requests_per_minute: float,
+        burst: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """クォータと再試行回数を設定（バケットは満杯から開始、0 以下なら無制限）."""
+        with self._cond:
+            self.rate = max(0.0, requests_per_minute / 60.0)
+            self.capacity = burst if burst is not None else max(1.0, requests_per_minute / 6.0)
+            self.max_retries = max_retries
+            self._tokens = self.capacity
+            self._updated = self.clock()
+            self._cond.notify_all()
+
+    def call(
+        self,
+        method: str,
+        func: Callable[[], T],
+        *,
+        lane: str = READ,
+        key: Optional[Hashable] = None,
+    ) -> T:
+        """func を Sheets API 呼び出しとして実行.
+
+        lane=READ かつ key を指定した場合、同じ key の実行中リクエストがあれば
+        その結果を共有する（共有された結果は変更しないこと）。
+        """
+        if lane != READ or key is None:
+            return self._call_with_retry(method, func, lane)
+
+        with self._cond:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            METRICS.inc('sheets_coalesced_total', method=method)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._call_with_retry(method, func, lane)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._cond:
+                del self._inflight[key]
+            flight.done.set()
+
+    def _call_with_retry(self, method: str, func: Callable[[], T], lane: str) -> T:
+        retryable = RETRYABLE_WRITE_STATUSES if lane == WRITE else RETRYABLE_READ_STATUSES
+        attempt = 0
+        while True:
+            self._acquire(lane)
+            METRICS.inc('sheets_calls_total', method=method)
+            try:
+                with METRICS.timer('sheets_call_seconds', method=method):
+                    return func()
+            except gspread.exceptions.APIError as e:
+                METRICS.inc('sheets_errors_total', method=method)
+                status = _status_code(e)
+                if status not in retryable or attempt >= self.max_retries:
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(MAX_BACKOFF_SECONDS, 2 ** attempt) + random.random()
+                METRICS.inc('sheets_retries_total', method=method, status=str(status))
+                self._pause(delay)
+                attempt += 1
+            except Exception:
+                METRICS.inc('sheets_errors_total', method=method)
+                raise
+
+    def _acquire(self, lane: str) -> None:
+        """レーンの優先度を考慮してトークンを1つ取得するまで待つ."""
+        started = self.clock()
+        with self._cond:
+            if lane == WRITE:
+                self._waiting_writes += 1
+            try:
+                while True:
+                    now = self.clock()
+                    self._refill(now)
+                    if now < self._paused_until:
+                        self._cond.wait(self._paused_until - now)
+                    elif lane == READ and self._waiting_writes:
+                        self._cond.wait()
+                    elif self.rate == 0:
+                        break
+                    elif self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    else:
+                        self._cond.wait((1 - self._tokens) / self.rate)
+            finally:
+                if lane == WRITE:
+                    self._waiting_writes -= 1
+                    self._cond.notify_all()
+        waited = self.clock() - started
+        if waited > 0:
+            METRICS.observe('sheets_throttle_wait_seconds', waited, lane=lane)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _pause(self, seconds: float) -> None:
+        """全レーンの送信を seconds 秒止める（クォータ超過時）."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+            self._tokens = 0
+            self._cond.notify_all()
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """APIError から HTTP ステータスコードを取り出す."""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None and error.args and isinstance(error.args[0], dict):
+        status = error.args[0].get('code')
+    return int(status) if status is not None else None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Retry-After ヘッダ（秒数または HTTP 日付）を秒数で返す."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def read_key(sheet: object, method: str, *args: Hashable) -> Hashable:
+    """読み込みリクエストの集約キーを作る（同じシート・同じ引数なら同じキー）."""
+    return (
+        getattr(sheet, 'spreadsheet_id', None),
+        getattr(sheet, 'id', id(sheet)),
+        method,
+    ) + args
+
+
+# アプリ全体で共有するガバナー
+GOVERNOR = SheetsGovernor()
+
+
+def configure_from(sheets_config: dict) -> SheetsGovernor:
+    """ConfigLoader.sheets の内容で共有ガバナーを設定."""
+    GOVERNOR.configure(
+        requests_per_minute=sheets_config.get('requests_per_minute', DEFAULT_REQUESTS_PER_MINUTE),
+        max_retries=sheets_config.get('max_retries', DEFAULT_MAX_RETRIES),
+    )
+    return GOVERNOR
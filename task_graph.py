@@ -0,0 +1,70 @@
+"""依存関係のある初期化処理をスレッドプールで並列に実行するタスクグラフ.
+
+起動時の読み込み（ゲーム情報・ログシートなど）はほとんどが通信待ちのため、
+互いに依存しない処理を並列に実行すると起動時間は最も長い経路の分だけになる。
+各タスクは1回だけ実行され、その結果は依存する全てのタスクで共有される
+（同じデータを複数の利用者が別々に取得しない single-flight）。
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from metrics import METRICS
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class TaskGraph:
+    """名前付きタスクと依存関係を登録し、依存が揃ったものから並列に実行するクラス."""
+
+    def __init__(self) -> None:
+        self._tasks: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+
+    def add(self, name: str, func: Callable[..., Any], *deps: str) -> None:
+        """タスクを登録（func には依存タスクの結果が deps の順で位置引数として渡される）."""
+        if name in self._tasks:
+            raise ValueError(f'タスクが重複しています: {name}')
+        self._tasks[name] = (func, deps)
+
+    def run(self, max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, Any]:
+        """全タスクを実行し、タスク名 → 結果の dict を返す.
+
+        いずれかのタスクが例外を送出した場合、未開始のタスクは実行せずにその例外を送出する。
+        """
+        for name, (_, deps) in self._tasks.items():
+            unknown = [dep for dep in deps if dep not in self._tasks]
+            if unknown:
+                raise ValueError(f'{name} の依存タスクが登録されていません: {unknown}')
+
+        results: Dict[str, Any] = {}
+        running: Dict[Future, str] = {}
+        pending = dict(self._tasks)
+        error: Optional[BaseException] = None
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='startup') as executor:
+            while pending or running:
+                if error is None:
+                    for name in [n for n, (_, deps) in pending.items() if all(d in results for d in deps)]:
+                        func, deps = pending.pop(name)
+                        args = [results[dep] for dep in deps]
+                        running[executor.submit(self._run_task, name, func, args)] = name
+                if not running:
+                    if error is None:
+                        raise ValueError(f'タスクの依存関係が循環しています: {sorted(pending)}')
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException as e:
+                        if error is None:
+                            error = e
+        if error is not None:
+            raise error
+        return results
+
+    @staticmethod
+    def _run_task(name: str, func: Callable[..., Any], args: list) -> Any:
+        with METRICS.timer('startup_task_seconds', task=name):
+            return func(*args)
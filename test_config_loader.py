@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import config_loader
+
+CONFIG = """[LOGHANDLER]
+json_file_path = service_account.json
+sheet_key = log-key
+
+[GAMEINFO]
+sheet_key = game-key
+sheet_gid = 1
+
+[WINDOW_SCAN]
+browsers = {browsers}
+"""
+
+
+class TestConfigWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "config.ini"
+        self.now = [0.0]
+        self.messages = []
+        self.write(CONFIG.format(browsers="Chrome"))
+        self.watcher = config_loader.ConfigWatcher(
+            config_loader.ConfigLoader(self.path),
+            interval=2,
+            clock=lambda: self.now[0],
+            output=self.messages.append,
+        )
+
+    def write(self, text):
+        self.path.write_text(text, encoding="utf-8")
+        # mtime の分解能に依存しないよう、書き込みごとに更新時刻を進める
+        stamp = getattr(self, "stamp", 1_000_000_000) + 10
+        self.stamp = stamp
+        os.utime(self.path, (stamp, stamp))
+
+    def test_reports_changed_sections(self):
+        self.write(CONFIG.format(browsers="Chrome, Edge"))
+        self.assertIsNone(self.watcher.poll())  # interval 経過前は stat しない
+
+        self.now[0] = 2
+        config, changed = self.watcher.poll()
+        self.assertEqual(changed, {"window_scan"})
+        self.assertEqual(config.window_scan["browsers"], ["Chrome", "Edge"])
+
+        self.now[0] = 4
+        self.assertIsNone(self.watcher.poll())
+
+    def test_invalid_config_keeps_previous(self):
+        self.write(CONFIG.format(browsers="Edge").replace("sheet_key = log-key", "sheet_key ="))
+        self.now[0] = 2
+        self.assertIsNone(self.watcher.poll())
+        self.assertEqual(self.watcher.config.window_scan["browsers"], ["Chrome"])
+        self.assertIn("LOGHANDLER.sheet_key", self.messages[0])
+
+        self.write(CONFIG.format(browsers="Edge"))
+        self.now[0] = 4
+        _, changed = self.watcher.poll()
+        self.assertEqual(changed, {"window_scan"})
+
+    def test_invalid_exclusion_regex_keeps_previous(self):
+        self.write(CONFIG.format(browsers="Chrome") + "exclude_titles = prefix:Overlay, regex:通知 (\\d+\n")
+        self.now[0] = 2
+        self.assertIsNone(self.watcher.poll())
+        self.assertIn("WINDOW_SCAN.exclude_titles", self.messages[0])
+
+    def test_exclusion_rules_with_flags_and_groups_are_applied(self):
+        self.write(CONFIG.format(browsers="Chrome") + "exclude_titles = regex:(?i)steam, regex:(?P<n>a)(?P=n), regex:(?P<n>b)\n")
+        self.now[0] = 2
+        config, changed = self.watcher.poll()
+        self.assertEqual(changed, {"window_scan"})
+        self.assertEqual(self.messages, [])
+
+        _, patterns = config_loader.compile_exclusions(config.window_scan["excluded_titles"])
+        self.assertTrue(any(pattern.match("Steam") for pattern in patterns))
+
+    def test_unchanged_values_are_ignored(self):
+        self.write(CONFIG.format(browsers="Chrome") + "\n")
+        self.now[0] = 2
+        self.assertIsNone(self.watcher.poll())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import io
+import unittest
+
+import console_renderer
+
+
+class TestConsoleRenderer(unittest.TestCase):
+    def test_plain_output_appends_only_on_change(self):
+        stream = io.StringIO()
+        renderer = console_renderer.ConsoleRenderer(stream, ansi=False)
+
+        renderer.render(["a", "b"])
+        renderer.render(["a", "b"])
+        renderer.render(["a", "c"])
+
+        self.assertEqual(stream.getvalue(), "a\nb\na\nc\n")
+
+    def test_ansi_output_rewrites_only_changed_lines(self):
+        stream = io.StringIO()
+        renderer = console_renderer.ConsoleRenderer(stream, ansi=True)
+        renderer.render(["header", "Terraria 1秒"])
+        stream.seek(0)
+        stream.truncate()
+
+        renderer.render(["header", "Terraria 2秒"])
+
+        output = stream.getvalue()
+        self.assertTrue(output.startswith("\x1b[2F\x1b[1E"))
+        self.assertIn("\x1b[2KTerraria 2秒\n", output)
+        self.assertNotIn("header", output)
+
+    def test_ansi_output_clears_removed_lines(self):
+        stream = io.StringIO()
+        renderer = console_renderer.ConsoleRenderer(stream, ansi=True)
+        renderer.render(["a", "b", "c"])
+        stream.seek(0)
+        stream.truncate()
+
+        renderer.render(["a"])
+
+        self.assertEqual(stream.getvalue(), "\x1b[3F\x1b[1E\x1b[J")
+
+    def test_fit_width_counts_wide_characters(self):
+        self.assertEqual(console_renderer._fit_width("ゲームabc", 5), "ゲー")
+        self.assertEqual(console_renderer._fit_width("abc", 5), "abc")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import sys
+import types
+import unittest
+from datetime import date, datetime
+
+# Stub external dependencies before importing the app.
+fake_gspread = types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+)
+sys.modules.setdefault("gspread", fake_gspread)
+
+import daily_rollup
+from log_codec import LogRecord, parse_datetime_text
+from fake_sheets import FakeSheetsBackend
+from sheets_governor import GOVERNOR
+
+
+class FakeWorksheet:
+    def __init__(self, title, values=None):
+        self.title = title
+        self.values = [list(row) for row in values or []]
+        self.calls = []
+
+    def get_all_values(self):
+        return [[str(cell) for cell in row] for row in self.values]
+
+    def get(self, range_name):
+        # "A{n}:D{n}" 形式の1行読み込み
+        row_number = int(range_name.split(":")[0][1:])
+        return [[str(cell) for cell in self.values[row_number - 1]]]
+
+    def append_row(self, row, **kwargs):
+        self.calls.append("append_row")
+        self.values.append(list(row))
+
+    def update(self, range_name, values, **kwargs):
+        self.calls.append(f"update {range_name}")
+        if range_name == "A1":
+            for i, row in enumerate(values):
+                if i < len(self.values):
+                    self.values[i] = list(row)
+                else:
+                    self.values.append(list(row))
+            return
+        # "C{n}:D{n}" 形式の1行更新
+        row_number = int(range_name.split(":")[0][1:])
+        self.values[row_number - 1][2:4] = values[0]
+
+    @property
+    def row_count(self):
+        return len(self.values)
+
+    def resize(self, rows):
+        del self.values[rows:]
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets=()):
+        self._worksheets = list(worksheets)
+
+    def worksheets(self):
+        return list(self._worksheets)
+
+    def add_worksheet(self, title, rows, cols):
+        worksheet = FakeWorksheet(title)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+
+def record(start, end, title):
+    return LogRecord(0, parse_datetime_text(start), parse_datetime_text(end), title, False)
+
+
+class TestDailyRollup(unittest.TestCase):
+    def setUp(self):
+        GOVERNOR.configure(requests_per_minute=0)
+        self.spreadsheet = FakeSpreadsheet()
+        self.rollup = daily_rollup.DailyRollup(self.spreadsheet)
+        self.worksheet = self.rollup.worksheet
+
+    def test_creates_worksheet_with_header(self):
+        self.assertEqual(self.worksheet.values, [daily_rollup.ROLLUP_HEADER])
+
+    def test_add_appends_then_updates_the_same_row(self):
+        self.rollup.add(datetime(2024, 5, 1, 10), datetime(2024, 5, 1, 10, 30), "Game")
+        self.rollup.add(datetime(2024, 5, 1, 20), datetime(2024, 5, 1, 21), "Game")
+        self.rollup.add(datetime(2024, 5, 1, 22), datetime(2024, 5, 1, 22, 10), "Other")
+
+        self.assertEqual(self.worksheet.values[1], ["2024-05-01", "Game", 5400, 2])
+        self.assertEqual(self.worksheet.values[2], ["2024-05-01", "Other", 600, 1])
+        self.assertEqual(
+            self.worksheet.calls[-3:], ["append_row", "update C2:D2", "append_row"]
+        )
+        self.assertEqual(
+            self.rollup.seconds_by_title(date(2024, 5, 1)), {"Game": 5400.0, "Other": 600.0}
+        )
+        self.assertEqual(self.rollup.seconds_by_title(date(2024, 5, 2)), {})
+
+    def test_failed_update_is_reported_through_output(self):
+        messages = []
+        rollup = daily_rollup.DailyRollup(self.spreadsheet, output=messages.append)
+
+        def fail(*args, **kwargs):
+            raise fake_gspread.exceptions.APIError("quota")
+
+        self.worksheet.append_row = fail
+        rollup.add(datetime(2024, 5, 1, 10), datetime(2024, 5, 1, 10, 30), "Game")
+
+        self.assertEqual(len(messages), 1)
+        self.assertIn("rebuild", messages[0])
+
+    def test_loads_existing_rows(self):
+        self.rollup.add(datetime(2024, 5, 1, 10), datetime(2024, 5, 1, 10, 30), "Game")
+        reopened = daily_rollup.DailyRollup(self.spreadsheet)
+        reopened.add(datetime(2024, 5, 1, 12), datetime(2024, 5, 1, 12, 30), "Game")
+
+        self.assertEqual(len(self.spreadsheet.worksheets()), 1)
+        self.assertEqual(self.worksheet.values[1][2:], [3600, 2])
+
+    def test_rebuild_replaces_rows(self):
+        self.rollup.add(datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11), "Stale")
+        self.rollup.add(datetime(2024, 1, 2, 10), datetime(2024, 1, 2, 11), "Stale")
+        self.rollup.add(datetime(2024, 1, 3, 10), datetime(2024, 1, 3, 11), "Stale")
+
+        rows = self.rollup.rebuild([
+            record("2024/05/01 10:00:00", "2024/05/01 10:30:00", "Game"),
+            record("2024/05/01 20:00:00", "2024/05/01 21:00:00", "Game"),
+        ])
+
+        self.assertEqual(rows, 1)
+        self.assertEqual(
+            self.worksheet.values,
+            [daily_rollup.ROLLUP_HEADER, ["2024-05-01", "Game", 5400, 2]],
+        )
+        self.assertEqual(self.rollup.seconds_by_title(date(2024, 5, 1)), {"Game": 5400.0})
+
+
+    def test_rebuild_grows_grid_before_writing(self):
+        backend = FakeSheetsBackend()
+        spreadsheet = backend.create_spreadsheet("log")
+        rollup = daily_rollup.DailyRollup(spreadsheet)
+
+        rows = rollup.rebuild([
+            record(f"2024/05/{day:02} 10:00:00", f"2024/05/{day:02} 11:00:00", "Game") for day in range(1, 4)
+        ])
+
+        self.assertEqual(rows, 3)
+        self.assertEqual(rollup.worksheet.row_count, 4)
+        self.assertEqual(rollup.seconds_by_title(date(2024, 5, 3)), {"Game": 3600.0})
+
+    def test_add_after_rebuild_writes_to_the_moved_row(self):
+        backend = FakeSheetsBackend()
+        spreadsheet = backend.create_spreadsheet("log")
+        tracker = daily_rollup.DailyRollup(spreadsheet)
+        tracker.add(datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11), "B")
+        tracker.add(datetime(2024, 1, 1, 12), datetime(2024, 1, 1, 13), "A")
+
+        # rebuild は行を (日付, タイトル) 順に並べ替える
+        daily_rollup.DailyRollup(spreadsheet).rebuild([
+            record("2024/01/01 10:00:00", "2024/01/01 11:00:00", "B"),
+            record("2024/01/01 12:00:00", "2024/01/01 13:00:00", "A"),
+        ])
+        tracker.add(datetime(2024, 1, 1, 20), datetime(2024, 1, 1, 21), "B")
+
+        self.assertEqual(tracker.worksheet.get_all_values()[1:], [
+            ["2024-01-01", "A", "3600", "1"],
+            ["2024-01-01", "B", "7200", "2"],
+        ])
+
+    def test_two_trackers_add_to_the_same_row(self):
+        other = daily_rollup.DailyRollup(self.spreadsheet)
+        self.rollup.add(datetime(2024, 5, 1, 10), datetime(2024, 5, 1, 11), "Game")
+        other.add(datetime(2024, 5, 1, 12), datetime(2024, 5, 1, 13), "Game")
+        self.rollup.add(datetime(2024, 5, 1, 14), datetime(2024, 5, 1, 15), "Game")
+
+        self.assertEqual(self.worksheet.values[1:], [["2024-05-01", "Game", 10800, 3]])
+
+
+class TestAggregate(unittest.TestCase):
+    def test_groups_by_start_date_and_title(self):
+        totals = daily_rollup.aggregate([
+            record("2024/05/01 23:30:00", "2024/05/02 00:30:00", "Game"),
+            record("2024/05/02 10:00:00", "2024/05/02 10:05:00", "Game"),
+        ])
+        self.assertEqual(
+            totals, {("2024-05-01", "Game"): (3600, 1), ("2024-05-02", "Game"): (300, 1)}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import sys
+import types
+import unittest
+from datetime import datetime
+
+# Stub external dependencies before importing the app.
+fake_gspread = types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+)
+fake_pygetwindow = types.SimpleNamespace(getAllWindows=lambda: [])
+sys.modules.setdefault("gspread", fake_gspread)
+sys.modules.setdefault("pygetwindow", fake_pygetwindow)
+
+import log_handler
+from fake_sheets import FakeSheetsBackend
+from log_codec import encode_row
+from main import GameInfoLoader
+from sheets_governor import GOVERNOR
+
+HEADER = ["index", "start_time", "end_time", "title", "play_with_friends"]
+CONFIG = types.SimpleNamespace(
+    log_handler={"cert_file_path": "sa.json", "sheet_key": "log-key"},
+    game_info={"sheet_key": "info-key", "sheet_gid": "42"},
+)
+
+
+def log_rows(count):
+    return [
+        [i + 1, f"2024/01/{i % 28 + 1:02} 10:00:00", f"2024/01/{i % 28 + 1:02} 11:30:00", f"Game{i % 3}", "FALSE"]
+        for i in range(count)
+    ]
+
+
+class FakeSheetsTestCase(unittest.TestCase):
+    def setUp(self):
+        GOVERNOR.configure(requests_per_minute=0)
+        self.backend = FakeSheetsBackend()
+        self.log = self.backend.create_spreadsheet("log-key").seed_worksheet("log", [HEADER] + log_rows(5), rows=10)
+        info = self.backend.create_spreadsheet("info-key")
+        info.seed_worksheet("games", [
+            ["game_title", "window_title", "play_with_friends", "is_browser_game", "executable"],
+            ["Game A", "Game A Window", "TRUE", "FALSE", "game_a.exe"],
+        ], sheet_id=42)
+        installed = self.backend.installed()
+        installed.__enter__()
+        self.addCleanup(installed.__exit__, None, None, None)
+
+
+class TestAppAgainstFakeSheets(FakeSheetsTestCase):
+    def test_log_handler_reads_typed_records_with_one_request(self):
+        handler = log_handler.LogHandler(CONFIG)
+
+        self.assertEqual(self.backend.requests["get_all_values"], 1)
+        self.assertEqual(handler.index, 5)
+        first = handler.typed_records[0]
+        self.assertEqual(first.duration, 5400)
+        self.assertEqual(first.start_datetime, datetime(2024, 1, 1, 10, 0))
+        self.assertFalse(first.play_with_friends)
+
+    def test_saved_row_reads_back_as_dates(self):
+        handler = log_handler.LogHandler(CONFIG)
+        for index in (6, 7, 8, 9, 10, 11):
+            handler.save_record(encode_row(
+                index, datetime(2024, 2, 1, 20, 0), datetime(2024, 2, 1, 21, 0), "New", True,
+            ))
+
+        records = handler.get_typed_records()
+
+        # 10 行のグリッドを超えた分は append で広がる（取得済みのハンドルの row_count は古いまま）
+        self.assertEqual(self.log.row_count, 10)
+        self.assertEqual(self.log.reopen().row_count, 12)
+        self.assertEqual(records[-1].index, 11)
+        self.assertEqual(records[-1].duration, 3600)
+        self.assertTrue(records[-1].play_with_friends)
+
+    def test_iter_records_pages_within_grid(self):
+        handler = log_handler.LogHandler(CONFIG)
+        self.backend.reset_stats()
+
+        records = list(handler.iter_records(chunk_rows=2, prefetch=False))
+
+        self.assertEqual([record.index for record in records], [1, 2, 3, 4, 5])
+        # 空行が途中にあっても読み飛ばさないよう、グリッドの 10 行目まで読む
+        self.assertEqual(self.backend.requests["get"], 6)
+
+    def test_iter_records_sees_rows_appended_after_connect(self):
+        handler = log_handler.LogHandler(CONFIG)
+        for index in range(6, 15):
+            handler.save_record(encode_row(
+                index, datetime(2024, 2, 1, 20, 0), datetime(2024, 2, 1, 21, 0), "New", False,
+            ))
+
+        # 接続時のハンドルは 10 行のままだが、ページングはグリッドの現在の行数まで読む
+        self.assertEqual(handler.sheet.row_count, 10)
+        records = list(handler.iter_records(chunk_rows=4, prefetch=False))
+
+        self.assertEqual([record.index for record in records], list(range(1, 15)))
+
+    def test_iter_records_reads_past_a_blank_row_at_a_page_boundary(self):
+        self.log.append_rows(log_rows(7)[5:])
+        self.log.update("A5:E5", [[""] * len(HEADER)])  # 4 件目を消した行（2 ページ目の末尾）
+        handler = log_handler.LogHandler(CONFIG)
+
+        records = list(handler.iter_records(chunk_rows=2, prefetch=False))
+
+        self.assertEqual([record.index for record in handler.typed_records], [1, 2, 3, 5, 6, 7])
+        self.assertEqual([record.index for record in records], [1, 2, 3, 5, 6, 7])
+
+    def test_game_info_loader_reads_worksheet_by_gid(self):
+        entries = GameInfoLoader(CONFIG).load()
+
+        self.assertEqual(len(entries), 1)
+        self.assertTrue(entries[0].play_with_friends)
+        self.assertEqual(entries[0].executable, "game_a.exe")
+
+
+class TestFaultInjection(FakeSheetsTestCase):
+    def test_injected_server_error_is_retried(self):
+        self.backend.fail_next(503, method="get_all_values")
+
+        handler = log_handler.LogHandler(CONFIG)
+
+        self.assertEqual(len(handler.typed_records), 5)
+        self.assertEqual(self.backend.requests["get_all_values"], 2)
+
+    def test_quota_error_carries_retry_after(self):
+        self.backend.quota_per_minute = 1
+        self.backend.quota_window = 0.05
+        handler = log_handler.LogHandler.__new__(log_handler.LogHandler)
+        handler.sheet = self.log
+
+        self.assertEqual(len(handler.get_typed_records()), 5)
+        with self.assertRaises(Exception) as raised:
+            self.log.get_all_values()
+        self.assertEqual(raised.exception.response.status_code, 429)
+        self.assertIn("Retry-After", raised.exception.response.headers)
+
+        # ガバナーは Retry-After だけ待って再試行する
+        self.assertEqual(len(handler.get_typed_records()), 5)
+
+    def test_update_beyond_grid_is_rejected(self):
+        with self.assertRaises(Exception) as raised:
+            self.log.update("A10", [["x"], ["y"]])
+        self.assertEqual(raised.exception.response.status_code, 400)
+
+    def test_latency_is_applied_per_request(self):
+        slept = []
+        self.backend.latency = 0.25
+        self.backend.sleep = slept.append
+
+        log_handler.LogHandler(CONFIG)
+
+        self.assertEqual(len(slept), self.backend.total_requests)
+        self.assertEqual(set(slept), {0.25})
+
+
+if __name__ == "__main__":
+    unittest.main()
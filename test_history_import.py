@@ -0,0 +1,137 @@
+import sys
+import tempfile
+import types
+import unittest
+from datetime import date
+from pathlib import Path
+
+# Stub external dependencies before importing the app.
+fake_gspread = types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+)
+sys.modules.setdefault("gspread", fake_gspread)
+
+import history_import
+import log_archive
+import log_handler
+from fake_sheets import FakeSheetsBackend
+from log_codec import LogRecord, parse_datetime_text
+from sheets_governor import GOVERNOR
+
+
+class FakeLogHandler:
+    def __init__(self, records=()):
+        self.typed_records = list(records)
+        self.index = len(self.typed_records)
+        self.spreadsheet = types.SimpleNamespace(worksheets=lambda: [])
+        self.batches = []
+
+    def save_records(self, rows):
+        self.batches.append([list(row) for row in rows])
+
+
+class TestNormalize(unittest.TestCase):
+    def test_aliases_and_duration_are_normalized(self):
+        columns = history_import._resolve_columns(["Game", "Started_At", "minutes", "multiplayer"])
+        row = {"Game": "Terraria", "Started_At": "2023-05-01T20:00:00", "minutes": "90", "multiplayer": "yes"}
+
+        start, end, title, friends = history_import.normalize_row(row, columns)
+
+        self.assertEqual(title, "Terraria")
+        self.assertEqual(end - start, history_import.timedelta(minutes=90))
+        self.assertTrue(friends)
+
+    def test_invalid_rows_are_rejected(self):
+        columns = history_import._resolve_columns(["title", "start_time", "end_time"])
+        bad_date = {"title": "A", "start_time": "someday", "end_time": ""}
+        reversed_range = {"title": "A", "start_time": "2023/05/01 20:00:00", "end_time": "2023/05/01 19:00:00"}
+
+        self.assertIsNone(history_import.normalize_row(bad_date, columns))
+        self.assertIsNone(history_import.normalize_row(reversed_range, columns))
+
+
+class TestHistoryImporter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.source = self.dir / "export.csv"
+        lines = ["title,start_time,end_time"]
+        for day in range(1, 6):
+            lines.append(f"Game{day},2023/05/0{day} 20:00:00,2023/05/0{day} 21:00:00")
+        lines.append("Game1,2023/05/01 20:00:00,2023/05/01 21:00:00")  # 入力内の重複
+        self.source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunks_dedupe_and_continue_index(self):
+        start = parse_datetime_text("2023/05/02 20:00:00")
+        handler = FakeLogHandler([LogRecord(1, start, start + 3600, "Game2", False)])
+        importer = history_import.HistoryImporter(handler, chunk_rows=2)
+        stats = history_import.ImportStats()
+
+        importer.import_file(self.source, stats)
+
+        self.assertEqual([len(batch) for batch in handler.batches], [2, 2])
+        self.assertEqual([row[0] for batch in handler.batches for row in batch], [2, 3, 4, 5])
+        self.assertEqual(stats.imported, 4)
+        self.assertEqual(stats.duplicates, 2)
+        self.assertEqual(handler.index, 5)
+
+    def test_resume_skips_rows_already_written(self):
+        state_path = self.dir / "state.json"
+        state = history_import.ImportState(state_path)
+        state.advance(self.source, 3)
+
+        handler = FakeLogHandler()
+        importer = history_import.HistoryImporter(
+            handler, chunk_rows=10, state=history_import.ImportState(state_path),
+        )
+        stats = history_import.ImportStats()
+        importer.import_file(self.source, stats)
+
+        self.assertEqual(stats.skipped_resumed, 3)
+        self.assertEqual([row[3] for row in handler.batches[0]], ["Game4", "Game5", "Game1"])
+        self.assertEqual(history_import.ImportState(state_path).offset(self.source), 6)
+
+
+class TestImportAfterRotation(unittest.TestCase):
+    def setUp(self):
+        GOVERNOR.configure(requests_per_minute=0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = Path(self.tmp.name) / "export.csv"
+        self.source.write_text(
+            "title,start_time,end_time\n"
+            "Old,2022/05/01 20:00:00,2022/05/01 21:00:00\n"
+            "New,2023/05/01 20:00:00,2023/05/01 21:00:00\n",
+            encoding="utf-8",
+        )
+        self.backend = FakeSheetsBackend()
+        self.backend.create_spreadsheet("log-key").seed_worksheet(
+            "log", [["index", "start_time", "end_time", "title", "play_with_friends"]],
+        )
+        installed = self.backend.installed()
+        installed.__enter__()
+        self.addCleanup(installed.__exit__, None, None, None)
+        self.addCleanup(self.tmp.cleanup)
+
+    def import_once(self):
+        config = types.SimpleNamespace(log_handler={"cert_file_path": "sa.json", "sheet_key": "log-key"})
+        stats = history_import.ImportStats()
+        history_import.HistoryImporter(log_handler.LogHandler(config)).import_file(self.source, stats)
+        return stats, log_handler.LogHandler(config)
+
+    def test_archived_sessions_are_not_imported_again(self):
+        stats, handler = self.import_once()
+        self.assertEqual(stats.imported, 2)
+        log_archive.rotate(handler, period="year", before=date(2023, 1, 1))
+
+        stats, handler = self.import_once()
+
+        self.assertEqual((stats.imported, stats.duplicates), (0, 2))
+        self.assertEqual([record.title for record in handler.typed_records], ["New"])
+
+
+if __name__ == "__main__":
+    unittest.main()
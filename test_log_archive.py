@@ -0,0 +1,166 @@
+import sys
+import types
+import unittest
+from datetime import date
+
+# Stub external dependencies before importing the app.
+fake_gspread = types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+)
+sys.modules.setdefault("gspread", fake_gspread)
+
+import log_archive
+from log_codec import decode_rows
+from sheets_governor import GOVERNOR
+
+HEADER = ["index", "start_time", "end_time", "title", "play_with_friends"]
+
+
+class FakeWorksheet:
+    def __init__(self, title, values=None):
+        self.title = title
+        self.values = [list(row) for row in values or []]
+
+    def get_all_values(self, **kwargs):
+        return [list(row) for row in self.values]
+
+    def get_all_records(self):
+        header, *rows = self.values
+        return [dict(zip(header, row)) for row in rows]
+
+    def col_values(self, col):
+        return [row[col - 1] for row in self.values]
+
+    def append_row(self, row, **kwargs):
+        self.values.append(list(row))
+
+    def append_rows(self, rows, **kwargs):
+        self.values.extend(list(row) for row in rows)
+
+    def update(self, range_name, values, **kwargs):
+        assert range_name == "A1"
+        for i, row in enumerate(values):
+            if i < len(self.values):
+                self.values[i] = list(row)
+            else:
+                self.values.append(list(row))
+
+    def delete_rows(self, start_index, end_index=None):
+        del self.values[start_index - 1:end_index or start_index]
+
+
+class FakeSpreadsheet:
+    def __init__(self, log_rows):
+        self.sheet1 = FakeWorksheet("log", [HEADER] + log_rows)
+        self._worksheets = [self.sheet1]
+
+    def worksheets(self):
+        return list(self._worksheets)
+
+    def add_worksheet(self, title, rows, cols):
+        worksheet = FakeWorksheet(title)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    def by_title(self, title):
+        return next(ws for ws in self._worksheets if ws.title == title)
+
+
+def session(index, start, title="Game"):
+    return [str(index), start, start, title, "FALSE"]
+
+
+class TestRotate(unittest.TestCase):
+    def setUp(self):
+        GOVERNOR.configure(requests_per_minute=0)
+        self.spreadsheet = FakeSpreadsheet([
+            session(1, "2022/03/01 10:00:00"),
+            session(2, "2022/11/01 10:00:00"),
+            session(3, "2023/05/01 10:00:00"),
+            session(4, "2024/02/01 10:00:00", title="Recent"),
+        ])
+        self.handler = types.SimpleNamespace(
+            spreadsheet=self.spreadsheet,
+            sheet=self.spreadsheet.sheet1,
+            get_typed_records=lambda: decode_rows(self.spreadsheet.sheet1.get_all_values()),
+        )
+
+    def test_rotate_moves_closed_years_and_writes_manifest(self):
+        result = log_archive.rotate(self.handler, period="year", before=date(2024, 6, 1))
+
+        self.assertEqual(result.archived, {"log_2022": 2, "log_2023": 1})
+        self.assertEqual(self.spreadsheet.sheet1.values, [HEADER, session(4, "2024/02/01 10:00:00", title="Recent")])
+        self.assertEqual(len(self.spreadsheet.by_title("log_2022").values), 3)
+        manifest = log_archive.read_manifest(self.spreadsheet)
+        self.assertEqual([(e.worksheet, e.first_index, e.last_index) for e in manifest],
+                         [("log_2022", 1, 2), ("log_2023", 3, 3)])
+        self.assertEqual(log_archive.last_archived_index(self.spreadsheet), 3)
+
+    def test_rows_appended_during_rotation_are_kept(self):
+        sheet = self.spreadsheet.sheet1
+        read = sheet.get_all_values
+
+        def get_all_values(**kwargs):
+            values = read()
+            # 最初の読み込み直後に実行中のトラッカーが追記する
+            if not any(row[0] == "5" for row in sheet.values):
+                sheet.append_row(session(5, "2024/06/02 10:00:00", title="Live"))
+            return values
+
+        sheet.get_all_values = get_all_values
+        log_archive.rotate(self.handler, period="year", before=date(2024, 6, 1))
+
+        self.assertEqual([row[0] for row in sheet.values[1:]], ["4", "5"])
+
+    def test_rows_are_classified_by_unformatted_values(self):
+        sheet = self.spreadsheet.sheet1
+        serials = {"2022/03/01 10:00:00": 44621.41666, "2022/11/01 10:00:00": 44866.41666,
+                   "2023/05/01 10:00:00": 45047.41666, "2024/02/01 10:00:00": 45323.41666}
+        unformatted = [HEADER] + [[row[0], serials[row[1]], serials[row[2]]] + row[3:] for row in sheet.values[1:]]
+        # 表示形式が日/月/年のロケール
+        formatted = [HEADER] + [
+            [row[0], f"{row[1][8:10]}.{row[1][5:7]}.{row[1][:4]} 10:00"] + row[2:] for row in sheet.values[1:]
+        ]
+        sheet.values = formatted
+        sheet.get_all_values = lambda **kwargs: unformatted if kwargs else formatted
+
+        result = log_archive.rotate(self.handler, period="year", before=date(2024, 6, 1))
+
+        self.assertEqual(result.archived, {"log_2022": 2, "log_2023": 1})
+        self.assertEqual(self.spreadsheet.by_title("log_2022").values[1][1], "01.03.2022 10:00")
+
+    def test_deletes_only_archived_row_ranges(self):
+        self.spreadsheet.sheet1.values.insert(2, session(9, "2024/01/01 10:00:00", title="Recent"))
+
+        log_archive.rotate(self.handler, period="year", before=date(2024, 6, 1))
+
+        self.assertEqual([row[0] for row in self.spreadsheet.sheet1.values[1:]], ["9", "4"])
+        self.assertEqual(log_archive._row_ranges([2, 4, 5]), [(2, 2), (4, 5)])
+
+    def test_rerun_does_not_duplicate_archived_rows(self):
+        archive = self.spreadsheet.add_worksheet("log_2022", rows=1, cols=5)
+        archive.values = [HEADER, session(1, "2022/03/01 10:00:00")]
+
+        log_archive.rotate(self.handler, period="year", before=date(2024, 6, 1))
+
+        self.assertEqual([row[0] for row in archive.values[1:]], ["1", "2"])
+
+    def test_query_reads_only_overlapping_archives(self):
+        log_archive.rotate(self.handler, period="year", before=date(2024, 6, 1))
+        self.spreadsheet.by_title("log_2023").get_all_values = None  # 読まれたら失敗する
+
+        records = log_archive.query_records(self.handler, date(2022, 1, 1), date(2022, 12, 31))
+
+        self.assertEqual([r.index for r in records], [1, 2])
+        self.assertEqual(log_archive.to_row(records[0]), [1, "2022/03/01 10:00:00", "2022/03/01 10:00:00", "Game", "FALSE"])
+
+    def test_period_of_month(self):
+        self.assertEqual(
+            log_archive.period_of(date(2023, 12, 15), "month"),
+            ("log_2023_12", date(2023, 12, 1), date(2023, 12, 31)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import types
+import unittest
+from datetime import date, datetime
+
+# Stub external dependencies before importing the app.
+fake_gspread = types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+)
+sys.modules.setdefault("gspread", fake_gspread)
+
+import log_codec
+import play_stats
+from log_handler import LogHandler
+from sheets_governor import GOVERNOR
+
+HEADER = ["index", "start_time", "end_time", "title", "play_with_friends"]
+
+
+class TestDatetimeConversion(unittest.TestCase):
+    def test_serial_and_text_decode_to_the_same_seconds(self):
+        # 2024/01/05 10:30:15 のシリアル値
+        serial = 45296 + (10 * 3600 + 30 * 60 + 15) / 86400
+        expected = log_codec.datetime_to_seconds(datetime(2024, 1, 5, 10, 30, 15))
+
+        self.assertEqual(log_codec.decode_datetime(serial), expected)
+        self.assertEqual(log_codec.decode_datetime("2024/01/05 10:30:15"), expected)
+        self.assertEqual(log_codec.decode_datetime("2024-1-5 10:30:15"), expected)
+        self.assertEqual(log_codec.seconds_to_datetime(expected), datetime(2024, 1, 5, 10, 30, 15))
+        self.assertAlmostEqual(log_codec.seconds_to_serial(expected), serial)
+
+    def test_invalid_values_decode_to_none(self):
+        for value in ("", "not a date", "2024/02/30 10:00:00", True, None):
+            self.assertIsNone(log_codec.decode_datetime(value))
+
+    def test_format_matches_strftime(self):
+        value = datetime(2024, 1, 5, 9, 3, 7)
+        self.assertEqual(log_codec.format_datetime(value), value.strftime("%Y/%m/%d %H:%M:%S"))
+
+
+class TestDecodeRows(unittest.TestCase):
+    def test_decodes_mixed_rows_by_header(self):
+        values = [
+            ["title", "start_time", "end_time", "index", "play_with_friends"],
+            ["Game", 45296.5, 45296.5 + 1 / 24, 1, True],
+            ["Text", "2024/01/05 20:00:00", "2024/01/05 20:10:00", "2", "FALSE"],
+            ["Broken", "", "", 3, False],
+            ["Short", 45297.0, 45297.0 + 1 / 48],
+        ]
+
+        records = log_codec.decode_rows(values)
+
+        self.assertEqual([r.title for r in records], ["Game", "Text", "Short"])
+        self.assertEqual(records[0].index, 1)
+        self.assertTrue(records[0].play_with_friends)
+        self.assertEqual(records[0].duration, 3600)
+        self.assertEqual(records[1].index, 2)
+        self.assertEqual(records[1].start_datetime, datetime(2024, 1, 5, 20, 0, 0))
+        self.assertFalse(records[2].play_with_friends)
+
+    def test_missing_required_column_raises(self):
+        with self.assertRaises(ValueError):
+            log_codec.decode_rows([["index", "title"]])
+
+
+class TestTypedStats(unittest.TestCase):
+    def test_matches_strptime_path(self):
+        records = [
+            {"start_time": "2024/01/05 23:30:00", "end_time": "2024/01/06 00:30:00", "title": "A"},
+            {"start_time": "2024/01/06 10:00:00", "end_time": "2024/01/06 10:20:00", "title": "B"},
+            {"start_time": "2024/01/06 12:00:00", "end_time": "2024/01/06 12:30:00", "title": "A"},
+        ]
+        typed = log_codec.decode_rows([HEADER] + [["", r["start_time"], r["end_time"], r["title"], ""] for r in records])
+        day = date(2024, 1, 6)
+
+        self.assertEqual(play_stats.sum_seconds_on(typed, day), play_stats.sum_today_seconds(records, day))
+        self.assertEqual(
+            play_stats.sum_minutes_by_title_on(typed, day),
+            play_stats.sum_today_minutes_by_title(records, day),
+        )
+
+
+class TestLogHandlerTypedRecords(unittest.TestCase):
+    def test_requests_unformatted_serial_values(self):
+        GOVERNOR.configure(requests_per_minute=0)
+        calls = []
+
+        def get_all_values(**kwargs):
+            calls.append(kwargs)
+            return [HEADER, [1, 45296.5, 45296.75, "Game", False]]
+
+        handler = LogHandler.__new__(LogHandler)
+        handler.sheet = types.SimpleNamespace(id=0, get_all_values=get_all_values)
+
+        records = handler.get_typed_records()
+
+        self.assertEqual(calls, [{
+            "value_render_option": "UNFORMATTED_VALUE",
+            "date_time_render_option": "SERIAL_NUMBER",
+        }])
+        self.assertEqual(records[0].duration, 6 * 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import re
+import sys
+import threading
+import types
+import unittest
+from unittest import mock
+
+# Stub external dependencies before importing the app.
+fake_gspread = types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+)
+sys.modules.setdefault("gspread", fake_gspread)
+
+import log_handler
+from sheets_governor import GOVERNOR
+
+HEADER = ["index", "start_time", "end_time", "title", "play_with_friends"]
+
+
+class FakeSheet:
+    id = 0
+
+    def __init__(self):
+        self.calls = []
+
+    def get_all_values(self, **kwargs):
+        self.calls.append("get_all_values")
+        return [HEADER, [1, 45296.5, 45296.75, "Game", False], [7, 45297.5, 45297.75, "Game", True]]
+
+    def get_all_records(self):
+        self.calls.append("get_all_records")
+        return [{"index": 1, "title": "Game"}, {"index": 7, "title": "Game"}]
+
+
+class TestLogHandlerStartup(unittest.TestCase):
+    def setUp(self):
+        GOVERNOR.configure(requests_per_minute=0)
+        self.sheet = FakeSheet()
+        spreadsheet = types.SimpleNamespace(sheet1=self.sheet)
+        client = types.SimpleNamespace(open_by_key=lambda key: spreadsheet)
+        patcher = mock.patch.object(log_handler.gspread, "service_account", lambda filename: client, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = types.SimpleNamespace(log_handler={"cert_file_path": "sa.json", "sheet_key": "key"})
+
+    def test_fetches_log_once_on_connect(self):
+        handler = log_handler.LogHandler(self.config)
+
+        self.assertEqual(self.sheet.calls, ["get_all_values"])
+        self.assertEqual(handler.index, 7)
+        self.assertEqual([record.index for record in handler.typed_records], [1, 7])
+
+
+class TestRecentTitles(unittest.TestCase):
+    def test_latest_session_per_title_newest_first(self):
+        sheet = RangeSheet([
+            [1, 45000.5, 45000.6, "Old", False],
+            [2, 45002.5, 45002.6, "Game", False],
+            [3, 45001.5, 45001.6, "Game", False],
+            [4, 45003.5, 45003.6, "New", True],
+        ])
+        sheet.get_all_values = lambda **kwargs: sheet.values
+        handler = make_handler(sheet)
+
+        recent = handler.get_n_titles_of_recently(2)
+
+        self.assertEqual([record["index"] for record in recent], [4, 2])
+        self.assertEqual(recent[0]["start_time"], "2023/03/18 12:00:00")
+        self.assertEqual(handler.get_titles(), {"Old", "Game", "New"})
+
+
+class RangeSheet:
+    """A1 範囲の読み込みに対応したワークシートの代替（API と同じく範囲末尾の空行は返さない）."""
+
+    id = 1
+
+    def __init__(self, rows, row_count=None):
+        self.values = [HEADER] + rows
+        self.row_count = row_count if row_count is not None else len(self.values)
+        self.ranges = []
+
+    def get(self, range_name, **kwargs):
+        self.ranges.append(range_name)
+        if range_name == "1:1":
+            return self.values[:1]
+        first, last = map(int, re.match(r"A(\d+):E(\d+)$", range_name).groups())
+        rows = [list(row) for row in self.values[first - 1:last]]
+        while rows and not any(cell != "" for cell in rows[-1]):
+            rows.pop()
+        return rows
+
+
+def make_handler(sheet):
+    handler = log_handler.LogHandler.__new__(log_handler.LogHandler)
+    handler.sheet = sheet
+    handler.spreadsheet = types.SimpleNamespace(get_worksheet_by_id=lambda sheet_id: sheet)
+    return handler
+
+
+def serial_rows(count):
+    return [[i + 1, 45000 + i, 45000 + i + 1 / 24, f"Game{i % 3}", False] for i in range(count)]
+
+
+class TestIterRecords(unittest.TestCase):
+    def setUp(self):
+        GOVERNOR.configure(requests_per_minute=0)
+
+    def test_pages_through_bounded_ranges(self):
+        sheet = RangeSheet(serial_rows(5))
+
+        records = list(make_handler(sheet).iter_records(chunk_rows=2, prefetch=False))
+
+        self.assertEqual([record.index for record in records], [1, 2, 3, 4, 5])
+        self.assertEqual(sheet.ranges, ["1:1", "A2:E3", "A4:E5", "A6:E6"])
+
+    def test_blank_row_at_page_end_does_not_stop_paging(self):
+        rows = serial_rows(6)
+        rows[3] = [""] * len(HEADER)
+        sheet = RangeSheet(rows)
+
+        records = list(make_handler(sheet).iter_records(chunk_rows=2, prefetch=False))
+
+        self.assertEqual([record.index for record in records], [1, 2, 3, 5, 6])
+
+    def test_stops_at_sheet_row_count(self):
+        sheet = RangeSheet(serial_rows(4), row_count=5)
+
+        records = list(make_handler(sheet).iter_records(chunk_rows=2, prefetch=False))
+
+        self.assertEqual(len(records), 4)
+        self.assertEqual(sheet.ranges, ["1:1", "A2:E3", "A4:E5"])
+
+    def test_prefetches_next_page_while_consumer_works(self):
+        sheet = RangeSheet(serial_rows(4))
+        fetched_second_page = threading.Event()
+        original_get = sheet.get
+
+        def get(range_name, **kwargs):
+            result = original_get(range_name, **kwargs)
+            if range_name == "A4:E5":
+                fetched_second_page.set()
+            return result
+
+        sheet.get = get
+        records = make_handler(sheet).iter_records(chunk_rows=2)
+
+        first = next(records)
+        # 1ページ目を処理している間に2ページ目が読み込まれる
+        self.assertTrue(fetched_second_page.wait(timeout=5))
+        self.assertEqual([first.index] + [record.index for record in records], [1, 2, 3, 4])
+
+    def test_empty_sheet_yields_nothing(self):
+        sheet = RangeSheet([])
+        sheet.values = []
+        self.assertEqual(list(make_handler(sheet).iter_records()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
+import io
 import sys
 import types
 import unittest
 from datetime import datetime, timedelta
+from unittest import mock
 
 # Stub external dependencies before importing the app.
 fake_gspread = types.SimpleNamespace(
@@ -29,6 +31,7 @@ class FakeLogHandler:
 
     def save_record(self, values):
         self.records.append(values)
+        return True
 
 
 class TestGameEntry(unittest.TestCase):
@@ -40,8 +43,120 @@ class TestGameEntry(unittest.TestCase):
         game = main.GameEntry(game_title="NormalGame", window_title="NormalGame", is_browser_game=False)
         self.assertFalse(game.matches_window("NormalGame - Chrome", browsers=["Chrome"]))
 
+    def test_matches_window_normalize_ignores_width_case_and_dash_variants(self):
+        game = main.GameEntry(game_title="FF", window_title="ＦＩＮＡＬ ＦＡＮＴＡＳＹ〜XIV")
+        self.assertFalse(game.matches_window("final fantasy~xiv", browsers=[]))
+        self.assertTrue(game.matches_window("final fantasy~xiv", browsers=[], normalize=True))
+        self.assertFalse(game.matches_window("Final Fantasy～XIV - ｇｏｏｇｌｅ ｃｈｒｏｍｅ",
+                                             browsers=["Google Chrome"], normalize=True))
+
+
+class TestGameCatalog(unittest.TestCase):
+    def test_detect_matches_like_matches_window(self):
+        games = [
+            main.GameEntry(game_title="Normal", window_title="Normal"),
+            main.GameEntry(game_title="Browser", window_title="Browser", is_browser_game=True),
+        ]
+        catalog = main.GameCatalog(games, browsers=["Chrome"])
+        titles = ["Normal - Chrome", "Browser - Chrome", "Normal"]
+
+        for title in titles:
+            expected = tuple(i for i, game in enumerate(games) if game.matches_window(title, ["Chrome"]))
+            self.assertEqual(catalog.match(title), expected)
+        self.assertEqual(catalog.detect(titles), {0, 1})
+        self.assertEqual(catalog.detect(["Normal - Chrome"]), set())
+
+    def test_normalized_catalog_matches_like_matches_window(self):
+        games = [
+            main.GameEntry(game_title="Uma", window_title="ウマ娘　プリティーダービー"),
+            main.GameEntry(game_title="Dash", window_title="Game—Title", is_browser_game=True),
+        ]
+        catalog = main.GameCatalog(games, browsers=["CHROME"], normalize=True)
+        titles = ["ｳﾏ娘 ﾌﾟﾘﾃｨｰﾀﾞｰﾋﾞｰ", "GAME-TITLE - chrome", "ウマ娘 プリティーダービー - Chrome"]
+
+        for title in titles:
+            expected = tuple(
+                i for i, game in enumerate(games) if game.matches_window(title, ["CHROME"], normalize=True)
+            )
+            self.assertEqual(catalog.match(title), expected)
+        self.assertEqual(catalog.detect(titles), {0, 1})
+
+    def test_changing_title_reuses_cached_matches_across_ticks(self):
+        games = [main.GameEntry(game_title=f"Game{i}", window_title=f"Game{i}") for i in range(20)]
+        catalog = main.GameCatalog(games, browsers=[])
+        ticks = [["Game3", f"Discord ({i % 3})"] for i in range(9)]
+
+        with mock.patch.object(main.GameCatalog, "match", autospec=True, side_effect=main.GameCatalog.match) as match:
+            for titles in ticks:
+                self.assertEqual(catalog.detect(titles), {3})
+
+        # 毎ティック変わるタイトルも、一度見た値は照合し直さない
+        self.assertEqual(match.call_count, 4)
+
+    def test_match_cache_is_bounded(self):
+        catalog = main.GameCatalog([main.GameEntry(game_title="Game", window_title="Game")], browsers=[])
+
+        with mock.patch.object(main, "MATCH_CACHE_SIZE", 2):
+            for i in range(5):
+                catalog.detect([f"Clock {i}"])
+            self.assertEqual(catalog.detect(["Game"]), {0})
+
+        self.assertEqual(list(catalog._cache), ["Clock 4", "Game"])
+
+    def test_detect_processes_uses_executable_index(self):
+        games = [
+            main.GameEntry(game_title="Terraria", window_title="Terraria", executable="Terraria.exe"),
+            main.GameEntry(game_title="Custom", window_title="Custom", executable=r"D:\Games\custom\run.exe"),
+            main.GameEntry(game_title="TitleOnly", window_title="TitleOnly"),
+        ]
+        catalog = main.GameCatalog(games, browsers=[], use_processes=True)
+
+        self.assertEqual(
+            catalog.detect_processes([r"C:\Steam\terraria.exe", "D:/Games/Custom/RUN.EXE", r"E:\run.exe"]),
+            {0, 1},
+        )
+        # 実行ファイルが登録されたゲームはタイトルでは検出しない
+        self.assertEqual(catalog.detect(["Terraria", "TitleOnly"]), {2})
+        # プロセスを使わない場合は従来どおりタイトルで判定
+        self.assertEqual(main.GameCatalog(games, browsers=[]).detect(["Terraria"]), {0})
+
+    def test_monitor_tracks_only_active_games(self):
+        handler = FakeLogHandler()
+        now = [datetime(2024, 1, 1, 10, 0, 0)]
+        games = [main.GameEntry(game_title=f"Game{i}", window_title=f"Game{i}") for i in range(50)]
+        monitor = main.GameMonitor(
+            games=games,
+            scanner=types.SimpleNamespace(get_titles=lambda: []),
+            recorder=main.SessionRecorder(log_handler=handler, clock=lambda: now[0]),
+            clock=lambda: now[0],
+        )
+
+        active = monitor._update_game_states(["Game7", "Game3"])
+        self.assertEqual([game.game_title for game in active], ["Game3", "Game7"])
+        self.assertEqual(sorted(monitor.active), [3, 7])
+
+        now[0] += timedelta(minutes=10)
+        active = monitor._update_game_states(["Game3"])
+        self.assertEqual(list(monitor.active), [3])
+        self.assertEqual([record[3] for record in handler.records], ["Game7"])
+        self.assertFalse(games[7].is_playing)
+
 
 class TestSessionRecorder(unittest.TestCase):
+    def test_failed_save_is_not_added_to_rollup(self):
+        handler = FakeLogHandler()
+        handler.save_record = lambda values: False
+        rollup = mock.Mock()
+        messages = []
+        recorder = main.SessionRecorder(log_handler=handler, output=messages.append, rollup=rollup)
+        game = main.GameEntry(game_title="LongPlay", window_title="LongPlay", is_playing=True)
+        game.start_time = datetime.now() - timedelta(minutes=6)
+
+        self.assertIsNone(recorder.record(game))
+
+        rollup.add.assert_not_called()
+        self.assertEqual(messages, [main.Messages.GAME_SAVE_FAILED.format(game_title="LongPlay")])
+
     def test_record_over_threshold_appends(self):
         handler = FakeLogHandler()
         recorder = main.SessionRecorder(log_handler=handler, min_play_minutes=5)
@@ -70,6 +185,117 @@ class TestSessionRecorder(unittest.TestCase):
         self.assertEqual(handler.records, [])
 
 
+class TestGameMonitor(unittest.TestCase):
+    def test_tick_renders_status_without_clearing_console(self):
+        stream = io.StringIO()
+        scanner = types.SimpleNamespace(get_titles=lambda: ["Terraria", "Discord"])
+        now = datetime(2024, 1, 1, 10, 0, 0)
+        monitor = main.GameMonitor(
+            games=[main.GameEntry(game_title="Terraria", window_title="Terraria")],
+            scanner=scanner,
+            recorder=main.SessionRecorder(log_handler=FakeLogHandler()),
+            clock=lambda: now,
+            renderer=main.ConsoleRenderer(stream, ansi=False),
+        )
+
+        monitor._tick()
+        monitor._tick()
+
+        self.assertEqual(stream.getvalue(), "Terrariaをプレイ中（経過: 0秒）\n")
+
+    def test_apply_config_keeps_active_sessions(self):
+        handler = FakeLogHandler()
+        now = [datetime(2024, 1, 1, 10, 0, 0)]
+        scanner = main.WindowScanner(excluded_titles=["Old"])
+        monitor = main.GameMonitor(
+            games=[
+                main.GameEntry(game_title="Kept", window_title="Kept"),
+                main.GameEntry(game_title="Removed", window_title="Removed"),
+            ],
+            scanner=scanner,
+            recorder=main.SessionRecorder(log_handler=handler, clock=lambda: now[0]),
+            clock=lambda: now[0],
+            renderer=main.ConsoleRenderer(io.StringIO(), ansi=False),
+        )
+        monitor._update_game_states(["Kept", "Removed"])
+        started = monitor.active[0].start_time
+
+        now[0] += timedelta(minutes=10)
+        new_games = [
+            main.GameEntry(game_title="Added", window_title="Added"),
+            main.GameEntry(game_title="Kept", window_title="Kept"),
+        ]
+        config = types.SimpleNamespace(
+            window_scan={"browsers": ["Chrome"], "excluded_titles": ["New"],
+                         "normalize": False, "process_detection": False},
+        )
+        loader = types.SimpleNamespace(load=lambda: new_games)
+        with mock.patch.object(main, "GameInfoLoader", lambda config, output=print: loader):
+            monitor.apply_config(config, {"game_info", "window_scan"})
+
+        self.assertEqual(scanner.excluded_titles, {"New"})
+        self.assertEqual(monitor.catalog.browsers, ("Chrome",))
+        self.assertEqual(list(monitor.active), [1])
+        self.assertIs(monitor.active[1], new_games[1])
+        self.assertEqual(new_games[1].start_time, started)
+        self.assertEqual([record[3] for record in handler.records], ["Removed"])
+
+        monitor._update_game_states(["Kept - Chrome"])
+        self.assertEqual(len(handler.records), 2)
+
+
+class TestWindowScanner(unittest.TestCase):
+    def scan(self, scanner, windows):
+        with mock.patch.object(main, "gw", types.SimpleNamespace(getAllWindows=lambda: windows)):
+            return sorted(scanner.get_titles())
+
+    def test_exact_prefix_and_regex_rules(self):
+        scanner = main.WindowScanner(
+            excluded_titles=["Settings", "prefix:Game Time Tracker", r"regex:通知 \(\d+\)$"],
+        )
+        windows = [
+            types.SimpleNamespace(title=title)
+            for title in ("Settings", "Game Time Tracker - 計測中", "通知 (12)", "通知 (12) - Terraria", "Terraria", "")
+        ]
+
+        self.assertEqual(self.scan(scanner, windows), ["Terraria", "通知 (12) - Terraria"])
+
+    def test_own_windows_are_excluded_by_pid_or_handle(self):
+        scanner = main.WindowScanner(
+            excluded_titles=[],
+            excluded_pids=[100],
+            excluded_handles=[7],
+            window_pid={1: 100, 2: 200, 7: 300}.get,
+        )
+        windows = [
+            types.SimpleNamespace(title="Tracker dialog", _hWnd=1),
+            types.SimpleNamespace(title="Terraria", _hWnd=2),
+            types.SimpleNamespace(title="Tracker main", _hWnd=7),
+        ]
+
+        self.assertEqual(self.scan(scanner, windows), ["Terraria"])
+
+    def test_rules_that_cannot_be_joined_are_matched_one_by_one(self):
+        scanner = main.WindowScanner(excluded_titles=[
+            " Settings ",
+            "prefix:Overlay",
+            "regex:(?i)steam",
+            r"regex:(?P<n>\d+) 件の通知",
+            r"regex:(?P<n>\w+) - (?P=n)$",
+            r"regex:(a)\1",
+        ])
+        windows = [
+            types.SimpleNamespace(title=title)
+            for title in ("Settings", "Overlay 2", "STEAM", "3 件の通知", "abc - abc", "aa", "abc - abd", "Terraria")
+        ]
+
+        self.assertEqual(self.scan(scanner, windows), ["Terraria", "abc - abd"])
+
+    def test_invalid_regex_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            main.WindowScanner(excluded_titles=["regex:("])
+
+
 class TestUtils(unittest.TestCase):
     def test_format_elapsed(self):
         start = datetime.now() - timedelta(minutes=1, seconds=5)
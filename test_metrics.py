@@ -0,0 +1,57 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import metrics
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_disabled_registry_records_nothing(self):
+        registry = metrics.MetricsRegistry(enabled=False)
+        with registry.timer("scan_seconds"):
+            pass
+        registry.inc("sheets_calls_total", method="append_row")
+
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["histograms"], [])
+        self.assertEqual(snapshot["counters"], [])
+
+    def test_histogram_and_counter_are_labelled(self):
+        registry = metrics.MetricsRegistry(enabled=True)
+        registry.observe("sheets_call_seconds", 0.003, method="get_all_records")
+        registry.observe("sheets_call_seconds", 40.0, method="get_all_records")
+        registry.inc("sheets_calls_total", method="get_all_records")
+        registry.inc("sheets_calls_total", method="get_all_records")
+
+        snapshot = registry.snapshot()
+        histogram = snapshot["histograms"][0]
+        self.assertEqual(histogram["labels"], {"method": "get_all_records"})
+        self.assertEqual(histogram["count"], 2)
+        self.assertEqual(histogram["buckets"][1], [0.005, 1])
+        self.assertEqual(histogram["buckets"][-1], ["+Inf", 2])
+        self.assertEqual(snapshot["counters"][0]["value"], 2)
+
+    def test_dump_writes_json_and_prometheus_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = metrics.MetricsRegistry()
+            registry.configure(
+                enabled=True,
+                json_path=str(Path(tmp) / "metrics.json"),
+                prometheus_path=str(Path(tmp) / "metrics.prom"),
+            )
+            registry.observe("scan_seconds", 0.02)
+            registry.inc("sheets_errors_total", method="append_row")
+            registry.dump()
+
+            data = json.loads((Path(tmp) / "metrics.json").read_text(encoding="utf-8"))
+            prom = (Path(tmp) / "metrics.prom").read_text(encoding="utf-8")
+
+        self.assertEqual(data["histograms"][0]["name"], "scan_seconds")
+        self.assertIn("# TYPE gtt_scan_seconds histogram", prom)
+        self.assertIn('gtt_scan_seconds_bucket{le="0.025"} 1', prom)
+        self.assertIn('gtt_sheets_errors_total{method="append_row"} 1', prom)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import process_source
+
+
+class TestProcProcessSource(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+
+    def add_process(self, pid, exe=None, comm=None, cmdline=None):
+        path = self.root / str(pid)
+        path.mkdir()
+        if exe is not None:
+            os.symlink(exe, path / "exe")
+        if comm is not None:
+            (path / "comm").write_text(comm + "\n", encoding="utf-8")
+        if cmdline is not None:
+            (path / "cmdline").write_bytes(b"".join(arg.encode("utf-8") + b"\0" for arg in cmdline))
+
+    def test_reads_exe_links_and_falls_back_to_comm(self):
+        self.add_process(1, exe="/usr/games/terraria", comm="terraria")
+        self.add_process(2, comm="kworker/0:1")
+        self.add_process(3, exe="/opt/game/old-build (deleted)")
+        self.add_process(4)  # 列挙中に終了したプロセス
+        (self.root / "self").mkdir()
+
+        source = process_source.ProcProcessSource(str(self.root))
+
+        self.assertEqual(
+            sorted(source.get_executables()),
+            ["/opt/game/old-build", "/usr/games/terraria", "kworker/0:1"],
+        )
+
+    def test_unreadable_exe_uses_argv0_instead_of_truncated_comm(self):
+        # comm はカーネルが 15 文字に切り詰める
+        self.add_process(1, comm="TerrariaServer.", cmdline=["/opt/terraria/TerrariaServer.bin.x86_64", "-config"])
+        self.add_process(2, comm="Game.exe", cmdline=[r"C:\Games\Game.exe"])
+        self.add_process(3, comm="kthreadd", cmdline=[])
+
+        source = process_source.ProcProcessSource(str(self.root))
+
+        self.assertEqual(
+            sorted(source.get_executables()),
+            ["Game.exe", "TerrariaServer.bin.x86_64", "kthreadd"],
+        )
+
+    def test_missing_root_returns_empty(self):
+        source = process_source.ProcProcessSource(str(self.root / "missing"))
+        self.assertEqual(source.get_executables(), [])
+
+
+    def test_incomplete_source_cannot_be_instantiated(self):
+        class Incomplete(process_source.ProcessSource):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+class TestExecutableKey(unittest.TestCase):
+    def test_normalizes_separators_and_case(self):
+        self.assertEqual(
+            process_source.executable_key(r"C:\Games\Terraria\Terraria.EXE"),
+            "c:/games/terraria/terraria.exe",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
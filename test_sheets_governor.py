@@ -0,0 +1,91 @@
+import sys
+import threading
+import time
+import types
+import unittest
+
+# Stub external dependencies before importing the app.
+fake_gspread = types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+)
+sys.modules.setdefault("gspread", fake_gspread)
+
+import gspread
+
+import sheets_governor
+
+
+def make_api_error(status, headers=None):
+    error = gspread.exceptions.APIError({"code": status, "message": "error"})
+    error.response = types.SimpleNamespace(status_code=status, headers=headers or {})
+    return error
+
+
+class TestSheetsGovernor(unittest.TestCase):
+    def test_rate_limit_spaces_requests(self):
+        governor = sheets_governor.SheetsGovernor(requests_per_minute=1200, burst=1)
+        started = time.monotonic()
+        for _ in range(3):
+            governor.call("get_all_records", lambda: None)
+        # 20 req/s, バースト1 → 2回分（約0.1秒）待つ
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_429_honors_retry_after_and_retries(self):
+        governor = sheets_governor.SheetsGovernor(requests_per_minute=0)
+        calls = []
+
+        def flaky():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise make_api_error(429, {"Retry-After": "0.1"})
+            return "ok"
+
+        self.assertEqual(governor.call("append_row", flaky, lane=sheets_governor.WRITE), "ok")
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.09)
+
+    def test_write_is_not_retried_on_server_error(self):
+        governor = sheets_governor.SheetsGovernor(requests_per_minute=0)
+        calls = []
+
+        def failing():
+            calls.append(1)
+            raise make_api_error(503)
+
+        with self.assertRaises(Exception):
+            governor.call("append_row", failing, lane=sheets_governor.WRITE)
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrent_identical_reads_are_coalesced(self):
+        governor = sheets_governor.SheetsGovernor(requests_per_minute=0)
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow_read():
+            calls.append(1)
+            release.wait(1)
+            return ["record"]
+
+        threads = [
+            threading.Thread(target=lambda: results.append(governor.call("get_all_records", slow_read, key="log")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(1)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["record"]] * 4)
+
+    def test_retry_after_parses_http_date(self):
+        error = make_api_error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        self.assertEqual(sheets_governor._retry_after(error), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import threading
+import unittest
+
+from task_graph import TaskGraph
+
+
+class TestTaskGraph(unittest.TestCase):
+    def test_independent_tasks_run_in_parallel(self):
+        barrier = threading.Barrier(2, timeout=5)
+        graph = TaskGraph()
+        # 並列に実行されなければ Barrier がタイムアウトする
+        graph.add("games", lambda: barrier.wait() is not None and "games")
+        graph.add("log", lambda: barrier.wait() is not None and "log")
+
+        self.assertEqual(graph.run(), {"games": "games", "log": "log"})
+
+    def test_results_are_shared_with_dependents(self):
+        calls = []
+
+        def fetch_log():
+            calls.append("log")
+            return [1, 2, 3]
+
+        graph = TaskGraph()
+        graph.add("log", fetch_log)
+        graph.add("total", sum, "log")
+        graph.add("count", len, "log")
+        graph.add("summary", lambda total, count: f"{total}/{count}", "total", "count")
+
+        results = graph.run()
+
+        self.assertEqual(calls, ["log"])
+        self.assertEqual(results["summary"], "6/3")
+
+    def test_failure_skips_dependents_and_raises(self):
+        ran = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        graph = TaskGraph()
+        graph.add("log", fail)
+        graph.add("total", lambda log: ran.append("total"), "log")
+
+        with self.assertRaises(RuntimeError):
+            graph.run()
+        self.assertEqual(ran, [])
+
+    def test_invalid_graphs_are_rejected(self):
+        graph = TaskGraph()
+        graph.add("a", lambda b: b, "b")
+        graph.add("b", lambda a: a, "a")
+        with self.assertRaises(ValueError):
+            graph.run()
+
+        graph = TaskGraph()
+        graph.add("a", lambda missing: missing, "missing")
+        with self.assertRaises(ValueError):
+            graph.run()
+        with self.assertRaises(ValueError):
+            graph.add("a", lambda: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+from datetime import datetime, timedelta
+
+# Stub external dependencies before importing the app.
+fake_gspread = types.SimpleNamespace(
+    service_account=lambda filename=None: None,
+    exceptions=types.SimpleNamespace(APIError=Exception),
+)
+fake_pygetwindow = types.SimpleNamespace(getAllWindows=lambda: [])
+sys.modules.setdefault("gspread", fake_gspread)
+sys.modules.setdefault("pygetwindow", fake_pygetwindow)
+
+import main
+import window_trace
+from replay_trace import MemoryLogHandler
+
+
+class StaticScanner:
+    def __init__(self):
+        self.titles = []
+
+    def get_titles(self):
+        return list(self.titles)
+
+
+class TestTraceRoundTrip(unittest.TestCase):
+    def test_only_changes_and_last_observation_are_written(self):
+        start = datetime(2024, 1, 1, 10, 0, 0)
+        clock = window_trace.VirtualClock(start)
+        inner = StaticScanner()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.jsonl.gz")
+            scanner = window_trace.TraceRecordingScanner(inner, path, clock=clock)
+            for titles in (["Discord"], ["Discord"], ["Terraria", "Discord"], ["Discord"], ["Discord"]):
+                inner.titles = titles
+                scanner.get_titles()
+                clock.advance(30)
+            scanner.close()
+
+            trace = window_trace.read_trace(path)
+
+        self.assertEqual(trace.start, start)
+        self.assertEqual(
+            trace.events,
+            [(0.0, ["Discord"]), (60.0, ["Discord", "Terraria"]), (90.0, ["Discord"]), (120.0, ["Discord"])],
+        )
+
+
+class TestReplay(unittest.TestCase):
+    def _replay(self, events, every_tick=False):
+        start = datetime(2024, 1, 1, 10, 0, 0)
+        trace = window_trace.Trace(start=start, poll_interval=1, events=events)
+        clock = window_trace.VirtualClock(start)
+        scanner = window_trace.ReplayScanner()
+        handler = MemoryLogHandler()
+        monitor = main.GameMonitor(
+            games=[main.GameEntry(game_title="Terraria", window_title="Terraria")],
+            scanner=scanner,
+            recorder=main.SessionRecorder(log_handler=handler, min_play_minutes=5, clock=clock),
+            clock=clock,
+        )
+        stats = window_trace.replay(trace, monitor, clock, scanner, every_tick=every_tick)
+        return handler.rows, stats
+
+    def test_replay_records_session_with_virtual_time(self):
+        rows, stats = self._replay([(0.0, []), (10.0, ["Terraria"]), (3610.0, [])])
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][1], "2024/01/01 10:00:10")
+        self.assertEqual(rows[0][2], "2024/01/01 11:00:10")
+        self.assertEqual(stats.virtual_seconds, 3610)
+        self.assertEqual(stats.ticks, 3)
+
+    def test_every_tick_gives_same_sessions(self):
+        events = [(0.0, ["Terraria"]), (199.5, []), (400.0, ["Terraria"]), (1000.0, [])]
+        skipped, _ = self._replay(events)
+        stepped, stats = self._replay(events, every_tick=True)
+
+        self.assertEqual(skipped, stepped)
+        self.assertEqual(len(stepped), 1)
+        self.assertEqual(stats.ticks, 1001)
+
+
+if __name__ == "__main__":
+    unittest.main()
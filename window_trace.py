@@ -0,0 +1,243 @@
+"""ウィンドウタイトルのトレース記録と、仮想時計による高速リプレイ.
+
+トレースファイルは JSON Lines 形式（拡張子 .gz なら gzip 圧縮）。
+1行目がヘッダ、以降はタイトル構成が変化した時点のみを記録する::
+
+    {"format": "gtt-trace", "version": 1, "start": "2024-01-01T10:00:00", "poll_interval": 1}
+    [0, [0, 1], ["Terraria", "Discord"]]
+    [65000, [1], []]
+
+各行は ``[開始からのミリ秒, タイトルIDの一覧, 新規タイトル]`` で、
+新規タイトルには出現順に連番の ID が割り当てられる。
+"""
+
+import gzip
+import json
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import IO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+TRACE_FORMAT = 'gtt-trace'
+TRACE_VERSION = 1
+
+TraceEvent = Tuple[float, List[str]]
+
+
+def _open_text(path: str, mode: str) -> IO[str]:
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+# =============================================================================
+# 記録
+# =============================================================================
+class TraceWriter:
+    """タイトル構成の変化をトレースファイルに書き出すクラス."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        start: datetime,
+        poll_interval: float = 1,
+    ) -> None:
+        self.start = start
+        self._file = _open_text(path, 'w')
+        self._ids: Dict[str, int] = {}
+        self._last: Optional[Tuple[int, ...]] = None
+        self._last_written: Optional[datetime] = None
+        self._last_seen: Optional[datetime] = None
+        header = {
+            'format': TRACE_FORMAT,
+            'version': TRACE_VERSION,
+            'start': start.isoformat(),
+            'poll_interval': poll_interval,
+        }
+        self._file.write(json.dumps(header, ensure_ascii=False) + '\n')
+
+    def write(self, at: datetime, titles: Sequence[str]) -> None:
+        """タイトル構成が前回から変化していれば1行追記."""
+        new_titles = []
+        ids = []
+        for title in sorted(titles):
+            title_id = self._ids.get(title)
+            if title_id is None:
+                title_id = self._ids[title] = len(self._ids)
+                new_titles.append(title)
+            ids.append(title_id)
+        key = tuple(ids)
+        self._last_seen = at
+        if key == self._last:
+            return
+        self._last = key
+        self._write_line(at, ids, new_titles)
+
+    def close(self) -> None:
+        """最後に観測した時刻を記録してファイルを閉じる."""
+        if self._last is not None and self._last_seen != self._last_written:
+            self._write_line(self._last_seen, list(self._last), [])
+        self._file.close()
+
+    def _write_line(self, at: datetime, ids: List[int], new_titles: List[str]) -> None:
+        offset_ms = int((at - self.start).total_seconds() * 1000)
+        self._file.write(json.dumps([offset_ms, ids, new_titles], ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._last_written = at
+
+
+class TraceRecordingScanner:
+    """WindowScanner をラップし、取得したタイトルをトレースに記録するクラス."""
+
+    def __init__(
+        self,
+        scanner,
+        path: str,
+        *,
+        clock: Callable[[], datetime] = datetime.now,
+        poll_interval: float = 1,
+    ) -> None:
+        self.scanner = scanner
+        self.clock = clock
+        self.writer = TraceWriter(path, start=clock(), poll_interval=poll_interval)
+
+    def get_titles(self) -> List[str]:
+        """タイトルを取得してトレースに記録."""
+        titles = self.scanner.get_titles()
+        self.writer.write(self.clock(), titles)
+        return titles
+
+    def set_excluded_titles(self, excluded_titles) -> None:
+        """ラップしているスキャナーの除外リストを置き換える."""
+        self.scanner.set_excluded_titles(excluded_titles)
+
+    def close(self) -> None:
+        """トレースファイルを閉じる."""
+        self.writer.close()
+
+
+# =============================================================================
+# 読み込み
+# =============================================================================
+@dataclass
+class Trace:
+    """読み込んだトレース."""
+
+    start: datetime
+    poll_interval: float
+    events: List[TraceEvent]
+
+    @property
+    def duration(self) -> float:
+        """最初から最後のイベントまでの秒数."""
+        return self.events[-1][0] if self.events else 0.0
+
+
+def read_trace(path: str) -> Trace:
+    """トレースファイルを読み込む."""
+    with _open_text(path, 'r') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != TRACE_FORMAT:
+            raise ValueError(f'トレースファイルではありません: {path}')
+        if header.get('version') != TRACE_VERSION:
+            raise ValueError(f"未対応のトレースバージョンです: {header.get('version')}")
+        table: List[str] = []
+        events: List[TraceEvent] = []
+        for line in f:
+            if not line.strip():
+                continue
+            offset_ms, ids, new_titles = json.loads(line)
+            table.extend(new_titles)
+            events.append((offset_ms / 1000, [table[i] for i in ids]))
+    return Trace(
+        start=datetime.fromisoformat(header['start']),
+        poll_interval=float(header.get('poll_interval', 1)),
+        events=events,
+    )
+
+
+# =============================================================================
+# リプレイ
+# =============================================================================
+class VirtualClock:
+    """手動で進める仮想時計（GameMonitor / SessionRecorder の clock に渡す）."""
+
+    def __init__(self, start: datetime) -> None:
+        self.current = start
+
+    def __call__(self) -> datetime:
+        return self.current
+
+    def advance(self, seconds: float) -> None:
+        """時計を進める."""
+        self.current += timedelta(seconds=seconds)
+
+
+class ReplayScanner:
+    """リプレイ中の現在タイトルを返す WindowScanner の代替."""
+
+    def __init__(self) -> None:
+        self.titles: List[str] = []
+
+    def get_titles(self) -> List[str]:
+        """現在のタイトル一覧を返す."""
+        return list(self.titles)
+
+
+@dataclass
+class ReplayStats:
+    """リプレイ結果の統計."""
+
+    ticks: int
+    virtual_seconds: float
+    wall_seconds: float
+
+    @property
+    def speedup(self) -> float:
+        """実時間に対する倍率."""
+        return self.virtual_seconds / self.wall_seconds if self.wall_seconds else float('inf')
+
+
+def replay(
+    trace: Trace,
+    monitor,
+    clock: VirtualClock,
+    scanner: ReplayScanner,
+    *,
+    step: Optional[float] = None,
+    every_tick: bool = False,
+) -> ReplayStats:
+    """トレースを仮想時間で再生し、ポーリング間隔ごとに monitor の状態更新を呼ぶ.
+
+    monitor は clock / scanner を注入済みの GameMonitor（互換オブジェクト）。
+    タイトル構成が変わらない間は検出結果も変わらないため、既定では次の
+    イベントのティックまで時計を一気に進める。every_tick=True なら全ティックを実行する。
+    最後のイベントの後に全セッションを終了させる。
+    """
+    step = step or trace.poll_interval
+    events: Iterator[TraceEvent] = iter(trace.events)
+    pending = next(events, None)
+    tick_index = 0
+    ticks = 0
+    started = time.perf_counter()
+
+    while pending is not None:
+        while pending is not None and pending[0] <= tick_index * step:
+            scanner.titles = pending[1]
+            pending = next(events, None)
+        monitor._update_game_states(scanner.get_titles())
+        ticks += 1
+        if pending is None:
+            break
+        next_index = tick_index + 1 if every_tick else max(tick_index + 1, math.ceil(pending[0] / step))
+        clock.advance((next_index - tick_index) * step)
+        tick_index = next_index
+
+    monitor._finalize_all_sessions()
+    return ReplayStats(
+        ticks=ticks,
+        virtual_seconds=tick_index * step,
+        wall_seconds=time.perf_counter() - started,
+    )